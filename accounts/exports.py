@@ -0,0 +1,151 @@
+# accounts/exports.py
+"""
+File exports (PDF salary slip, XLSX history downloads).
+
+Kept out of accounts.views so the web process does not import reportlab or
+openpyxl at startup: both are imported inside the view on first use.
+"""
+from django.shortcuts import get_object_or_404
+from django.http import HttpResponse
+from django.utils import timezone
+from django.db.models import Sum
+
+from core.models import Employee, SareeCount, PagdiHistory, SalaryHistory, WarpHistory
+from core import services
+from core.conditional import conditional_get
+from core.db_router import replica_reads
+
+from .views import all_employees_version, salary_history_version, staff_required
+
+
+# =========================================================
+# PDF EXPORT (single employee salary slip)
+# =========================================================
+@staff_required
+@replica_reads
+def salary_slip_pdf(request, emp_id):
+    from reportlab.pdfgen import canvas
+
+    emp = get_object_or_404(Employee, id=emp_id)
+    today = timezone.localdate()
+    monday, sunday = services.get_week_bounds(today)
+
+    earned = SareeCount.objects.filter(employee=emp, date__gte=monday, date__lte=sunday).aggregate(Sum("earnings"))["earnings__sum"] or 0
+    final = earned - (emp.advance_salary or 0)
+
+    response = HttpResponse(content_type="application/pdf")
+    response["Content-Disposition"] = f'attachment; filename="salary_slip_{emp.name}.pdf"'
+
+    p = canvas.Canvas(response)
+    p.drawString(100, 800, f"Salary Slip for {emp.name}")
+    p.drawString(100, 780, f"Week: {monday} — {sunday}")
+    p.drawString(100, 760, f"Final Salary: ₹{final}")
+    p.showPage()
+    p.save()
+    return response
+
+
+# =========================================================
+# EXCEL / GLOBAL HISTORY DOWNLOAD (XLSX)
+# =========================================================
+@staff_required
+@replica_reads
+@conditional_get(all_employees_version)
+def download_global_history(request):
+    """
+    Exports all history data (Saree, Pagdi, Warp, Salary) into a single Excel file.
+    """
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+    from openpyxl.styles import Font
+
+    wb = openpyxl.Workbook()
+
+    # Sheet 1 - Saree History
+    ws = wb.active
+    ws.title = "Saree History"
+    headers = ["Employee", "Date", "Count", "Notes", "Salary Earned"]
+    ws.append(headers)
+    for h in SareeCount.objects.select_related("employee").order_by("-date"):
+        ws.append([h.employee.name, str(h.date), h.count, h.notes or "", h.earnings or 0])
+    for col in range(1, len(headers) + 1):
+        ws[f"{get_column_letter(col)}1"].font = Font(bold=True)
+
+    # Sheet 2 - Pagdi History
+    ws2 = wb.create_sheet("Pagdi History")
+    headers = ["Employee", "Start", "End", "Capacity", "Notes"]
+    ws2.append(headers)
+    for p in PagdiHistory.objects.select_related("employee").order_by("-start_date"):
+        ws2.append([p.employee.name, str(p.start_date), str(p.end_date) if p.end_date else "Active", p.capacity_sarees, p.notes or ""])
+    for col in range(1, len(headers) + 1):
+        ws2[f"{get_column_letter(col)}1"].font = Font(bold=True)
+
+    # Sheet 3 - Warp History
+    ws3 = wb.create_sheet("Warp History")
+    headers = ["Employee", "Start", "End", "Capacity", "Notes"]
+    ws3.append(headers)
+    for w in WarpHistory.objects.select_related("employee").order_by("-start_date"):
+        ws3.append([w.employee.name, str(w.start_date), str(w.end_date) if w.end_date else "Active", w.capacity_sarees, w.notes or ""])
+    for col in range(1, len(headers) + 1):
+        ws3[f"{get_column_letter(col)}1"].font = Font(bold=True)
+
+    # Sheet 4 - Salary History
+    ws4 = wb.create_sheet("Salary History")
+    headers = ["Employee", "Week Start", "Week End", "Sarees", "Rate", "Advance", "Final", "Paid", "Notes"]
+    ws4.append(headers)
+    for s in SalaryHistory.objects.select_related("employee").order_by("-week_start"):
+        ws4.append([s.employee.name, str(s.week_start), str(s.week_end), s.sarees, s.salary_rate, s.advance_salary, s.final_salary, "Yes" if s.paid_status else "No", s.notes or ""])
+    for col in range(1, len(headers) + 1):
+        ws4[f"{get_column_letter(col)}1"].font = Font(bold=True)
+
+    response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    filename = "Global_History_Report.xlsx"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    wb.save(response)
+    return response
+
+@staff_required
+@replica_reads
+@conditional_get(salary_history_version)
+def download_global_weekly_salary(request):
+    """
+    Export ALL salary history weeks (past + present) into XLSX.
+    """
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+    from openpyxl.styles import Font
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Salary History"
+
+    headers = ["Employee", "Week Start", "Week End", "Sarees", "Rate", "Advance", "Final", "Paid?", "Notes"]
+    ws.append(headers)
+
+    # Bold headers
+    for col in range(1, len(headers) + 1):
+        ws[f"{get_column_letter(col)}1"].font = Font(bold=True)
+
+    history = SalaryHistory.objects.select_related("employee").order_by("-week_start")
+
+    for s in history:
+        ws.append([
+            s.employee.name,
+            str(s.week_start),
+            str(s.week_end),
+            s.sarees,
+            s.salary_rate,
+            s.advance_salary,
+            s.final_salary,
+            "Yes" if s.paid_status else "No",
+            s.notes or ""
+        ])
+
+    # Prepare response
+    response = HttpResponse(
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    response["Content-Disposition"] = 'attachment; filename="Global_Weekly_Salary.xlsx"'
+
+    wb.save(response)
+    return response
@@ -1,7 +1,7 @@
 # accounts/urls.py
 # accounts/urls.py
 from django.urls import path
-from . import views
+from . import views, exports
 
 urlpatterns = [
 
@@ -18,6 +18,11 @@ urlpatterns = [
     path("employee/warp/", views.warp_view, name="warp"),
     path("employee/history/", views.employee_history_view, name="employee_history"),
     path("employee/salary-history/", views.employee_salary_history, name="employee_salary_history"),
+    path("employee/data/dashboard/", views.employee_dashboard_data, name="employee_dashboard_data"),
+    path("employee/data/saree-count/", views.saree_count_data, name="saree_count_data"),
+    path("employee/data/salary-history/", views.employee_salary_history_data, name="employee_salary_history_data"),
+    path("employee/manifest.webmanifest", views.employee_manifest, name="employee_manifest"),
+    path("employee/sw.js", views.employee_service_worker, name="employee_service_worker"),
 
     # ADMIN PANEL
     path("panel/", views.admin_home, name="admin_home"),
@@ -25,9 +30,16 @@ urlpatterns = [
 
     # EMPLOYEES
     path("panel/employees/", views.admin_employees, name="admin_employees"),
+    path("panel/employees/search/", views.admin_employee_search, name="admin_employee_search"),
+    path("panel/employees/approve/", views.admin_bulk_approve, name="admin_bulk_approve"),
+    path("panel/employees/onboard/", views.admin_bulk_onboard, name="admin_bulk_onboard"),
     path("panel/employees/<int:emp_id>/", views.admin_employee_detail, name="admin_employee_detail"),
+    path("panel/employees/<int:emp_id>/fragments/<str:section>/", views.admin_employee_fragment, name="admin_employee_fragment"),
     path("panel/employees/<int:emp_id>/approve/", views.admin_approve_employee, name="admin_approve_employee"),
 
+    # NOTE SEARCH
+    path("panel/notes/search/", views.admin_note_search, name="admin_note_search"),
+
     # PAGDI
     path("panel/pagdi/", views.admin_pagdi_list, name="admin_pagdi_list"),
     path("panel/pagdi/create/", views.admin_pagdi_create, name="admin_pagdi_create"),
@@ -41,10 +53,11 @@ urlpatterns = [
 
     # SALARY ACTIONS
     path("panel/give-advance/<int:emp_id>/", views.give_advance_view, name="give_advance"),
+    path("panel/bulk-advance/", views.admin_bulk_advance, name="admin_bulk_advance"),
     path("panel/clear-advance/<int:emp_id>/", views.clear_advance, name="clear_advance"),
     path("panel/mark-paid/<int:emp_id>/", views.mark_paid, name="mark_paid"),
     path("panel/mark-unpaid/<int:emp_id>/", views.mark_unpaid, name="mark_unpaid"),
-    path("panel/salary-slip/<int:emp_id>/", views.salary_slip_pdf, name="salary_slip_pdf"),
+    path("panel/salary-slip/<int:emp_id>/", exports.salary_slip_pdf, name="salary_slip_pdf"),
 
     # SALARY HISTORY (ADMIN)
     path("panel/salary-history/", views.admin_salary_history, name="admin_salary_history"),
@@ -53,9 +66,9 @@ urlpatterns = [
     path("panel/saree-entry/", views.admin_saree_entry, name="admin_saree_entry"),
 
     # Download global history (XLSX)
-    path("panel/download-history/", views.download_global_history, name="download_global_history"),
+    path("panel/download-history/", exports.download_global_history, name="download_global_history"),
     
-    path("panel/download-global-weekly-salary/", views.download_global_weekly_salary, name="download_global_weekly_salary"),
+    path("panel/download-global-weekly-salary/", exports.download_global_weekly_salary, name="download_global_weekly_salary"),
 
 
 ]
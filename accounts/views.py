@@ -1,24 +1,33 @@
 # accounts/views.py
 from django.contrib.auth.models import User
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import HttpResponse, HttpResponseBadRequest, Http404, JsonResponse
+from django.core.cache import cache
+from django.template.loader import render_to_string
 from django.utils import timezone
-from django.db.models import Sum, Q
+from django.db.models import Sum
 from django.db import transaction
+from django.conf import settings
+from django.templatetags.static import static
+from django.urls import reverse
+from asgiref.sync import sync_to_async
+from datetime import date
+import hashlib
+import json
 
 from core.models import (
     Employee, SareeCount, PagdiHistory, SalaryHistory,
-    WarpHistory, AdvanceHistory, PagdiChangeHistory
+    WarpHistory, AdvanceHistory, NoteIndex
 )
 from core import services
-
-# openpyxl used for XLSX export
-import openpyxl
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font
+from core.conditional import conditional_get, table_version
+from core.db_router import replica_reads
+from core.note_search import NOTE_SOURCES, search_notes
+from core.onboarding import approve_employees, onboard_employees, parse_onboarding_csv
+from core.search import search_employees
 
 
 # ---------------------------------------------------------
@@ -31,6 +40,40 @@ def _is_staff(user):
 staff_required = user_passes_test(_is_staff, login_url="login")
 
 
+# Probes for @conditional_get: values that change whenever the page would.
+def own_employee_version(request, *args, **kwargs):
+    """The logged-in employee's row, plus everything recorded against it (data_version)."""
+    version = table_version(Employee.objects.filter(user_id=request.user.pk), Sum("data_version"))
+    return [version] if version[0] else None
+
+
+def all_employees_version(request, *args, **kwargs):
+    """Every employee row, plus everything recorded against them (data_version)."""
+    return [table_version(Employee.objects.all(), Sum("data_version"))]
+
+
+def employee_version(request, emp_id, *args, **kwargs):
+    version = table_version(Employee.objects.filter(id=emp_id), Sum("data_version"))
+    return [version] if version[0] else None
+
+
+def employee_list_version(request, *args, **kwargs):
+    return [table_version(Employee.objects.all())]
+
+
+def salary_history_version(request, *args, **kwargs):
+    return [table_version(SalaryHistory.objects.all()), table_version(Employee.objects.all())]
+
+
+async def _resolve_user(request):
+    """
+    Load the user with the async API and pin it on request.user, so templates and
+    context processors rendered from an async view never trigger a sync DB query.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
 # =========================================================
 # AUTH
 # =========================================================
@@ -62,6 +105,17 @@ def signup_view(request):
     return render(request, "accounts/signup.html")
 
 
+# Whatever the employee portal cached on this device (service worker caches, see EMPLOYEE
+# PWA below) belongs to whoever was signed in: browsers drop it on every sign-in and
+# sign-out, so the next person on a shared phone never sees it.
+CLEAR_SITE_DATA = '"cache", "storage"'
+
+
+def _clear_site_data(response):
+    response["Clear-Site-Data"] = CLEAR_SITE_DATA
+    return response
+
+
 def login_view(request):
     if request.method == "POST":
         phone = request.POST.get("phone")
@@ -80,12 +134,12 @@ def login_view(request):
 
             login(request, user)
             request.session["employee_id"] = emp.id
-            return redirect("employee_dashboard")
+            return _clear_site_data(redirect("employee_dashboard"))
 
         if user.is_staff or user.is_superuser:
             login(request, user)
             request.session["employee_id"] = None
-            return redirect("admin_home")
+            return _clear_site_data(redirect("admin_home"))
 
         return render(request, "accounts/login.html", {"error": "Unauthorized account."})
 
@@ -94,66 +148,75 @@ def login_view(request):
 
 def logout_view(request):
     logout(request)
-    return redirect("login")
+    return _clear_site_data(redirect("login"))
 
 
 # =========================================================
 # EMPLOYEE VIEWS
 # =========================================================
+# Data of the employee pages, shared by the HTML views and the JSON endpoints the
+# portal's service worker keeps for offline use (see EMPLOYEE PWA below).
+async def _week_summary(employee):
+    monday, sunday = services.get_week_bounds(timezone.localdate())
+    week_totals = await SareeCount.objects.filter(
+        employee=employee, date__gte=monday, date__lte=sunday
+    ).aaggregate(sarees=Sum("count"), earned=Sum("earnings"))
+    weekly_salary_before = week_totals["earned"] or 0
+    return {
+        "weekly_sarees": week_totals["sarees"] or 0,
+        "final_salary": weekly_salary_before - (employee.advance_salary or 0),
+        "week_start": monday,
+        "week_end": sunday,
+    }
+
+
+def _saree_history(employee):
+    return [
+        {"id": r.id, "date": r.date, "count": r.count, "notes": r.notes, "salary": r.earnings or 0}
+        for r in SareeCount.objects.filter(employee=employee).order_by("-date")
+    ]
+
+
+async def _salary_history(employee):
+    return [h async for h in SalaryHistory.objects.filter(employee=employee).order_by("-week_start")]
+
+
 @login_required
-def employee_dashboard(request):
+@replica_reads
+@conditional_get(own_employee_version)
+async def employee_dashboard(request):
     """
     Employee dashboard. No ability to add saree counts here (read-only).
+    Async: waits on the database without holding a worker thread under ASGI.
     """
-    emp_id = request.session.get("employee_id")
+    await _resolve_user(request)
+    emp_id = await request.session.aget("employee_id")
     if not emp_id:
         messages.error(request, "Session expired or no employee session. Please login again.")
         return redirect("login")
 
-    employee = get_object_or_404(Employee, id=emp_id)
-
-    today = timezone.localdate()
-    monday, sunday = services.get_week_bounds(today)
-
-    weekly_sarees = SareeCount.objects.filter(
-        employee=employee, date__gte=monday, date__lte=sunday
-    ).aggregate(Sum("count"))["count__sum"] or 0
-
-    weekly_salary_before = weekly_sarees * (employee.salary_per_saree or 0)
-    final_salary = weekly_salary_before - (employee.advance_salary or 0)
+    employee = await aget_object_or_404(Employee, id=emp_id)
+    summary = await _week_summary(employee)
 
     return render(request, "accounts/dashboard.html", {
         "employee": employee,
-        "weekly_sarees": weekly_sarees,
-        "sarees": weekly_sarees,
+        "sarees": summary["weekly_sarees"],
         "salary_per_saree": employee.salary_per_saree,
         "advance": employee.advance_salary,
-        "final_salary": final_salary,
-        "week_start": monday,
-        "week_end": sunday,
+        **summary,
     })
 
 
 @login_required
+@replica_reads
+@conditional_get(own_employee_version)
 def saree_count_view(request):
     """
     Employee saree history page. Employees CANNOT add saree counts here.
-    Compute salary per row in view to avoid template arithmetic.
+    Salary per row is the earnings stored on the entry (count x rate in effect that day).
     """
     employee = get_object_or_404(Employee, user=request.user)
-
-    rows = SareeCount.objects.filter(employee=employee).order_by("-date").select_related("employee")
-
-    history = []
-    rate = employee.salary_per_saree or 0
-    for r in rows:
-        history.append({
-            "id": r.id,
-            "date": r.date,
-            "count": r.count,
-            "notes": r.notes,
-            "salary": r.count * rate
-        })
+    history = _saree_history(employee)
 
     return render(request, "accounts/saree_count.html", {
         "employee": employee,
@@ -162,13 +225,15 @@ def saree_count_view(request):
 
 
 @login_required
-def pagdi_view(request):
-    employee = get_object_or_404(Employee, user=request.user)
+@conditional_get(own_employee_version)
+async def pagdi_view(request):
+    user = await _resolve_user(request)
+    employee = await aget_object_or_404(Employee, user=user)
 
-    active = PagdiHistory.objects.filter(employee=employee, end_date__isnull=True).first()
+    active = await PagdiHistory.objects.filter(employee=employee, end_date__isnull=True).afirst()
 
     if request.method == "POST" and active:
-        services.finish_pagdi(active.id, request.user, "Finished by employee")
+        await sync_to_async(services.finish_pagdi)(active.id, user, "Finished by employee")
         messages.success(request, "Pagdi finished.")
         return redirect("pagdi")
 
@@ -176,46 +241,44 @@ def pagdi_view(request):
     remaining = 0
 
     if active:
-        sarees_made = SareeCount.objects.filter(employee=employee, date__gte=active.start_date).aggregate(Sum("count"))["count__sum"] or 0
+        sarees_made = (await SareeCount.objects.filter(employee=employee, date__gte=active.start_date).aaggregate(Sum("count")))["count__sum"] or 0
         remaining = max(0, active.capacity_sarees - sarees_made)
 
-    history = PagdiHistory.objects.filter(employee=employee).order_by("-start_date")
-
     return render(request, "accounts/pagdi.html", {
         "employee": employee,
         "pagdi": active,
         "sarees_made": sarees_made,
         "remaining": remaining,
-        "history": history,
     })
 
 
 @login_required
-def warp_view(request):
-    emp_id = request.session.get("employee_id")
-    employee = get_object_or_404(Employee, id=emp_id)
+@conditional_get(own_employee_version)
+async def warp_view(request):
+    await _resolve_user(request)
+    emp_id = await request.session.aget("employee_id")
+    employee = await aget_object_or_404(Employee, id=emp_id)
 
-    active = WarpHistory.objects.filter(employee=employee, end_date__isnull=True).first()
+    active = await WarpHistory.objects.filter(employee=employee, end_date__isnull=True).afirst()
 
     sarees_made = 0
     remaining = 0
 
     if active:
-        sarees_made = SareeCount.objects.filter(employee=employee, date__gte=active.start_date).aggregate(Sum("count"))["count__sum"] or 0
+        sarees_made = (await SareeCount.objects.filter(employee=employee, date__gte=active.start_date).aaggregate(Sum("count")))["count__sum"] or 0
         remaining = max(0, active.capacity_sarees - sarees_made)
 
-    history = WarpHistory.objects.filter(employee=employee).order_by("-start_date")
-
     return render(request, "accounts/warp.html", {
         "employee": employee,
         "warp": active,
         "sarees_made": sarees_made,
         "remaining": remaining,
-        "history": history,
     })
 
 
 @login_required
+@replica_reads
+@conditional_get(own_employee_version)
 def employee_history_view(request):
     """
     Combined history page for employee: saree entries, pagdi history, warp history.
@@ -235,22 +298,130 @@ def employee_history_view(request):
 
 
 @login_required
-def employee_salary_history(request):
+@replica_reads
+@conditional_get(own_employee_version)
+async def employee_salary_history(request):
     """
     Employee-facing Salary History: list SalaryHistory rows for this employee.
     """
-    emp = get_object_or_404(Employee, user=request.user)
-    history = SalaryHistory.objects.filter(employee=emp).order_by("-week_start")
+    user = await _resolve_user(request)
+    emp = await aget_object_or_404(Employee, user=user)
+    history = await _salary_history(emp)
     return render(request, "accounts/employee_salary_history.html", {
         "employee": emp,
         "history": history
     })
 
 
+# =========================================================
+# EMPLOYEE PWA (offline-capable portal)
+# =========================================================
+# The service worker (templates/accounts/pwa/service_worker.js) fetches the pages and
+# these JSON endpoints from the network and keeps the last copy for when the phone is
+# offline; static/js/employee_portal.js renders the page from that JSON.
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+@login_required
+@replica_reads
+@conditional_get(own_employee_version)
+async def employee_dashboard_data(request):
+    user = await _resolve_user(request)
+    employee = await aget_object_or_404(Employee, user=user)
+    summary = await _week_summary(employee)
+    return JsonResponse({
+        "name": employee.name,
+        "phone": employee.phone,
+        "salary_per_saree": employee.salary_per_saree,
+        "is_approved": employee.is_approved,
+        "advance": employee.advance_salary,
+        "weekly_sarees": summary["weekly_sarees"],
+        "final_salary": summary["final_salary"],
+        "week_start": _iso(summary["week_start"]),
+        "week_end": _iso(summary["week_end"]),
+    })
+
+
+@login_required
+@replica_reads
+@conditional_get(own_employee_version)
+def saree_count_data(request):
+    employee = get_object_or_404(Employee, user=request.user)
+    return JsonResponse({"history": [{**row, "date": _iso(row["date"])} for row in _saree_history(employee)]})
+
+
+@login_required
+@replica_reads
+@conditional_get(own_employee_version)
+async def employee_salary_history_data(request):
+    user = await _resolve_user(request)
+    employee = await aget_object_or_404(Employee, user=user)
+    return JsonResponse({"history": [
+        {
+            "week_start": _iso(h.week_start),
+            "week_end": _iso(h.week_end),
+            "sarees": h.sarees,
+            "salary_rate": h.salary_rate,
+            "advance_salary": h.advance_salary,
+            "final_salary": h.final_salary,
+            "paid_status": h.paid_status,
+        }
+        for h in await _salary_history(employee)
+    ]})
+
+
+# pages the service worker keeps available offline, with the JSON that refreshes them
+PWA_PAGES = {
+    "employee_dashboard": "employee_dashboard_data",
+    "saree_count": "saree_count_data",
+    "employee_salary_history": "employee_salary_history_data",
+}
+PWA_ICON = "img/loom-icon.svg"
+
+
+def employee_manifest(request):
+    """Web app manifest of the employee portal (public: browsers fetch it without cookies)."""
+    return JsonResponse({
+        "name": "Loom Employee Portal",
+        "short_name": "Loom",
+        "start_url": reverse("employee_dashboard"),
+        # the service worker's directory, the widest scope it can control
+        "scope": reverse("employee_service_worker").rsplit("/", 1)[0] + "/",
+        "display": "standalone",
+        "background_color": "#f8fafc",
+        "theme_color": "#4338ca",
+        "icons": [{"src": static(PWA_ICON), "sizes": "any", "type": "image/svg+xml"}],
+    }, content_type="application/manifest+json")
+
+
+def employee_service_worker(request):
+    """
+    The portal's service worker. Served from under /accounts/employee/ so its scope
+    covers the portal; the cache name changes whenever a precached static file's
+    hashed name does, which retires the old caches on the next visit.
+    """
+    shell = [static("css/app.css"), static("js/employee_portal.js"), static(PWA_ICON)]
+    config = {
+        "cache": "loom-employee-" + hashlib.md5("|".join(shell).encode(), usedforsecurity=False).hexdigest()[:12],
+        "shell": shell,
+        "pages": [reverse(page) for page in PWA_PAGES],
+        "data": [reverse(data) for data in PWA_PAGES.values()],
+        "static_url": settings.STATIC_URL,
+        "login_url": reverse("login"),
+    }
+    response = render(request, "accounts/pwa/service_worker.js", {"config": json.dumps(config)},
+                      content_type="application/javascript")
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
 # =========================================================
 # ADMIN HOME / DASHBOARD
 # =========================================================
 @staff_required
+@replica_reads
+@conditional_get(all_employees_version)
 def admin_home(request):
     today = timezone.localdate()
     monday, sunday = services.get_week_bounds(today)
@@ -282,17 +453,86 @@ def admin_dashboard(request):
 # =========================================================
 # ADMIN EMPLOYEES
 # =========================================================
+EMPLOYEES_PER_PAGE = 60
+
+
 @staff_required
+@conditional_get(employee_list_version)
 def admin_employees(request):
     query = request.GET.get("q", "")
-
-    employees = Employee.objects.all().order_by("-id")
-    if query:
-        employees = employees.filter(Q(name__icontains=query) | Q(phone__icontains=query))
+    try:
+        employees, next_cursor = search_employees(query, after=request.GET.get("after"), limit=EMPLOYEES_PER_PAGE)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
 
     return render(request, "accounts/admin/admin_employees.html", {
         "employees": employees,
-        "q": query
+        "q": query,
+        "next_cursor": next_cursor,
+    })
+
+
+@staff_required
+def admin_bulk_approve(request):
+    """Approve the employees ticked on admin_employees (POST emp_ids)."""
+    if request.method != "POST":
+        return HttpResponseBadRequest("POST only")
+    try:
+        ids = [int(i) for i in request.POST.getlist("emp_ids")]
+    except ValueError:
+        return HttpResponseBadRequest("Invalid employee id")
+    if not ids:
+        messages.error(request, "No employees selected.")
+    else:
+        messages.success(request, f"{approve_employees(ids)} employees approved.")
+    return redirect("admin_employees")
+
+
+@staff_required
+def admin_bulk_onboard(request):
+    """
+    Create many approved employees from an uploaded or pasted CSV (name,phone,rate[,password]).
+    The generated initial passwords are shown once, on the result page.
+    """
+    if request.method == "POST":
+        upload = request.FILES.get("csv_file")
+        try:
+            text = upload.read().decode("utf-8-sig") if upload else request.POST.get("csv_text", "")
+            rows = parse_onboarding_csv(text.strip().splitlines())
+            if not rows:
+                messages.error(request, "No employees in the CSV.")
+                return redirect("admin_bulk_onboard")
+            created = onboard_employees(rows, workers=settings.ONBOARDING_HASH_WORKERS)
+        except (ValueError, UnicodeDecodeError) as e:
+            messages.error(request, f"Onboarding failed: {e}")
+            return redirect("admin_bulk_onboard")
+
+        response = render(request, "accounts/admin/admin_bulk_onboard.html", {"created": created})
+        # the page lists initial passwords: keep it out of every cache
+        response["Cache-Control"] = "no-store"
+        return response
+
+    return render(request, "accounts/admin/admin_bulk_onboard.html")
+
+
+@staff_required
+@replica_reads
+def admin_employee_search(request):
+    """
+    JSON typeahead for the employee pickers: ?q=<name or phone digits>&approved=1&after=<cursor>.
+    Returns {"results": [{"id", "name", "phone"}], "next": cursor or null}.
+    """
+    approved = {"1": True, "0": False}.get(request.GET.get("approved"))
+    try:
+        employees, next_cursor = search_employees(
+            request.GET.get("q", ""), approved=approved, after=request.GET.get("after"),
+            limit=request.GET.get("limit") or 20,
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor or limit")
+    return JsonResponse({
+        "results": [{"id": e.id, "name": e.name, "phone": e.phone} for e in employees],
+        "next": next_cursor,
     })
 
 
@@ -300,36 +540,13 @@ def admin_employees(request):
 def admin_employee_detail(request, emp_id):
     """
     Admin detail page for a specific employee.
-    Show saree entries (week), pagdi history, warp history and salary history for the employee.
+    Renders the current week only; the full saree, pagdi, warp and salary histories
+    are fetched on demand from admin_employee_fragment.
     """
     employee = get_object_or_404(Employee, id=emp_id)
     today = timezone.localdate()
     monday, sunday = services.get_week_bounds(today)
 
-    # weekly entries raw queryset
-    weekly_entries_raw = SareeCount.objects.filter(employee=employee, date__gte=monday, date__lte=sunday).order_by("-date")
-    # compute salary for each entry (to avoid template arithmetic)
-    weekly_entries = []
-    rate = employee.salary_per_saree or 0
-    for e in weekly_entries_raw:
-        weekly_entries.append({
-            "id": e.id,
-            "date": e.date,
-            "count": e.count,
-            "notes": e.notes,
-            "salary": e.count * rate
-        })
-
-    week_sarees = sum([w["count"] for w in weekly_entries]) if weekly_entries else 0
-    weekly_salary_before = week_sarees * rate
-    week_final = weekly_salary_before - (employee.advance_salary or 0)
-
-    # Employee-level histories
-    saree_history_full = SareeCount.objects.filter(employee=employee).order_by("-date")
-    pagdi_history_full = PagdiHistory.objects.filter(employee=employee).order_by("-start_date")
-    warp_history_full = WarpHistory.objects.filter(employee=employee).order_by("-start_date")
-    salary_history_full = SalaryHistory.objects.filter(employee=employee).order_by("-week_start")
-
     # ---- POST ACTIONS ----
     if request.method == "POST":
         action = request.POST.get("action")
@@ -345,12 +562,13 @@ def admin_employee_detail(request, emp_id):
                 new_salary = int(request.POST.get("salary_per_saree"))
                 if new_salary < 0:
                     raise ValueError("Negative not allowed")
+                effective = request.POST.get("effective_from")
+                effective = date.fromisoformat(effective) if effective else None
             except Exception:
                 messages.error(request, "Invalid salary value.")
                 return redirect("admin_employee_detail", emp_id=emp_id)
 
-            employee.salary_per_saree = new_salary
-            employee.save(update_fields=["salary_per_saree", "updated_at"])
+            services.set_salary_rate(employee.id, new_salary, effective, request.user)
             messages.success(request, "Salary updated.")
             return redirect("admin_employee_detail", emp_id=emp_id)
 
@@ -374,6 +592,23 @@ def admin_employee_detail(request, emp_id):
             messages.success(request, "Entry deleted.")
             return redirect("admin_employee_detail", emp_id=emp_id)
 
+    # weekly entries raw queryset
+    weekly_entries_raw = SareeCount.objects.filter(employee=employee, date__gte=monday, date__lte=sunday).order_by("-date")
+    # salary for each entry is its stored earnings (to avoid template arithmetic)
+    weekly_entries = []
+    for e in weekly_entries_raw:
+        weekly_entries.append({
+            "id": e.id,
+            "date": e.date,
+            "count": e.count,
+            "notes": e.notes,
+            "salary": e.earnings or 0
+        })
+
+    week_sarees = sum([w["count"] for w in weekly_entries]) if weekly_entries else 0
+    weekly_salary_before = sum([w["salary"] for w in weekly_entries]) if weekly_entries else 0
+    week_final = weekly_salary_before - (employee.advance_salary or 0)
+
     # compute whether week is paid (for UI)
     sh = SalaryHistory.objects.filter(employee=employee, week_start=monday, week_end=sunday).first()
     week_paid = sh.paid_status if sh else False
@@ -387,11 +622,75 @@ def admin_employee_detail(request, emp_id):
         "week_paid": week_paid,
         "week_start": monday,
         "week_end": sunday,
-        # full histories for admin view
-        "saree_history_full": saree_history_full,
-        "pagdi_history_full": pagdi_history_full,
-        "warp_history_full": warp_history_full,
-        "salary_history_full": salary_history_full,
+        "history_sections": [(section, title) for section, (title, _) in EMPLOYEE_HISTORY_SECTIONS.items()],
+    })
+
+
+# History tabs of admin_employee_detail: section -> (title, rows for the fragment template)
+EMPLOYEE_HISTORY_SECTIONS = {
+    "saree": ("Saree History", lambda emp_id: SareeCount.objects.filter(employee_id=emp_id).order_by("-date")),
+    "pagdi": ("Pagdi History", lambda emp_id: PagdiHistory.objects.filter(employee_id=emp_id).order_by("-start_date")),
+    "warp": ("Warp History", lambda emp_id: WarpHistory.objects.filter(employee_id=emp_id).order_by("-start_date")),
+    "salary": ("Salary History", lambda emp_id: SalaryHistory.objects.filter(employee_id=emp_id).order_by("-week_start")),
+}
+EMPLOYEE_FRAGMENT_TTL = 60 * 60
+
+
+@staff_required
+@replica_reads
+@conditional_get(employee_version)
+def admin_employee_fragment(request, emp_id, section):
+    """
+    One history tab of admin_employee_detail as an HTML fragment.
+    Rendered fragments are cached under the employee's data_version, which changes on
+    every write to the underlying rows, so a cached copy is never stale.
+    """
+    if section not in EMPLOYEE_HISTORY_SECTIONS:
+        raise Http404("Unknown section")
+    version = Employee.objects.filter(id=emp_id).values_list("data_version", flat=True).first()
+    if version is None:
+        raise Http404("Employee not found")
+
+    key = f"employee-fragment:{emp_id}:{section}:{version}"
+    html = cache.get(key)
+    if html is None:
+        _, rows = EMPLOYEE_HISTORY_SECTIONS[section]
+        html = render_to_string(f"accounts/admin/fragments/employee_{section}_history.html", {"rows": rows(emp_id)})
+        cache.set(key, html, EMPLOYEE_FRAGMENT_TTL)
+    return HttpResponse(html)
+
+
+# =========================================================
+# NOTE SEARCH (ADMIN)
+# =========================================================
+NOTE_HITS_PER_PAGE = 25
+
+
+@staff_required
+@replica_reads
+def admin_note_search(request):
+    """
+    Full-text search over the notes of saree entries, pagdis, warps, salary weeks and
+    the advance / pagdi change audit logs, best match first.
+    """
+    query = request.GET.get("q", "").strip()
+    kinds = [k for k in request.GET.getlist("kind") if k in NOTE_SOURCES]
+    try:
+        page = max(1, int(request.GET.get("page") or 1))
+    except ValueError:
+        page = 1
+    hits, has_next = search_notes(query, page=page, per_page=NOTE_HITS_PER_PAGE, kinds=kinds) if query else ([], False)
+
+    kind_labels = dict(NoteIndex.KIND_CHOICES)
+    for hit in hits:
+        hit.kind_label = kind_labels.get(hit.kind, hit.kind)
+    return render(request, "accounts/admin/admin_note_search.html", {
+        "q": query,
+        "kinds": kinds,
+        "kind_choices": NoteIndex.KIND_CHOICES,
+        "hits": hits,
+        "page": page,
+        "has_next": has_next,
     })
 
 
@@ -399,6 +698,8 @@ def admin_employee_detail(request, emp_id):
 # PAGDI / WARP (ADMIN)
 # =========================================================
 @staff_required
+@replica_reads
+@conditional_get(all_employees_version)
 def admin_pagdi_list(request):
     pagdis = PagdiHistory.objects.all().order_by("-start_date")
     result = []
@@ -416,8 +717,6 @@ def admin_pagdi_list(request):
 
 @staff_required
 def admin_pagdi_create(request):
-    employees = Employee.objects.filter(is_approved=True)
-
     if request.method == "POST":
         emp_id = request.POST.get("employee")
         start = request.POST.get("start_date")
@@ -429,21 +728,21 @@ def admin_pagdi_create(request):
 
         notes = request.POST.get("notes", "")
 
-        old = PagdiHistory.objects.filter(employee_id=emp_id, end_date__isnull=True).first()
-        if old:
-            services.finish_pagdi(old.id, request.user, "Auto-finish due to new assignment")
-
-        newp = PagdiHistory.objects.create(employee_id=emp_id, start_date=start, capacity_sarees=capacity, notes=notes)
-
-        PagdiChangeHistory.objects.create(pagdi=newp, employee=newp.employee, admin_user=request.user, action="CREATE", new_capacity=capacity, note=notes)
+        try:
+            services.assign_pagdi(emp_id, start, capacity, request.user, notes)
+        except (Employee.DoesNotExist, ValueError):
+            messages.error(request, "Invalid employee.")
+            return redirect("admin_pagdi_create")
 
         messages.success(request, "Pagdi created.")
         return redirect("admin_pagdi_list")
 
-    return render(request, "accounts/admin/admin_pagdi_create.html", {"employees": employees})
+    return render(request, "accounts/admin/admin_pagdi_create.html")
 
 
 @staff_required
+@replica_reads
+@conditional_get(all_employees_version)
 def admin_warp_list(request):
     """
     Admin warp listing (similar to pagdi list). Also has Assign Warp button.
@@ -462,20 +761,24 @@ def admin_warp_list(request):
 
 @staff_required
 def admin_warp_create(request):
-    employees = Employee.objects.filter(is_approved=True)
-
     if request.method == "POST":
-        WarpHistory.objects.create(employee_id=request.POST.get("employee"), capacity_sarees=int(request.POST.get("capacity") or 0), start_date=timezone.localdate())
+        try:
+            services.assign_warp(request.POST.get("employee"), int(request.POST.get("capacity") or 0))
+        except (Employee.DoesNotExist, ValueError):
+            messages.error(request, "Invalid employee or capacity.")
+            return redirect("admin_warp_create")
         messages.success(request, "Warp assigned.")
         return redirect("admin_warp_list")
 
-    return render(request, "accounts/admin/admin_warp_create.html", {"employees": employees})
+    return render(request, "accounts/admin/admin_warp_create.html")
 
 
 # =========================================================
 # WEEKLY SALARY (ADMIN)
 # =========================================================
 @staff_required
+@replica_reads
+@conditional_get(all_employees_version)
 def admin_weekly_salary(request):
     today = timezone.localdate()
     monday, sunday = services.get_week_bounds(today)
@@ -484,8 +787,9 @@ def admin_weekly_salary(request):
     employees = Employee.objects.all()
 
     for emp in employees:
-        sarees = SareeCount.objects.filter(employee=emp, date__gte=monday, date__lte=sunday).aggregate(Sum("count"))["count__sum"] or 0
-        salary_before = sarees * (emp.salary_per_saree or 0)
+        totals = SareeCount.objects.filter(employee=emp, date__gte=monday, date__lte=sunday).aggregate(sarees=Sum("count"), earned=Sum("earnings"))
+        sarees = totals["sarees"] or 0
+        salary_before = totals["earned"] or 0
         advance_amt = emp.advance_salary or 0
         final_salary = salary_before - advance_amt
 
@@ -505,6 +809,8 @@ def admin_weekly_salary(request):
 
 
 @staff_required
+@replica_reads
+@conditional_get(salary_history_version)
 def admin_salary_history(request):
     history = SalaryHistory.objects.select_related("employee").all().order_by("-week_start")
     return render(request, "accounts/admin/admin_salary_history.html", {"history": history})
@@ -528,6 +834,45 @@ def give_advance_view(request, emp_id):
     return redirect("admin_weekly_salary")
 
 
+@staff_required
+def admin_bulk_advance(request):
+    """
+    Give advances to many employees in one request: per-employee amount inputs
+    and/or an uploaded CSV (employee_id,amount[,note]). Applied via services.give_advances_bulk.
+    """
+    employees = Employee.objects.filter(is_approved=True).order_by("name")
+
+    if request.method == "POST":
+        note = request.POST.get("note", "")
+        rows = []
+        try:
+            for key, value in request.POST.items():
+                if not key.startswith("amount_") or not value.strip():
+                    continue
+                emp_id = int(key[len("amount_"):])
+                rows.append((emp_id, int(value), request.POST.get(f"note_{emp_id}", "").strip()))
+
+            upload = request.FILES.get("csv_file")
+            if upload:
+                text = upload.read().decode("utf-8-sig")
+                rows.extend(services.parse_bulk_advance_csv(text.splitlines()))
+
+            if not rows:
+                messages.error(request, "No advances entered.")
+                return redirect("admin_bulk_advance")
+
+            history = services.give_advances_bulk(rows, request.user, note)
+        except (ValueError, UnicodeDecodeError, Employee.DoesNotExist) as e:
+            messages.error(request, f"Bulk advance failed: {e}")
+            return redirect("admin_bulk_advance")
+
+        total = sum(h.new_amount - h.previous_amount for h in history)
+        messages.success(request, f"{len(history)} advances given, total ₹{total}.")
+        return redirect("admin_weekly_salary")
+
+    return render(request, "accounts/admin/admin_bulk_advance.html", {"employees": employees})
+
+
 @staff_required
 def clear_advance(request, emp_id):
     if request.method != "POST":
@@ -545,9 +890,10 @@ def mark_paid(request, emp_id):
     today = timezone.localdate()
     monday, sunday = services.get_week_bounds(today)
 
-    sarees = SareeCount.objects.filter(employee=emp, date__gte=monday, date__lte=sunday).aggregate(Sum("count"))["count__sum"] or 0
+    totals = SareeCount.objects.filter(employee=emp, date__gte=monday, date__lte=sunday).aggregate(sarees=Sum("count"), earned=Sum("earnings"))
+    sarees = totals["sarees"] or 0
     rate = emp.salary_per_saree or 0
-    total = sarees * rate
+    total = totals["earned"] or 0
     advance = emp.advance_salary or 0
     final = total - advance
     note = request.POST.get("note", "")
@@ -568,7 +914,7 @@ def mark_paid(request, emp_id):
         sh.paid_date = today
         sh.final_salary = final
         sh.notes = note or sh.notes
-        sh.save(update_fields=["paid_status", "paid_date", "final_salary", "notes"])
+        sh.save(update_fields=["paid_status", "paid_date", "final_salary", "notes", "updated_at"])
 
 
     messages.success(request, "Marked paid.")
@@ -586,45 +932,17 @@ def mark_unpaid(request, emp_id):
     if sh:
         sh.paid_status = False
         sh.paid_date = None
-        sh.save(update_fields=["paid_status", "paid_date"])
+        sh.save(update_fields=["paid_status", "paid_date", "updated_at"])
 
     messages.success(request, "Marked unpaid.")
     return redirect("admin_weekly_salary")
 
 
-# =========================================================
-# PDF EXPORT (single employee salary slip)
-# =========================================================
-@staff_required
-def salary_slip_pdf(request, emp_id):
-    import io
-    from reportlab.pdfgen import canvas
-
-    emp = get_object_or_404(Employee, id=emp_id)
-    today = timezone.localdate()
-    monday, sunday = services.get_week_bounds(today)
-
-    sarees = SareeCount.objects.filter(employee=emp, date__gte=monday, date__lte=sunday).aggregate(Sum("count"))["count__sum"] or 0
-    final = (sarees * (emp.salary_per_saree or 0)) - (emp.advance_salary or 0)
-
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="salary_slip_{emp.name}.pdf"'
-
-    p = canvas.Canvas(response)
-    p.drawString(100, 800, f"Salary Slip for {emp.name}")
-    p.drawString(100, 780, f"Week: {monday} — {sunday}")
-    p.drawString(100, 760, f"Final Salary: ₹{final}")
-    p.showPage()
-    p.save()
-    return response
-
-
 # =========================================================
 # ADMIN: SAREE ENTRY & APPROVE
 # =========================================================
 @staff_required
 def admin_saree_entry(request):
-    employees = Employee.objects.filter(is_approved=True).order_by("name")
     if request.method == "POST":
         emp_id = request.POST.get("employee")
         try:
@@ -632,12 +950,15 @@ def admin_saree_entry(request):
         except Exception:
             messages.error(request, "Invalid count")
             return redirect("admin_saree_entry")
+        if not (emp_id or "").isdigit() or not Employee.objects.filter(id=emp_id, is_approved=True).exists():
+            messages.error(request, "Select an approved employee.")
+            return redirect("admin_saree_entry")
         date = request.POST.get("date") or timezone.localdate()
         notes = request.POST.get("notes", "")
         SareeCount.objects.create(employee_id=emp_id, count=count, date=date, notes=notes)
         messages.success(request, "Saree entry added.")
         return redirect("admin_saree_entry")
-    return render(request, "accounts/admin/admin_saree_entry.html", {"employees": employees})
+    return render(request, "accounts/admin/admin_saree_entry.html")
 
 
 @staff_required
@@ -647,102 +968,3 @@ def admin_approve_employee(request, emp_id):
     emp.save(update_fields=["is_approved", "updated_at"])
     messages.success(request, f"{emp.name} approved.")
     return redirect("admin_employees")
-
-
-# =========================================================
-# EXCEL / GLOBAL HISTORY DOWNLOAD (XLSX)
-# =========================================================
-@staff_required
-def download_global_history(request):
-    """
-    Exports all history data (Saree, Pagdi, Warp, Salary) into a single Excel file.
-    """
-    wb = openpyxl.Workbook()
-
-    # Sheet 1 - Saree History
-    ws = wb.active
-    ws.title = "Saree History"
-    headers = ["Employee", "Date", "Count", "Notes", "Salary Earned"]
-    ws.append(headers)
-    for h in SareeCount.objects.select_related("employee").order_by("-date"):
-        salary = h.count * (h.employee.salary_per_saree or 0)
-        ws.append([h.employee.name, str(h.date), h.count, h.notes or "", salary])
-    for col in range(1, len(headers) + 1):
-        ws[f"{get_column_letter(col)}1"].font = Font(bold=True)
-
-    # Sheet 2 - Pagdi History
-    ws2 = wb.create_sheet("Pagdi History")
-    headers = ["Employee", "Start", "End", "Capacity", "Notes"]
-    ws2.append(headers)
-    for p in PagdiHistory.objects.select_related("employee").order_by("-start_date"):
-        ws2.append([p.employee.name, str(p.start_date), str(p.end_date) if p.end_date else "Active", p.capacity_sarees, p.notes or ""])
-    for col in range(1, len(headers) + 1):
-        ws2[f"{get_column_letter(col)}1"].font = Font(bold=True)
-
-    # Sheet 3 - Warp History
-    ws3 = wb.create_sheet("Warp History")
-    headers = ["Employee", "Start", "End", "Capacity", "Notes"]
-    ws3.append(headers)
-    for w in WarpHistory.objects.select_related("employee").order_by("-start_date"):
-        ws3.append([w.employee.name, str(w.start_date), str(w.end_date) if w.end_date else "Active", w.capacity_sarees, w.notes or ""])
-    for col in range(1, len(headers) + 1):
-        ws3[f"{get_column_letter(col)}1"].font = Font(bold=True)
-
-    # Sheet 4 - Salary History
-    ws4 = wb.create_sheet("Salary History")
-    headers = ["Employee", "Week Start", "Week End", "Sarees", "Rate", "Advance", "Final", "Paid", "Notes"]
-    ws4.append(headers)
-    for s in SalaryHistory.objects.select_related("employee").order_by("-week_start"):
-        ws4.append([s.employee.name, str(s.week_start), str(s.week_end), s.sarees, s.salary_rate, s.advance_salary, s.final_salary, "Yes" if s.paid_status else "No", s.notes or ""])
-    for col in range(1, len(headers) + 1):
-        ws4[f"{get_column_letter(col)}1"].font = Font(bold=True)
-
-    response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    filename = "Global_History_Report.xlsx"
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
-
-@staff_required
-def download_global_weekly_salary(request):
-    """
-    Export ALL salary history weeks (past + present) into XLSX.
-    """
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-    from openpyxl.styles import Font
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Salary History"
-
-    headers = ["Employee", "Week Start", "Week End", "Sarees", "Rate", "Advance", "Final", "Paid?", "Notes"]
-    ws.append(headers)
-
-    # Bold headers
-    for col in range(1, len(headers) + 1):
-        ws[f"{get_column_letter(col)}1"].font = Font(bold=True)
-
-    history = SalaryHistory.objects.select_related("employee").order_by("-week_start")
-
-    for s in history:
-        ws.append([
-            s.employee.name,
-            str(s.week_start),
-            str(s.week_end),
-            s.sarees,
-            s.salary_rate,
-            s.advance_salary,
-            s.final_salary,
-            "Yes" if s.paid_status else "No",
-            s.notes or ""
-        ])
-
-    # Prepare response
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response["Content-Disposition"] = 'attachment; filename="Global_Weekly_Salary.xlsx"'
-
-    wb.save(response)
-    return response
@@ -0,0 +1,99 @@
+"""
+Concurrent read benchmark for the employee pages.
+
+Logs in as one employee, then keeps N concurrent clients requesting the
+employee pages (dashboard, pagdi, warp, salary history) for a fixed time and
+reports throughput and latency. Run it against the same instance started once
+with sync workers and once with uvicorn workers (see README_DEPLOY.md) and
+compare requests/sec per worker process.
+
+    python bench/employee_reads.py --url http://127.0.0.1:8000 \
+        --phone 9999999999 --password secret --concurrency 64 --seconds 20
+
+Stdlib only, so it can run from any machine with Python 3.
+"""
+import argparse
+import http.cookiejar
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+PAGES = [
+    "/accounts/employee/dashboard/",
+    "/accounts/employee/pagdi/",
+    "/accounts/employee/warp/",
+    "/accounts/employee/salary-history/",
+]
+
+
+def login(base, phone, password):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    opener.open(base + "/accounts/login/").read()
+    csrf = next(c.value for c in jar if c.name == "csrftoken")
+    body = urllib.parse.urlencode({"phone": phone, "password": password, "csrfmiddlewaretoken": csrf}).encode()
+    req = urllib.request.Request(base + "/accounts/login/", data=body, headers={"Referer": base + "/accounts/login/"})
+    resp = opener.open(req)
+    if "/employee/" not in resp.geturl():
+        raise SystemExit("login failed: check --phone/--password (employee must be approved)")
+    return "; ".join(f"{c.name}={c.value}" for c in jar)
+
+
+def worker(base, cookie, deadline, latencies, errors, lock):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = PAGES[i % len(PAGES)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            req = urllib.request.Request(base + path, headers={"Cookie": cookie})
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                resp.read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+        except Exception:
+            with lock:
+                errors.append(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--phone", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    args = parser.parse_args()
+
+    base = args.url.rstrip("/")
+    cookie = login(base, args.phone, args.password)
+
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+    threads = [
+        threading.Thread(target=worker, args=(base, cookie, deadline, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    if not latencies:
+        raise SystemExit(f"no successful requests ({len(errors)} errors)")
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"concurrency     {args.concurrency}")
+    print(f"requests        {len(latencies)} ok, {len(errors)} errors")
+    print(f"throughput      {len(latencies) / wall:.1f} req/s")
+    print(f"latency median  {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p95     {p95 * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Concurrent read/write benchmark for the single-box SQLite mode.
+
+Runs the same workload against a fresh SQLite file once with SQLite's defaults
+(SQLITE_TUNED=False) and once with the tuned mode (WAL, busy timeout, mmap/cache
+pragmas, BEGIN IMMEDIATE; see loomserver/settings.py), and reports operations/sec and
+"database is locked" failures for each:
+
+- readers: the employee dashboard's queries (employee + this week's saree totals)
+- writers: alternately a saree entry (autocommit insert) and services.give_advance()
+  (a read-modify-write transaction)
+
+    python bench/sqlite_concurrency.py --readers 8 --writers 2 --seconds 10
+
+Each mode runs in its own interpreter, since the settings are read at startup.
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_child(args):
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "loomserver.settings")
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import OperationalError, connection
+    from django.db.models import Sum
+    from django.utils import timezone
+
+    from core import services
+    from core.models import Employee, SareeCount
+
+    call_command("migrate", verbosity=0)
+    employees = [
+        Employee.objects.create(user=User.objects.create_user(username=f"bench{i}"), name=f"Bench {i}",
+                                phone=f"bench{i}", salary_per_saree=10, is_approved=True)
+        for i in range(args.employees)
+    ]
+    ids = [e.id for e in employees]
+    monday, sunday = services.get_week_bounds(timezone.localdate())
+
+    def read(i):
+        emp = Employee.objects.get(id=ids[i % len(ids)])
+        SareeCount.objects.filter(employee=emp, date__gte=monday, date__lte=sunday).aggregate(
+            sarees=Sum("count"), earned=Sum("earnings"))
+
+    entries = itertools.count()   # one saree entry per (employee, day): walk back in time
+
+    def write(i):
+        if i % 2:
+            services.give_advance(ids[i % len(ids)], 1, note="bench")
+        else:
+            n = next(entries)
+            SareeCount.objects.create(employee_id=ids[n % len(ids)], date=sunday - timedelta(days=n // len(ids)), count=1)
+
+    counts = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(op, kind, offset):
+        done = failed = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            i += 1
+            try:
+                op(i)
+                done += 1
+            except OperationalError:
+                failed += 1
+        connection.close()
+        with lock:
+            counts[kind + "s"] += done
+            counts[kind + "_errors"] += failed
+
+    threads = [threading.Thread(target=worker, args=(read, "read", n)) for n in range(args.readers)]
+    threads += [threading.Thread(target=worker, args=(write, "write", n)) for n in range(args.writers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counts["seconds"] = time.perf_counter() - started
+    counts["journal_mode"] = connection.cursor().execute("PRAGMA journal_mode").fetchone()[0]
+    print(json.dumps(counts))
+
+
+def run_mode(tuned, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SQLITE_PATH=str(Path(tmp) / "bench.sqlite3"), SQLITE_TUNED=str(tuned))
+        env.pop("DATABASE_URL", None)
+        env.pop("REPLICA_DATABASE_URL", None)
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", "--readers", str(args.readers), "--writers", str(args.writers),
+             "--seconds", str(args.seconds), "--employees", str(args.employees)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    print(f"readers {args.readers}, writers {args.writers}, {args.seconds:g}s per mode")
+    print(f"{'mode':<9}{'journal':<9}{'reads/s':>10}{'writes/s':>10}{'locked (r/w)':>15}")
+    for label, tuned in (("default", False), ("tuned", True)):
+        r = run_mode(tuned, args)
+        locked = f"{r['read_errors']}/{r['write_errors']}"
+        print(f"{label:<9}{r['journal_mode']:<9}{r['reads'] / r['seconds']:>10.1f}"
+              f"{r['writes'] / r['seconds']:>10.1f}{locked:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cold-start benchmark for loomserver.
+
+Starts fresh interpreters that load the WSGI application and URLconf the same
+way a newly spawned worker does, and reports the median load time, the
+resident memory (RSS) afterwards and which heavy optional libraries were
+imported along the way.
+
+    python bench/startup.py --runs 7
+
+Run it on two checkouts (e.g. before/after a change) to compare. RSS is read
+from /proc, so memory figures are Linux-only.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY = ["openpyxl", "reportlab", "cloudinary", "cloudinary_storage", "PIL"]
+
+PROBE = r"""
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "loomserver.settings")
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - start
+rss_kb = None
+try:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    pass
+print(json.dumps({"seconds": elapsed, "rss_kb": rss_kb, "loaded": [m for m in HEAVY if m in sys.modules]}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = f"HEAVY = {HEAVY!r}\n" + PROBE
+    results = []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", code],
+            cwd=root, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    seconds = statistics.median(r["seconds"] for r in results)
+    rss = [r["rss_kb"] for r in results if r["rss_kb"]]
+    print(f"runs            {args.runs}")
+    print(f"app load        {seconds * 1000:.0f} ms (median)")
+    if rss:
+        print(f"worker RSS      {statistics.median(rss) / 1024:.1f} MiB (median)")
+    print(f"heavy imports   {', '.join(results[-1]['loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
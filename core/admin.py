@@ -1,17 +1,92 @@
 # core/admin.py
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import OuterRef, Subquery, Sum, Value, F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import (
     Employee,
     SareeCount,
     WarpHistory,
     PagdiHistory,
     AlertEmail,
+    ExhaustionAlert,
     SalaryHistory,
+    SalaryRateHistory,
     AdvanceHistory,
     PagdiChangeHistory,
+    AuditArchive,
+    WeeklyCloseRun,
 )
 
 
+# ---------------------------------------------------------
+# Changelist helpers for the large tables
+# ---------------------------------------------------------
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses PostgreSQL's planner estimate instead of COUNT(*) for unfiltered
+    changelists of big tables. Filtered lists and other databases still count exactly.
+    """
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if getattr(qs, "query", None) is not None and not qs.query.where:
+            connection = connections[qs.db]
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [qs.model._meta.db_table])
+                    row = cursor.fetchone()
+                if row and row[0] >= self.estimate_threshold:
+                    return row[0]
+        return super().count
+
+
+class EmployeeInputFilter(admin.SimpleListFilter):
+    """
+    Type-in employee filter (id, or part of the name) instead of a dropdown listing every employee.
+    """
+    title = "employee"
+    parameter_name = "employee"
+    template = "admin/core/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        # a non-empty lookups() is what makes Django render the filter
+        return ((None, None),)
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return queryset
+        if value.isdigit():
+            return queryset.filter(employee_id=int(value))
+        return queryset.filter(employee__name__icontains=value)
+
+    def choices(self, changelist):
+        # only the "All" link is needed; its query_parts keep the other active filters in the form
+        all_choice = next(super().choices(changelist))
+        all_choice["query_parts"] = [
+            (k, v) for k, values in changelist.get_filters_params().items() for v in values if k != self.parameter_name
+        ]
+        yield all_choice
+
+
+def with_remaining_sarees(queryset):
+    """
+    Annotate Warp/Pagdi rows with `remaining` (capacity minus sarees made since start_date,
+    up to today) in the same query, mirroring remaining_sarees().
+    """
+    made = (
+        SareeCount.objects.filter(employee=OuterRef("employee_id"), date__gte=OuterRef("start_date"), date__lte=timezone.localdate())
+        .order_by().values("employee").annotate(total=Sum("count")).values("total")
+    )
+    return queryset.annotate(remaining=F("capacity_sarees") - Coalesce(Subquery(made), Value(0)))
+
+
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = (
@@ -28,24 +103,41 @@ class EmployeeAdmin(admin.ModelAdmin):
     search_fields = ("name", "phone", "user__email")
     readonly_fields = ("joining_date", "created_at", "updated_at")
 
+    def get_readonly_fields(self, request, obj=None):
+        # rate changes go through services.set_salary_rate (panel: employee detail → salary),
+        # which records SalaryRateHistory and re-rates affected entries
+        if obj is not None:
+            return self.readonly_fields + ("salary_per_saree",)
+        return self.readonly_fields
+
 
 @admin.register(SareeCount)
 class SareeCountAdmin(admin.ModelAdmin):
-    list_display = ("employee", "date", "count", "salary_earned")
-    list_filter = ("date", "employee")
+    list_display = ("employee", "date", "count", "rate", "earnings")
+    list_filter = ("date", EmployeeInputFilter)
+    list_select_related = ("employee",)
     search_fields = ("employee__name",)
     ordering = ("-date",)
+    autocomplete_fields = ("employee",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(WarpHistory)
 class WarpHistoryAdmin(admin.ModelAdmin):
     list_display = ("employee", "start_date", "end_date", "capacity_sarees", "remaining_display", "is_active_display")
     list_filter = ("start_date", "end_date")
+    list_select_related = ("employee",)
     search_fields = ("employee__name",)
+    autocomplete_fields = ("employee",)
+
+    def get_queryset(self, request):
+        return with_remaining_sarees(super().get_queryset(request))
 
     def remaining_display(self, obj):
-        return obj.remaining_sarees()
+        return obj.remaining
     remaining_display.short_description = "Remaining Sarees"
+    remaining_display.admin_order_field = "remaining"
 
     def is_active_display(self, obj):
         return obj.is_active()
@@ -57,11 +149,17 @@ class WarpHistoryAdmin(admin.ModelAdmin):
 class PagdiHistoryAdmin(admin.ModelAdmin):
     list_display = ("employee", "start_date", "end_date", "capacity_sarees", "remaining_display", "is_active_display")
     list_filter = ("start_date", "end_date")
+    list_select_related = ("employee",)
     search_fields = ("employee__name",)
+    autocomplete_fields = ("employee",)
+
+    def get_queryset(self, request):
+        return with_remaining_sarees(super().get_queryset(request))
 
     def remaining_display(self, obj):
-        return obj.remaining_sarees()
+        return obj.remaining
     remaining_display.short_description = "Remaining Sarees"
+    remaining_display.admin_order_field = "remaining"
 
     def is_active_display(self, obj):
         return obj.is_active()
@@ -73,24 +171,82 @@ class PagdiHistoryAdmin(admin.ModelAdmin):
 class SalaryHistoryAdmin(admin.ModelAdmin):
     list_display = ("employee", "week_start", "week_end", "sarees", "salary_rate", "advance_salary", "final_salary", "paid_status", "paid_date")
     list_filter = ("paid_status", "week_start")
+    list_select_related = ("employee",)
     search_fields = ("employee__name",)
     date_hierarchy = "week_end"
+    autocomplete_fields = ("employee",)
+
+
+@admin.register(SalaryRateHistory)
+class SalaryRateHistoryAdmin(admin.ModelAdmin):
+    list_display = ("employee", "rate", "effective_from", "admin_user", "created_at")
+    list_select_related = ("employee", "admin_user")
+    search_fields = ("employee__name",)
+    autocomplete_fields = ("employee",)
+    date_hierarchy = "effective_from"
 
 
 @admin.register(AdvanceHistory)
 class AdvanceHistoryAdmin(admin.ModelAdmin):
     list_display = ("employee", "action_type", "previous_amount", "new_amount", "admin_user", "created_at")
-    list_filter = ("action_type",)
+    list_filter = ("action_type", EmployeeInputFilter)
+    list_select_related = ("employee", "admin_user")
     search_fields = ("employee__name", "admin_user__username")
+    autocomplete_fields = ("employee",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(PagdiChangeHistory)
 class PagdiChangeHistoryAdmin(admin.ModelAdmin):
     list_display = ("employee", "action", "previous_capacity", "new_capacity", "admin_user", "created_at")
-    list_filter = ("action",)
+    list_filter = ("action", EmployeeInputFilter)
+    list_select_related = ("employee", "admin_user")
     search_fields = ("employee__name", "admin_user__username")
+    autocomplete_fields = ("employee", "pagdi")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(AlertEmail)
 class AlertEmailAdmin(admin.ModelAdmin):
     list_display = ("email",)
+
+
+@admin.register(ExhaustionAlert)
+class ExhaustionAlertAdmin(admin.ModelAdmin):
+    list_display = ("employee", "kind", "assignment_id", "level", "remaining", "forecast_date", "sent_at")
+    list_filter = ("kind", "level")
+    list_select_related = ("employee",)
+    search_fields = ("employee__name",)
+    date_hierarchy = "sent_at"
+
+
+@admin.register(AuditArchive)
+class AuditArchiveAdmin(admin.ModelAdmin):
+    list_display = ("employee", "kind", "period_start", "row_count", "summary", "created_at")
+    list_filter = ("kind", EmployeeInputFilter)
+    list_select_related = ("employee",)
+    search_fields = ("employee__name",)
+    exclude = ("payload",)
+
+    # archives are append-only; they are written by the archive_audit_log command
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(WeeklyCloseRun)
+class WeeklyCloseRunAdmin(admin.ModelAdmin):
+    list_display = ("week_start", "status", "catch_up", "salary_rows", "advance_rows", "duration", "started_at", "instance")
+    list_filter = ("status", "catch_up")
+    date_hierarchy = "week_start"
+
+    # runs are written by the scheduler only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
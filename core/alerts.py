@@ -0,0 +1,134 @@
+# core/alerts.py
+"""
+Warp/pagdi exhaustion forecasts and alert digests.
+
+forecast_exhaustion() reads every active warp and pagdi with one query per kind: the
+sarees made since the assignment started and in the last `lookback_days` are summed in
+correlated subqueries. From the recent daily rate it projects the day the assignment
+runs out. send_exhaustion_digest() emails the assignments that are exhausted or due
+within `threshold_days` to every AlertEmail address over a single connection. Each
+assignment is reported once per level; the ExhaustionAlert rows record what was sent.
+"""
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AlertEmail, ExhaustionAlert, PagdiHistory, SareeCount, WarpHistory
+
+ASSIGNMENT_MODELS = {"warp": WarpHistory, "pagdi": PagdiHistory}
+
+
+@dataclass
+class Forecast:
+    kind: str
+    assignment_id: int
+    employee_id: int
+    employee_name: str
+    capacity: int
+    remaining: int
+    daily_rate: float
+    exhausts_on: Optional[date]   # None when nothing was made recently
+
+    @property
+    def level(self):
+        return "exhausted" if self.remaining <= 0 else "low"
+
+
+def _made_between(start, end):
+    return Coalesce(Subquery(
+        SareeCount.objects.filter(employee=OuterRef("employee_id"), date__gte=start, date__lte=end)
+        .order_by().values("employee").annotate(total=Sum("count")).values("total")
+    ), Value(0))
+
+
+def forecast_exhaustion(as_of, lookback_days=14) -> List[Forecast]:
+    """
+    Forecast every active warp and pagdi (end_date is null) as of `as_of`.
+    The daily rate is the sarees made over the last `lookback_days` (or since the
+    assignment started, if later) divided by the length of that span.
+    """
+    window_start = as_of - timedelta(days=lookback_days - 1)
+    forecasts = []
+    for kind, model in ASSIGNMENT_MODELS.items():
+        rows = (
+            model.objects.filter(end_date__isnull=True, start_date__lte=as_of)
+            .annotate(
+                made=_made_between(OuterRef("start_date"), as_of),
+                recent_from=Greatest(F("start_date"), Value(window_start)),
+                recent=_made_between(Greatest(OuterRef("start_date"), Value(window_start)), as_of),
+            )
+            .order_by("id")
+            .values_list("id", "employee_id", "employee__name", "capacity_sarees", "made", "recent_from", "recent")
+        )
+        for pk, emp_id, name, capacity, made, recent_from, recent in rows:
+            remaining = capacity - made
+            days = (as_of - recent_from).days + 1
+            rate = recent / days if recent > 0 else 0.0
+            if remaining <= 0:
+                exhausts_on = as_of
+            elif rate > 0:
+                exhausts_on = as_of + timedelta(days=math.ceil(remaining / rate))
+            else:
+                exhausts_on = None
+            forecasts.append(Forecast(kind, pk, emp_id, name, capacity, remaining, round(rate, 2), exhausts_on))
+    return forecasts
+
+
+def due_alerts(forecasts, as_of, threshold_days=3):
+    """Forecasts that are exhausted or due within threshold_days and were not reported at that level."""
+    horizon = as_of + timedelta(days=threshold_days)
+    due = [f for f in forecasts if f.exhausts_on is not None and f.exhausts_on <= horizon]
+    if not due:
+        return []
+    sent_q = Q()
+    for f in due:
+        sent_q |= Q(kind=f.kind, assignment_id=f.assignment_id, level=f.level)
+    sent = set(ExhaustionAlert.objects.filter(sent_q).values_list("kind", "assignment_id", "level"))
+    return [f for f in due if (f.kind, f.assignment_id, f.level) not in sent]
+
+
+def render_digest(alerts, as_of):
+    lines = [f"Warp/pagdi status as of {as_of:%d %b %Y}", ""]
+    for f in sorted(alerts, key=lambda f: (f.exhausts_on, f.kind, f.employee_name)):
+        if f.level == "exhausted":
+            status = f"EXHAUSTED ({-f.remaining} over capacity)" if f.remaining < 0 else "EXHAUSTED"
+        else:
+            status = f"{f.remaining} sarees left, ~{f.daily_rate}/day, runs out around {f.exhausts_on:%d %b}"
+        lines.append(f"- {f.employee_name}: {f.kind.title()} #{f.assignment_id} ({f.capacity} sarees) — {status}")
+    return "\n".join(lines) + "\n"
+
+
+def send_exhaustion_digest(as_of, threshold_days=3, lookback_days=14, dry_run=False):
+    """
+    Email one digest per AlertEmail recipient listing the newly due alerts, reusing one
+    mail connection for all recipients, and record them as sent.
+    Returns (alerts, number of emails sent). Nothing is recorded when there are no
+    recipients, so the alerts go out once someone is subscribed.
+    """
+    alerts = due_alerts(forecast_exhaustion(as_of, lookback_days), as_of, threshold_days)
+    recipients = list(AlertEmail.objects.order_by("email").values_list("email", flat=True))
+    if dry_run or not alerts or not recipients:
+        return alerts, 0
+
+    subject = f"[Server Loom] {len(alerts)} warp/pagdi assignment{'s' if len(alerts) != 1 else ''} need attention"
+    body = render_digest(alerts, as_of)
+    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
+    with get_connection() as connection:
+        messages = [EmailMessage(subject, body, from_email, [to], connection=connection) for to in recipients]
+        sent = connection.send_messages(messages) or 0
+
+    ExhaustionAlert.objects.bulk_create(
+        [
+            ExhaustionAlert(kind=f.kind, assignment_id=f.assignment_id, level=f.level,
+                            employee_id=f.employee_id, remaining=f.remaining, forecast_date=f.exhausts_on)
+            for f in alerts
+        ],
+        ignore_conflicts=True,
+    )
+    return alerts, sent
@@ -0,0 +1,172 @@
+# core/audit.py
+"""
+Archival of old audit rows (AdvanceHistory, PagdiChangeHistory).
+
+archive_audit_rows() moves rows older than the retention window into AuditArchive: one
+append-only row per (kind, employee, month) holding the original rows as gzipped JSON
+lines plus a summary (row count, opening/closing values, net change) so per-employee
+running totals stay answerable without decompressing anything.
+
+audit_rows() is the read API for auditors and for code that walks the trail: it returns
+archived and live rows merged into one chronologically ordered list.
+"""
+import gzip
+import json
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import AdvanceHistory, AuditArchive, PagdiChangeHistory
+
+AUDIT_MODELS = {"advance": AdvanceHistory, "pagdi_change": PagdiChangeHistory}
+EMPLOYEES_PER_BATCH = 200
+
+
+def audit_fields(model):
+    """Column names stored for each archived row."""
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+def _summarize(kind, rows):
+    if kind == "advance":
+        return {
+            "opening_balance": rows[0]["previous_amount"],
+            "closing_balance": rows[-1]["new_amount"],
+            "net_change": sum(r["new_amount"] - r["previous_amount"] for r in rows),
+            "actions": dict(Counter(r["action_type"] for r in rows)),
+        }
+    capacities = [r["new_capacity"] for r in rows if r["new_capacity"] is not None]
+    return {
+        "closing_capacity": capacities[-1] if capacities else None,
+        "pagdi_ids": sorted({r["pagdi_id"] for r in rows if r["pagdi_id"] is not None}),
+        "actions": dict(Counter(r["action"] for r in rows)),
+    }
+
+
+def _pack(rows):
+    lines = "\n".join(json.dumps(r, default=str, sort_keys=True) for r in rows)
+    return gzip.compress(lines.encode("utf-8"))
+
+
+def unpack(archive):
+    """Decode an AuditArchive payload back into row dicts (datetimes/dates parsed)."""
+    model = AUDIT_MODELS[archive.kind]
+    date_fields = {f.attname for f in model._meta.concrete_fields if f.get_internal_type() == "DateField"}
+    rows = []
+    for line in gzip.decompress(bytes(archive.payload)).decode("utf-8").splitlines():
+        row = json.loads(line)
+        for name in ("created_at", "updated_at"):
+            row[name] = parse_datetime(row[name])
+        for name in date_fields:
+            if row.get(name):
+                row[name] = parse_date(row[name])
+        row["archived"] = True
+        rows.append(row)
+    return rows
+
+
+def archive_cutoff(retention_days, now=None):
+    """Start of the local month containing now - retention_days; only whole months are archived."""
+    local = timezone.localtime(now or timezone.now()) - timedelta(days=retention_days)
+    return local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def archive_audit_rows(kind, before, dry_run=False):
+    """
+    Move every `kind` audit row created before `before` into AuditArchive.
+    Employees are processed in batches, each in its own transaction, so an interrupted
+    run leaves only fully archived (employee, month) groups behind.
+    Returns (rows archived, archive rows created).
+    Raises:
+        ValueError for an unknown kind.
+    """
+    if kind not in AUDIT_MODELS:
+        raise ValueError(f"Unknown audit kind {kind!r}")
+    model = AUDIT_MODELS[kind]
+    old = model.objects.filter(created_at__lt=before)
+    if dry_run:
+        return old.count(), 0
+    employee_ids = sorted(set(old.values_list("employee_id", flat=True)))
+
+    moved = created = 0
+    fields = audit_fields(model)
+    for i in range(0, len(employee_ids), EMPLOYEES_PER_BATCH):
+        chunk = employee_ids[i:i + EMPLOYEES_PER_BATCH]
+        with transaction.atomic():
+            rows = list(old.filter(employee_id__in=chunk).order_by("employee_id", "created_at", "id").values(*fields))
+            groups = defaultdict(list)
+            for r in rows:
+                month = timezone.localtime(r["created_at"]).date().replace(day=1)
+                groups[(r["employee_id"], month)].append(r)
+            AuditArchive.objects.bulk_create([
+                AuditArchive(
+                    kind=kind, employee_id=emp_id, period_start=month,
+                    first_at=group[0]["created_at"], last_at=group[-1]["created_at"],
+                    row_count=len(group), summary=_summarize(kind, group), payload=_pack(group),
+                )
+                for (emp_id, month), group in groups.items()
+            ])
+            model.objects.filter(id__in=[r["id"] for r in rows]).delete()
+        moved += len(rows)
+        created += len(groups)
+    return moved, created
+
+
+def audit_rows(kind, employee_ids=None, since=None, until=None):
+    """
+    Audit rows of `kind` from both the archive and the live table, oldest first
+    (ordered by employee_id, created_at, id), optionally limited to employees and to
+    since <= created_at < until. Archived rows carry "archived": True.
+    """
+    model = AUDIT_MODELS[kind]
+    live = model.objects.all()
+    archives = AuditArchive.objects.filter(kind=kind)
+    if employee_ids is not None:
+        employee_ids = list(employee_ids)
+        live = live.filter(employee_id__in=employee_ids)
+        archives = archives.filter(employee_id__in=employee_ids)
+    if since is not None:
+        live = live.filter(created_at__gte=since)
+        archives = archives.filter(last_at__gte=since)
+    if until is not None:
+        live = live.filter(created_at__lt=until)
+        archives = archives.filter(first_at__lt=until)
+
+    rows = []
+    for archive in archives.order_by("employee_id", "first_at"):
+        rows.extend(
+            r for r in unpack(archive)
+            if (since is None or r["created_at"] >= since) and (until is None or r["created_at"] < until)
+        )
+    for r in live.order_by().values(*audit_fields(model)):
+        r["archived"] = False
+        rows.append(r)
+    rows.sort(key=lambda r: (r["employee_id"], r["created_at"], r["id"]))
+    return rows
+
+
+def advance_balance_lookup(rows, current):
+    """
+    Balance lookup over an advance trail (rows from audit_rows("advance", ...)) and the
+    live balances {employee_id: advance_salary}.
+
+    The balance at instant T is the previous_amount of the first audit row recorded at or
+    after T; with no later row it is the employee's current advance_salary.
+    Returns a function (employee_id, T) -> balance.
+    """
+    trail = {}
+    for row in rows:
+        times, amounts = trail.setdefault(row["employee_id"], ([], []))
+        times.append(row["created_at"])
+        amounts.append(row["previous_amount"])
+
+    def balance_at(emp_id, at):
+        times, amounts = trail.get(emp_id, ((), ()))
+        i = bisect_left(times, at)
+        return int(amounts[i] if i < len(times) else current.get(emp_id) or 0)
+
+    return balance_at
@@ -0,0 +1,110 @@
+# core/backfill.py
+"""
+Chunked, resumable backfills for RunPython migrations and management commands.
+
+backfill() walks a queryset in primary-key order, `chunk_size` rows at a time, and runs
+one set-based UPDATE per chunk in its own short transaction instead of saving rows one
+by one inside a single long transaction. With a `name`, the last processed pk is
+committed with every chunk to BackfillProgress, so an interrupted run picks up where it
+stopped and a finished one is skipped.
+
+In a migration, declare `atomic = False` on the Migration so each chunk commits, and
+pass the historical progress model:
+
+    def forwards(apps, schema_editor):
+        Row = apps.get_model("core", "SareeCount")
+        backfill(Row.objects.filter(rate__isnull=True), {"rate": 0}, name="core.sareecount.rate",
+                 progress_model=apps.get_model("core", "BackfillProgress"), log=print)
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class BackfillResult:
+    rows: int
+    chunks: int
+    seconds: float
+    skipped: bool = False
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def backfill(
+    queryset,
+    update: Union[dict, Callable],
+    *,
+    name: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress_model=None,
+    reset: bool = False,
+    log: Optional[Callable[[str], None]] = None,
+) -> BackfillResult:
+    """
+    Apply `update` to every row of `queryset`, chunk by chunk in pk order.
+
+    `update` is either a dict of field values/expressions for QuerySet.update(), or a
+    callable taking the chunk's queryset and returning the number of rows it changed
+    (for set-based work update() cannot express). Rows created behind the cursor while
+    the backfill runs are not revisited.
+    Raises:
+        ValueError if chunk_size is not positive.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    if progress_model is None and name is not None:
+        from .models import BackfillProgress as progress_model
+    db = queryset.db
+    apply = update if callable(update) else (lambda chunk: chunk.update(**update))
+    say = log or (lambda msg: None)
+
+    last_pk, rows = 0, 0
+    if name is not None:
+        progress, _ = progress_model.objects.using(db).get_or_create(name=name)
+        if reset:
+            progress.last_pk, progress.rows_done, progress.finished_at = 0, 0, None
+            progress.save(using=db)
+        elif progress.finished_at:
+            say(f"{name}: already finished ({progress.rows_done} rows), skipping")
+            return BackfillResult(0, 0, 0.0, skipped=True)
+        last_pk, rows = progress.last_pk, progress.rows_done
+        if last_pk:
+            say(f"{name}: resuming after pk {last_pk} ({rows} rows done)")
+
+    label = name or queryset.model._meta.label
+    ordered = queryset.order_by("pk")
+    started = time.monotonic()
+    chunks, resumed_rows = 0, rows
+    while True:
+        # upper pk of the next chunk; the OFFSET only skips rows of this chunk (pk > last_pk)
+        bound = list(ordered.filter(pk__gt=last_pk).values_list("pk", flat=True)[chunk_size - 1:chunk_size])
+        if not bound:
+            bound = list(ordered.filter(pk__gt=last_pk).reverse().values_list("pk", flat=True)[:1])
+            if not bound:
+                break
+        upper = bound[0]
+        with transaction.atomic(using=db):
+            changed = apply(queryset.filter(pk__gt=last_pk, pk__lte=upper))
+            last_pk, rows, chunks = upper, rows + (changed or 0), chunks + 1
+            if name is not None:
+                progress_model.objects.using(db).filter(name=name).update(
+                    last_pk=last_pk, rows_done=rows, updated_at=timezone.now()
+                )
+        elapsed = time.monotonic() - started
+        say(f"{label}: {rows} rows, pk <= {last_pk}, {(rows - resumed_rows) / elapsed if elapsed else 0:,.0f} rows/s")
+
+    if name is not None:
+        progress_model.objects.using(db).filter(name=name).update(finished_at=timezone.now(), updated_at=timezone.now())
+    # rows/chunks/seconds describe this run only (not the part done before a resume)
+    result = BackfillResult(rows - resumed_rows, chunks, time.monotonic() - started)
+    say(f"{label}: done, {rows} rows in total; {result.rows} in {result.chunks} chunks this run, "
+        f"{result.seconds:.1f}s ({result.rows_per_second:,.0f} rows/s)")
+    return result
@@ -0,0 +1,98 @@
+# core/conditional.py
+"""
+Conditional GET (ETag / 304 Not Modified) for pages and exports.
+
+A view wrapped in @conditional_get(probe) first runs probe(request, *args, **kwargs):
+a few aggregate queries (table_version) that change whenever anything the view
+renders changes. The ETag is a hash of the probe values plus the user, the CSRF
+secret embedded in forms, and today's date (pages show the current week). When the
+client's If-None-Match matches, the view is skipped and a 304 is returned.
+
+- Every write to SareeCount, PagdiHistory, WarpHistory or SalaryHistory bumps
+  Employee.data_version, so Sum("data_version") over employees stands in for probing
+  those (large) tables directly.
+- Deleting a row does not move max(updated_at), so Last-Modified is sent for
+  information only; revalidation always goes through the ETag.
+- Responses are marked `private, no-cache`: browsers keep them but revalidate on
+  every use instead of guessing a freshness lifetime.
+- Requests with pending flash messages are never answered with a 304, so the
+  messages are shown.
+"""
+import functools
+import hashlib
+from datetime import datetime
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def table_version(queryset, *extra):
+    """
+    (count, max(updated_at), *extra aggregates) of `queryset`, in one query.
+    """
+    aggregates = {"rows": Count("pk"), "updated": Max("updated_at")}
+    aggregates.update({f"extra{i}": expression for i, expression in enumerate(extra)})
+    values = queryset.order_by().aggregate(**aggregates)
+    return tuple(values[name] for name in aggregates)
+
+
+def _validators(probe, request, args, kwargs):
+    """(etag, last_modified timestamp) for the request, or (None, None) to skip."""
+    if request.method not in SAFE_METHODS or len(get_messages(request)):
+        return None, None
+    versions = probe(request, *args, **kwargs)
+    if versions is None:
+        return None, None
+    values = [v for version in versions for v in (version if isinstance(version, tuple) else (version,))]
+    key = repr((
+        getattr(request.user, "pk", None),
+        request.META.get("CSRF_COOKIE"),
+        timezone.localdate().isoformat(),
+        values,
+    ))
+    etag = f'W/"{hashlib.md5(key.encode("utf-8"), usedforsecurity=False).hexdigest()}"'
+    stamps = [v for v in values if isinstance(v, datetime)]
+    return etag, int(max(stamps).timestamp()) if stamps else None
+
+
+def _finish(request, response, etag, last_modified):
+    if etag:
+        response.headers.setdefault("ETag", etag)
+        if last_modified and not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_get(probe):
+    """
+    Answer GET/HEAD requests for a view (sync or async) with 304 Not Modified when
+    the ETag derived from probe(request, *args, **kwargs) matches If-None-Match.
+    The probe returns a list of table_version() tuples or plain values, or None to
+    skip conditional handling. Place it under @replica_reads so the probe reads from
+    the same database as the view.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                etag, last_modified = await sync_to_async(_validators)(probe, request, args, kwargs)
+                response = get_conditional_response(request, etag=etag) if etag else None
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(request, response, etag, last_modified)
+            markcoroutinefunction(wrapper)
+        else:
+            def wrapper(request, *args, **kwargs):
+                etag, last_modified = _validators(probe, request, args, kwargs)
+                response = get_conditional_response(request, etag=etag) if etag else None
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _finish(request, response, etag, last_modified)
+        return functools.wraps(view)(wrapper)
+    return decorator
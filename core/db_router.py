@@ -0,0 +1,110 @@
+# core/db_router.py
+"""
+Primary/replica routing.
+
+With REPLICA_DATABASE_URL set, settings add a "replica" database alias. Reads only go
+there from views wrapped in @replica_reads (reports, history pages, dashboards,
+exports); everything else, including every write, reads from and writes to "default".
+
+- Queries inside an atomic block on the primary stay on the primary, so the
+  transactional services in core.services never read from the replica.
+- PrimaryPinMiddleware sets a short-lived cookie after any unsafe request (POST, ...);
+  while it is present @replica_reads views read from the primary, so a user sees
+  their own writes despite replication lag.
+
+Locally, point REPLICA_DATABASE_URL at the same database as DATABASE_URL to run with
+two aliases; tests get a "replica" alias mirroring "default" (REPLICA_READS enables it).
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest
+from django.utils.decorators import sync_and_async_middleware
+
+REPLICA_ALIAS = "replica"
+PIN_COOKIE = "db_primary_pin"
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def replica_enabled():
+    return bool(settings.REPLICA_READS) and REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    """Route reads in this block to the replica (when one is configured)."""
+    token = _replica_reads.set(enabled and replica_enabled())
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_primary():
+    """Force reads in this block back to the primary, e.g. inside a @replica_reads view."""
+    return read_from_replica(False)
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES
+
+
+def replica_reads(view):
+    """
+    Let a read-only view (sync or async) read from the replica, unless the request is
+    pinned to the primary after a recent write.
+    """
+    if iscoroutinefunction(view):
+        async def wrapper(request, *args, **kwargs):
+            with read_from_replica(not is_pinned(request)):
+                return await view(request, *args, **kwargs)
+        markcoroutinefunction(wrapper)
+    else:
+        def wrapper(request, *args, **kwargs):
+            with read_from_replica(not is_pinned(request)):
+                return view(request, *args, **kwargs)
+    return functools.wraps(view)(wrapper)
+
+
+@sync_and_async_middleware
+def PrimaryPinMiddleware(get_response):
+    """Pin the client to the primary for REPLICA_PIN_SECONDS after an unsafe request."""
+
+    def pin(request: HttpRequest, response):
+        if request.method in UNSAFE_METHODS and replica_enabled():
+            response.set_cookie(PIN_COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax")
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return pin(request, await get_response(request))
+        markcoroutinefunction(middleware)
+    else:
+        def middleware(request):
+            return pin(request, get_response(request))
+    return middleware
+
+
+class PrimaryReplicaRouter:
+    """Sends reads to the replica only inside read_from_replica() and outside transactions."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
@@ -0,0 +1,33 @@
+# core/management/commands/_plans.py
+import json
+
+from django.core.management.base import CommandError
+
+
+def write_plan(command, plan, path):
+    """Write a plan as JSON to path ("-" for stdout)."""
+    text = json.dumps(plan, indent=2)
+    if path == "-":
+        command.stdout.write(text)
+        return
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    command.stdout.write(f"Plan written to {path}")
+
+
+def read_plan(path, kind):
+    """Load a JSON plan from path and check that it is of the expected kind."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            plan = json.load(fh)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Cannot read plan {path}: {e}")
+    if plan.get("kind") != kind:
+        raise CommandError(f"{path} is a {plan.get('kind')!r} plan, expected {kind!r}")
+    return plan
+
+
+def print_updates(command, plan):
+    """List per-employee before/after values of a plan (shown with --verbosity 2)."""
+    for u in plan["employee_updates"]:
+        command.stdout.write(f"  employee {u['employee_id']}: {u['field']} {u['before']} -> {u['after']}")
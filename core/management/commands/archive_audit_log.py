@@ -0,0 +1,25 @@
+# core/management/commands/archive_audit_log.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core.audit import AUDIT_MODELS, archive_audit_rows, archive_cutoff
+
+class Command(BaseCommand):
+    help = "Move AdvanceHistory/PagdiChangeHistory rows older than the retention window into the compressed audit archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retention-days", type=int, default=180, help="Keep at least this many days of rows live (default 180).")
+        parser.add_argument("--kind", choices=sorted(AUDIT_MODELS) + ["all"], default="all", help="Which audit log to archive (default all).")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would be archived.")
+
+    def handle(self, *args, **options):
+        if options["retention_days"] < 31:
+            raise CommandError("--retention-days must be at least 31.")
+        before = archive_cutoff(options["retention_days"])
+        kinds = sorted(AUDIT_MODELS) if options["kind"] == "all" else [options["kind"]]
+
+        for kind in kinds:
+            moved, created = archive_audit_rows(kind, before, dry_run=options["dry_run"])
+            if options["dry_run"]:
+                self.stdout.write(self.style.NOTICE(f"Dry run — {moved} {kind} rows before {before:%Y-%m-%d} would be archived."))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Archived {moved} {kind} rows before {before:%Y-%m-%d} into {created} archive entries."))
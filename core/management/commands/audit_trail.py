@@ -0,0 +1,40 @@
+# core/management/commands/audit_trail.py
+import csv
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.audit import AUDIT_MODELS, audit_fields, audit_rows
+from core.models import Employee
+
+class Command(BaseCommand):
+    help = "Print an employee's full audit trail (archived and live rows) as CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("employee_id", type=int)
+        parser.add_argument("--kind", choices=sorted(AUDIT_MODELS), default="advance", help="Audit log to read (default advance).")
+        parser.add_argument("--from", dest="start", type=str, help="First day to include (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="end", type=str, help="Last day to include (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        if not Employee.objects.filter(id=options["employee_id"]).exists():
+            raise CommandError(f"Employee {options['employee_id']} does not exist.")
+        try:
+            since = self._bound(options["start"], 0)
+            until = self._bound(options["end"], 1)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        kind = options["kind"]
+        columns = audit_fields(AUDIT_MODELS[kind]) + ["archived"]
+        writer = csv.DictWriter(self.stdout, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in audit_rows(kind, [options["employee_id"]], since=since, until=until):
+            writer.writerow(row)
+
+    def _bound(self, value, days_after):
+        if not value:
+            return None
+        day = date.fromisoformat(value) + timedelta(days=days_after)
+        return timezone.make_aware(datetime.combine(day, time.min))
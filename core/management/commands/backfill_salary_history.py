@@ -0,0 +1,57 @@
+# core/management/commands/backfill_salary_history.py
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core import services
+from ._plans import write_plan, read_plan
+
+class Command(BaseCommand):
+    help = "Create missing SalaryHistory rows for every week in a date range in one pass (skips existing weeks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", type=str, required=True, help="First date (YYYY-MM-DD); its whole week is included.")
+        parser.add_argument("--to", dest="end", type=str, help="Last date (YYYY-MM-DD); its whole week is included. Defaults to the end of last week.")
+        parser.add_argument("--note", type=str, default="", help="Optional note to store in SalaryHistory notes.")
+        parser.add_argument("--dry-run", action="store_true", help="Compute the missing rows read-only and report them.")
+        parser.add_argument("--plan-out", type=str, help="With --dry-run, write the computed plan as JSON to this path ('-' for stdout).")
+        parser.add_argument("--apply-plan", type=str, help="Apply a JSON plan previously written with --plan-out, exactly as recorded.")
+
+    def handle(self, *args, **options):
+        if options.get("apply_plan"):
+            plan = read_plan(options["apply_plan"], "salary_backfill")
+            try:
+                result = services.apply_plan(plan, admin_user=None)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Applied plan: SalaryHistory rows created: {result['created']}"))
+            return
+
+        try:
+            start = datetime.strptime(options["start"], "%Y-%m-%d").date()
+            if options.get("end"):
+                end = datetime.strptime(options["end"], "%Y-%m-%d").date()
+            else:
+                this_monday, _ = services.get_week_bounds(timezone.localdate())
+                end = this_monday - timedelta(days=1)
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        note = options.get("note", "")
+        try:
+            if options.get("dry_run"):
+                plan = services.plan_salary_backfill(start, end, notes=note)
+                if options["verbosity"] >= 2:
+                    for c in plan["salary_history_create"]:
+                        self.stdout.write(f"  employee {c['employee_id']}: week {c['week_start']} {c['sarees']} sarees, final {c['final_salary']}")
+                if options.get("plan_out"):
+                    write_plan(self, plan, options["plan_out"])
+                self.stdout.write(self.style.SUCCESS(
+                    f"DRY RUN: would create {len(plan['salary_history_create'])} SalaryHistory rows "
+                    f"for weeks {plan['week_start']} to {plan['week_end']} (no DB changes)."
+                ))
+                return
+            created = services.backfill_salary_history(start, end, admin_user=None, notes=note)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Backfilled salary history. SalaryHistory rows created: {created}"))
@@ -0,0 +1,24 @@
+# core/management/commands/backfill_status.py
+from django.core.management.base import BaseCommand, CommandError
+from core.models import BackfillProgress
+
+class Command(BaseCommand):
+    help = "List chunked backfill checkpoints, or forget one with --reset so it runs again from the start."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", type=str, metavar="NAME", help="Delete the checkpoint of the named backfill.")
+
+    def handle(self, *args, **options):
+        if options.get("reset"):
+            deleted, _ = BackfillProgress.objects.filter(name=options["reset"]).delete()
+            if not deleted:
+                raise CommandError(f"No backfill named {options['reset']!r}.")
+            self.stdout.write(self.style.SUCCESS(f"Checkpoint {options['reset']!r} removed."))
+            return
+
+        rows = list(BackfillProgress.objects.all())
+        if not rows:
+            self.stdout.write(self.style.NOTICE("No backfills recorded."))
+        for p in rows:
+            state = f"finished {p.finished_at:%Y-%m-%d %H:%M}" if p.finished_at else f"in progress, next pk > {p.last_pk}"
+            self.stdout.write(f"{p.name}: {p.rows_done} rows, {state} (updated {p.updated_at:%Y-%m-%d %H:%M})")
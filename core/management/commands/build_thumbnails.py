@@ -0,0 +1,28 @@
+# core/management/commands/build_thumbnails.py
+from django.core.management.base import BaseCommand
+from core.models import Employee
+from core.thumbnails import build_thumbnails
+
+class Command(BaseCommand):
+    help = "Generate profile picture thumbnails for employees that do not have them yet (or all with --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild thumbnails for every employee with a picture.")
+
+    def handle(self, *args, **options):
+        employees = Employee.objects.exclude(profile_picture="").exclude(profile_picture__isnull=True)
+        if not options["all"]:
+            employees = employees.filter(profile_thumbnails={})
+
+        done = failed = 0
+        for emp_id in employees.values_list("id", flat=True).iterator():
+            try:
+                build_thumbnails(emp_id)
+                done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Employee {emp_id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Built thumbnails for {done} employees."))
+        if failed:
+            self.stdout.write(self.style.NOTICE(f"{failed} pictures could not be processed."))
@@ -0,0 +1,27 @@
+# core/management/commands/bulk_advance.py
+from django.core.management.base import BaseCommand, CommandError
+from core import services
+from core.models import Employee
+
+class Command(BaseCommand):
+    help = "Give advances to many employees at once from a CSV file (employee_id,amount[,note])."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", type=str, help="Path to CSV file with header employee_id,amount[,note].")
+        parser.add_argument("--note", type=str, default="", help="Default note for rows without their own note.")
+
+    def handle(self, *args, **options):
+        path = options["csv_path"]
+        note = options.get("note", "")
+
+        try:
+            with open(path, newline="", encoding="utf-8") as fh:
+                rows = services.parse_bulk_advance_csv(fh)
+            history = services.give_advances_bulk(rows, admin_user=None, note=note)
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        except (ValueError, Employee.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        total = sum(h.new_amount - h.previous_amount for h in history)
+        self.stdout.write(self.style.SUCCESS(f"Gave {len(history)} advances totalling ₹{total}."))
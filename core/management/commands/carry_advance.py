@@ -1,14 +1,16 @@
 # core/management/commands/carry_advance.py
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from core import services
-from django.db import transaction
+from ._plans import write_plan, read_plan, print_updates
 
 class Command(BaseCommand):
     help = "Carry outstanding advances to next week (audit each change)."
 
     def add_arguments(self, parser):
         parser.add_argument("--factor", type=float, default=1.0, help="Carry factor: fraction of outstanding advance to carry (1.0 => full).")
-        parser.add_argument("--dry-run", action="store_true", help="Don't write changes; just report how many would be processed.")
+        parser.add_argument("--dry-run", action="store_true", help="Compute the changes read-only (no locks, no writes) and report them.")
+        parser.add_argument("--plan-out", type=str, help="With --dry-run, write the computed plan as JSON to this path ('-' for stdout).")
+        parser.add_argument("--apply-plan", type=str, help="Apply a JSON plan previously written with --plan-out, exactly as recorded.")
         parser.add_argument("--note", type=str, default="", help="Optional note to store in AdvanceHistory entries.")
 
     def handle(self, *args, **options):
@@ -16,19 +18,26 @@ class Command(BaseCommand):
         dry = options.get("dry_run", False)
         note = options.get("note", "")
 
-        if dry:
-            # Safe dry-run: run inside a transaction and rollback at the end.
-            self.stdout.write(self.style.NOTICE("DRY RUN: no DB writes will be performed. Performing simulated run..."))
+        if options.get("apply_plan"):
+            plan = read_plan(options["apply_plan"], "carry_advance")
             try:
-                with transaction.atomic():
-                    processed = services.carry_advances_to_next_week(carry_factor=factor, admin_user=None, note=note)
-                    # Rollback by raising a controlled exception to undo writes.
-                    raise RuntimeError("DRY_RUN_ROLLBACK")
-            except RuntimeError as e:
-                if str(e) == "DRY_RUN_ROLLBACK":
-                    self.stdout.write(self.style.SUCCESS(f"DRY RUN: would process approximately {processed} employees. (No DB changes committed)"))
-                    return
-                raise
+                result = services.apply_plan(plan, admin_user=None)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Applied plan: {result['updated']} advances changed, {result['created']} history rows created."))
+            return
+
+        if dry:
+            plan = services.plan_carry_advances(carry_factor=factor, note=note)
+            self.stdout.write(self.style.NOTICE("DRY RUN: computed read-only, no DB writes or locks."))
+            if options["verbosity"] >= 2:
+                print_updates(self, plan)
+            if options.get("plan_out"):
+                write_plan(self, plan, options["plan_out"])
+            self.stdout.write(self.style.SUCCESS(
+                f"DRY RUN: would process {len(plan['advance_history_create'])} employees, "
+                f"changing {len(plan['employee_updates'])} advances (carry_factor={factor})."
+            ))
         else:
             processed = services.carry_advances_to_next_week(carry_factor=factor, admin_user=None, note=note)
             self.stdout.write(self.style.SUCCESS(f"Processed {processed} advances (carry_factor={factor})."))
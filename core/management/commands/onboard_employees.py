@@ -0,0 +1,42 @@
+# core/management/commands/onboard_employees.py
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.onboarding import fork_start_method, onboard_employees, parse_onboarding_csv
+
+class Command(BaseCommand):
+    help = "Create approved employees and their logins from a CSV file (name,phone,rate[,password])."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", type=str, help="Path to CSV file with header name,phone,rate[,password].")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Password hashing processes (default: CPU count; 1 hashes in-process).")
+        parser.add_argument("--credentials-out", type=str, default="-", help="Where to write phone,password for the new logins (default: stdout).")
+
+    def handle(self, *args, **options):
+        path = options["csv_path"]
+        if options["workers"] < 1:
+            raise CommandError("--workers must be positive.")
+
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as fh:
+                rows = parse_onboarding_csv(fh)
+            # a management command is single-threaded, so forking the pool is safe here
+            created = onboard_employees(rows, workers=options["workers"], start_method=fork_start_method())
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        out = options["credentials_out"]
+        fh = self.stdout if out == "-" else open(out, "w", newline="", encoding="utf-8")
+        try:
+            writer = csv.writer(fh, lineterminator="\n")
+            writer.writerow(["name", "phone", "password"])
+            for emp, password in created:
+                writer.writerow([emp.name, emp.phone, password])
+        finally:
+            if fh is not self.stdout:
+                fh.close()
+        self.stdout.write(self.style.SUCCESS(f"Onboarded {len(created)} employees (approved)."))
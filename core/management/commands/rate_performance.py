@@ -0,0 +1,33 @@
+# core/management/commands/rate_performance.py
+from datetime import date
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.performance import compute_performance, refresh_performance
+
+class Command(BaseCommand):
+    help = "Recompute Employee.performance from saree output over the last N weeks (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--weeks", type=int, default=12, help="Length of the rating window in weeks (default 12).")
+        parser.add_argument("--as-of", type=str, help="Last day of the window (YYYY-MM-DD, default today).")
+        parser.add_argument("--dry-run", action="store_true", help="Show the rating distribution without saving.")
+
+    def handle(self, *args, **options):
+        try:
+            as_of = date.fromisoformat(options["as_of"]) if options.get("as_of") else timezone.localdate()
+            if options["dry_run"]:
+                results, updated = compute_performance(as_of, options["weeks"]), 0
+            else:
+                results, updated = refresh_performance(as_of, options["weeks"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        counts = Counter(r["rating"] for r in results.values())
+        summary = ", ".join(f"{label}: {n}" for label, n in counts.most_common())
+        if options["dry_run"]:
+            self.stdout.write(self.style.NOTICE(f"Dry run — {len(results)} employees rated ({summary})."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rated {len(results)} employees ({summary}); {updated} changed."))
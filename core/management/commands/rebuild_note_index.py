@@ -0,0 +1,16 @@
+# core/management/commands/rebuild_note_index.py
+from django.core.management.base import BaseCommand
+
+from core.note_search import NOTE_SOURCES, rebuild_note_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text note search index from the source tables (e.g. after bulk imports that skipped signals)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=sorted(NOTE_SOURCES), action="append",
+                            help="Only rebuild this kind of record (repeatable; default all).")
+
+    def handle(self, *args, **options):
+        rows = rebuild_note_index(kinds=options["kind"], log=lambda msg: self.stdout.write(msg))
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} notes."))
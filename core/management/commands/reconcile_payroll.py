@@ -0,0 +1,54 @@
+# core/management/commands/reconcile_payroll.py
+import json
+import os
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from core import services
+from core.reconcile import DEFAULT_CHUNK_SIZE, reconcile_payroll
+from ._plans import write_plan, read_plan
+
+class Command(BaseCommand):
+    help = ("Check SalaryHistory rows, advance balances and the AdvanceHistory trail against raw saree entries; "
+            "write a JSON discrepancy report and optionally a repair plan.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count; 1 runs in-process).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"Employees per work unit (default {DEFAULT_CHUNK_SIZE}).")
+        parser.add_argument("--employee", type=int, action="append", help="Only check this employee id (repeatable).")
+        parser.add_argument("--through", type=str, help="Last day of the newest closed week (YYYY-MM-DD, default last Sunday).")
+        parser.add_argument("--report", type=str, default="-", help="Write the JSON report to this path ('-' for stdout, the default).")
+        parser.add_argument("--plan-out", type=str, help="Write the repair plan as JSON to this path ('-' for stdout).")
+        parser.add_argument("--apply-plan", type=str, help="Apply a repair plan previously written with --plan-out.")
+
+    def handle(self, *args, **options):
+        if options.get("apply_plan"):
+            plan = read_plan(options["apply_plan"], "reconcile")
+            try:
+                result = services.apply_plan(plan, admin_user=None)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Applied repair plan: {result['updated']} values corrected, {result['created']} rows created."))
+            return
+
+        try:
+            through = date.fromisoformat(options["through"]) if options.get("through") else None
+            started = time.monotonic()
+            report, plan = reconcile_payroll(options.get("employee"), through, options["chunk_size"], options["workers"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - started
+
+        if options["report"] == "-":
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            with open(options["report"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+        if options.get("plan_out"):
+            write_plan(self, plan, options["plan_out"])
+
+        summary = ", ".join(f"{check}: {n}" for check, n in sorted(report["summary"].items())) or "no discrepancies"
+        style = self.style.NOTICE if report["discrepancies"] else self.style.SUCCESS
+        # status line goes to stderr so --report - stays valid JSON on stdout
+        self.stderr.write(style(f"Checked {report['employees_checked']} employees through {report['through']} in {elapsed:.1f}s ({summary})."))
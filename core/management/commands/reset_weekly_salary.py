@@ -1,8 +1,7 @@
 # core/management/commands/reset_weekly_salary.py
-from django.core.management.base import BaseCommand
-from django.utils import timezone
+from django.core.management.base import BaseCommand, CommandError
 from core import services
-from django.db import transaction
+from ._plans import write_plan, read_plan, print_updates
 
 class Command(BaseCommand):
     help = "Archive this week's salaries into SalaryHistory and reset live running payroll fields (idempotent)."
@@ -10,7 +9,9 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--date", type=str, help="Date (YYYY-MM-DD) to use to compute the week. Defaults to today.")
         parser.add_argument("--note", type=str, help="Optional note to store in SalaryHistory notes", default="Weekly automated reset")
-        parser.add_argument("--dry-run", action="store_true", help="Don't write any changes, just report counts")
+        parser.add_argument("--dry-run", action="store_true", help="Compute the changes read-only (no locks, no writes) and report them.")
+        parser.add_argument("--plan-out", type=str, help="With --dry-run, write the computed plan as JSON to this path ('-' for stdout).")
+        parser.add_argument("--apply-plan", type=str, help="Apply a JSON plan previously written with --plan-out, exactly as recorded.")
 
     def handle(self, *args, **options):
         note = options.get("note", "")
@@ -22,18 +23,30 @@ class Command(BaseCommand):
         else:
             use_date = None
 
-        if dry:
-            self.stdout.write(self.style.NOTICE("DRY RUN: no DB writes will be performed. Computing changes..."))
+        if options.get("apply_plan"):
+            plan = read_plan(options["apply_plan"], "weekly_reset")
             try:
-                with transaction.atomic():
-                    created = services.archive_and_reset_weekly_salaries(for_date=use_date, admin_user=None, notes=note)
-                    # rollback by raising a sentinel to avoid committing
-                    raise RuntimeError("DRY_RUN_ROLLBACK")
-            except RuntimeError as e:
-                if str(e) == "DRY_RUN_ROLLBACK":
-                    self.stdout.write(self.style.SUCCESS(f"DRY RUN: would create {created} SalaryHistory rows (no DB changes)."))
-                    return
-                raise
+                result = services.apply_plan(plan, admin_user=None)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f"Applied plan for week {plan['week_start']}: SalaryHistory rows created: {result['created']}, employees reset: {result['updated']}"
+            ))
+            return
+
+        if dry:
+            plan = services.plan_weekly_reset(for_date=use_date, notes=note)
+            self.stdout.write(self.style.NOTICE("DRY RUN: computed read-only, no DB writes or locks."))
+            if options["verbosity"] >= 2:
+                for c in plan["salary_history_create"]:
+                    self.stdout.write(f"  employee {c['employee_id']}: archive {c['sarees']} sarees, final {c['final_salary']}")
+                print_updates(self, plan)
+            if options.get("plan_out"):
+                write_plan(self, plan, options["plan_out"])
+            self.stdout.write(self.style.SUCCESS(
+                f"DRY RUN: would create {len(plan['salary_history_create'])} SalaryHistory rows for week "
+                f"{plan['week_start']} and reset {len(plan['employee_updates'])} employees (no DB changes)."
+            ))
         else:
             created = services.archive_and_reset_weekly_salaries(for_date=use_date, admin_user=None, notes=note)
             self.stdout.write(self.style.SUCCESS(f"Archived and reset weekly salaries. SalaryHistory rows created: {created}"))
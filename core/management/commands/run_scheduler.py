@@ -0,0 +1,59 @@
+# core/management/commands/run_scheduler.py
+import signal
+import threading
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.scheduler import due_weeks, run_due
+
+class Command(BaseCommand):
+    help = "Run the weekly close (salary archive + advance carry) at the configured boundary, catching up missed weeks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Close the weeks due now and exit instead of running forever.")
+        parser.add_argument("--interval", type=int, default=60, help="Seconds between checks (default 60).")
+        parser.add_argument("--since", type=str, help="Also close unclosed weeks from the week of this date (YYYY-MM-DD).")
+        parser.add_argument("--dry-run", action="store_true", help="List the weeks that are due and exit.")
+
+    def handle(self, *args, **options):
+        try:
+            since = date.fromisoformat(options["since"]) if options.get("since") else None
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options["interval"] < 1:
+            raise CommandError("--interval must be positive.")
+
+        if options["dry_run"]:
+            weeks = due_weeks(since=since)
+            for monday in weeks:
+                self.stdout.write(f"  week {monday}")
+            self.stdout.write(self.style.NOTICE(f"DRY RUN: {len(weeks)} weeks due, nothing closed."))
+            return
+
+        stop = threading.Event()
+        if not options["once"]:
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            self.stdout.write(f"Weekly close scheduler started (checking every {options['interval']}s).")
+        try:
+            while True:
+                close_old_connections()
+                self.tick(since)
+                # --since only applies to the startup catch-up
+                since = None
+                if options["once"] or stop.wait(options["interval"]):
+                    break
+        except KeyboardInterrupt:
+            pass
+
+    def tick(self, since):
+        runs = run_due(since=since)
+        if runs is None:
+            self.stdout.write(self.style.NOTICE("Another scheduler instance holds the lock; skipped."))
+            return
+        for run in runs:
+            self.stdout.write(self.style.SUCCESS(
+                f"Closed week {run.week_start}{' (catch-up)' if run.catch_up else ''} in {run.duration.total_seconds():.1f}s: "
+                f"{run.salary_rows} salary rows, {run.advance_rows} advance rows."
+            ))
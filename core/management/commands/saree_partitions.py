@@ -0,0 +1,54 @@
+# core/management/commands/saree_partitions.py
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import partitions
+
+
+class Command(BaseCommand):
+    help = "Manage monthly SareeCount partitions on PostgreSQL: convert the table, pre-create future months, detach old ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--convert", action="store_true", help="Convert an unpartitioned core_sareecount table first.")
+        parser.add_argument("--ahead", type=int, default=settings.SAREECOUNT_PARTITIONS_AHEAD,
+                            help="Months after the current one to keep partitions for (default SAREECOUNT_PARTITIONS_AHEAD).")
+        parser.add_argument("--detach-before", type=str, metavar="YYYY-MM",
+                            help="Detach partitions for months before this one (they remain as standalone tables).")
+        parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them.")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be created/detached.")
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported(connection):
+            raise CommandError("SareeCount partitioning needs PostgreSQL.")
+        if options["ahead"] < 0:
+            raise CommandError("--ahead must not be negative.")
+        before = None
+        if options["detach_before"]:
+            try:
+                before = datetime.strptime(options["detach_before"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("--detach-before must look like YYYY-MM.")
+        if options["drop"] and before is None:
+            raise CommandError("--drop needs --detach-before.")
+        dry_run = options["dry_run"]
+
+        if not partitions.is_partitioned(connection):
+            if not options["convert"]:
+                raise CommandError("core_sareecount is not partitioned; run with --convert to convert it.")
+            if dry_run:
+                self.stdout.write(self.style.NOTICE("Dry run — core_sareecount would be converted to monthly partitions."))
+                return
+            created = partitions.convert(connection, months_ahead=options["ahead"])
+            self.stdout.write(self.style.SUCCESS(f"Converted core_sareecount into {created} monthly partitions."))
+
+        created = partitions.ensure_partitions(connection, months_ahead=options["ahead"], dry_run=dry_run)
+        verb = "Would create" if dry_run else "Created"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(created)} partitions{': ' + ', '.join(created) if created else ''}."))
+
+        if before is not None:
+            detached = partitions.detach_partitions(connection, before, drop=options["drop"], dry_run=dry_run)
+            verb = ("Would drop" if dry_run else "Dropped") if options["drop"] else ("Would detach" if dry_run else "Detached")
+            self.stdout.write(self.style.SUCCESS(f"{verb} {len(detached)} partitions{': ' + ', '.join(detached) if detached else ''}."))
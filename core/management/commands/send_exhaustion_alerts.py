@@ -0,0 +1,37 @@
+# core/management/commands/send_exhaustion_alerts.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.alerts import render_digest, send_exhaustion_digest
+
+class Command(BaseCommand):
+    help = "Email a digest of warp/pagdi assignments that are exhausted or about to run out (run periodically)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold-days", type=int, default=3, help="Alert when an assignment runs out within this many days (default 3).")
+        parser.add_argument("--lookback-days", type=int, default=14, help="Days of recent production used for the daily rate (default 14).")
+        parser.add_argument("--as-of", type=str, help="Forecast date (YYYY-MM-DD, default today).")
+        parser.add_argument("--dry-run", action="store_true", help="Print the digest without sending or recording it.")
+
+    def handle(self, *args, **options):
+        try:
+            as_of = date.fromisoformat(options["as_of"]) if options.get("as_of") else timezone.localdate()
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options["lookback_days"] < 1 or options["threshold_days"] < 0:
+            raise CommandError("--lookback-days must be positive and --threshold-days not negative.")
+
+        alerts, sent = send_exhaustion_digest(
+            as_of, options["threshold_days"], options["lookback_days"], dry_run=options["dry_run"]
+        )
+        if not alerts:
+            self.stdout.write(self.style.SUCCESS("No new warp/pagdi alerts."))
+        elif options["dry_run"]:
+            self.stdout.write(render_digest(alerts, as_of))
+            self.stdout.write(self.style.NOTICE(f"Dry run — {len(alerts)} alerts not sent."))
+        elif not sent:
+            self.stdout.write(self.style.NOTICE(f"{len(alerts)} alerts due but no AlertEmail recipients are configured."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Sent {len(alerts)} alerts to {sent} recipients."))
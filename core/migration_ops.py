@@ -0,0 +1,91 @@
+# core/migration_ops.py
+"""
+Schema operations that build and drop indexes without blocking writes on PostgreSQL.
+
+AddIndex / RemoveIndex / AddConstraint lock the table against writes while the index is
+built; on PostgreSQL these variants use CREATE/DROP INDEX CONCURRENTLY instead (except
+on partitioned tables, which do not support it, see core.partitions) and behave like
+the plain operations on other databases. Migrations using them must set
+`atomic = False`.
+"""
+from django.db import migrations
+from django.db.models import UniqueConstraint
+
+from . import partitions
+
+
+def _concurrent(schema_editor, model):
+    connection = schema_editor.connection
+    return connection.vendor == "postgresql" and not partitions.is_partitioned(connection, model._meta.db_table)
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if _concurrent(schema_editor, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if _concurrent(schema_editor, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, self.index)
+
+
+class RemoveIndexConcurrently(migrations.RemoveIndex):
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        index = from_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+        if _concurrent(schema_editor, model):
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        index = to_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+        if _concurrent(schema_editor, model):
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+class AddUniqueConstraintConcurrently(migrations.AddConstraint):
+    """AddConstraint for a partial UniqueConstraint, which PostgreSQL stores as a unique index."""
+
+    def __init__(self, model_name, constraint):
+        if not isinstance(constraint, UniqueConstraint) or constraint.condition is None:
+            raise ValueError("AddUniqueConstraintConcurrently needs a UniqueConstraint with a condition")
+        super().__init__(model_name, constraint)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if _concurrent(schema_editor, model):
+            sql = str(self.constraint.create_sql(model, schema_editor))
+            schema_editor.execute(sql.replace("CREATE UNIQUE INDEX", "CREATE UNIQUE INDEX CONCURRENTLY", 1))
+        else:
+            schema_editor.add_constraint(model, self.constraint)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if _concurrent(schema_editor, model):
+            schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(self.constraint.name)}")
+        else:
+            schema_editor.remove_constraint(model, self.constraint)
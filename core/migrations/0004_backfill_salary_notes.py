@@ -2,11 +2,9 @@ from django.db import migrations
 
 
 def backfill_notes(apps, schema_editor):
+    # One set-based UPDATE instead of loading and saving every row.
     SalaryHistory = apps.get_model('core', 'SalaryHistory')
-    for row in SalaryHistory.objects.all():
-        if not row.notes:
-            row.notes = "Backfilled by migration"
-            row.save(update_fields=['notes'])
+    SalaryHistory.objects.filter(notes="").update(notes="Backfilled by migration")
 
 
 class Migration(migrations.Migration):
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:56
+
+import django.core.validators
+import django.db.models.deletion
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_rates(apps, schema_editor):
+    """
+    Freeze today's rates into history: one SalaryRateHistory row per employee effective
+    from their earliest entry, and every existing SareeCount stamped with that rate.
+    """
+    Employee = apps.get_model('core', 'Employee')
+    SareeCount = apps.get_model('core', 'SareeCount')
+    SalaryRateHistory = apps.get_model('core', 'SalaryRateHistory')
+
+    first_entry = dict(
+        SareeCount.objects.values('employee_id')
+        .annotate(first=models.Min('date')).values_list('employee_id', 'first')
+    )
+    SalaryRateHistory.objects.bulk_create([
+        SalaryRateHistory(
+            employee_id=emp_id,
+            rate=rate,
+            effective_from=min(filter(None, [joined, first_entry.get(emp_id)])),
+            note="Initial rate (migrated)",
+        )
+        for emp_id, rate, joined in Employee.objects.values_list('id', 'salary_per_saree', 'joining_date').iterator()
+    ], batch_size=1000)
+
+    SareeCount.objects.update(rate=models.Subquery(
+        Employee.objects.filter(id=models.OuterRef('employee_id')).values('salary_per_saree')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_advancehistory_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sareecount',
+            name='rate',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sareecount',
+            name='earnings',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('count'), '*', models.F('rate')), output_field=models.IntegerField(null=True)),
+        ),
+        migrations.CreateModel(
+            name='SalaryRateHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rate', models.PositiveIntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('effective_from', models.DateField()),
+                ('note', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('admin_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rate_history', to='core.employee')),
+            ],
+            options={
+                'ordering': ['-effective_from'],
+                'unique_together': {('employee', 'effective_from')},
+            },
+        ),
+        migrations.RunPython(seed_rates, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_salary_rate_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
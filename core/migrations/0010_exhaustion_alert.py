@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_employee_profile_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExhaustionAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('warp', 'Warp'), ('pagdi', 'Pagdi')], max_length=10)),
+                ('assignment_id', models.PositiveIntegerField()),
+                ('level', models.CharField(choices=[('low', 'Running low'), ('exhausted', 'Exhausted')], max_length=10)),
+                ('remaining', models.IntegerField()),
+                ('forecast_date', models.DateField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exhaustion_alerts', to='core.employee')),
+            ],
+            options={
+                'ordering': ['-sent_at'],
+                'unique_together': {('kind', 'assignment_id', 'level')},
+            },
+        ),
+    ]
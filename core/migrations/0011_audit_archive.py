@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_exhaustion_alert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('advance', 'Advance history'), ('pagdi_change', 'Pagdi change history')], max_length=20)),
+                ('period_start', models.DateField()),
+                ('first_at', models.DateTimeField()),
+                ('last_at', models.DateTimeField()),
+                ('row_count', models.PositiveIntegerField()),
+                ('summary', models.JSONField(default=dict)),
+                ('payload', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_archives', to='core.employee')),
+            ],
+            options={
+                'ordering': ['employee', 'first_at'],
+                'indexes': [models.Index(fields=['kind', 'employee', 'last_at'], name='core_audita_kind_17be40_idx')],
+                'unique_together': {('kind', 'employee', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_sareecount(apps, schema_editor):
+    # Opt-in and PostgreSQL only; elsewhere (and without the setting) this is a no-op.
+    # Databases migrated past this point can be converted later with
+    # `manage.py saree_partitions --convert`.
+    from core import partitions
+    connection = schema_editor.connection
+    if settings.SAREECOUNT_PARTITIONING and partitions.is_supported(connection):
+        partitions.convert(connection, months_ahead=settings.SAREECOUNT_PARTITIONS_AHEAD)
+
+
+def unpartition_sareecount(apps, schema_editor):
+    from core import partitions
+    partitions.unconvert(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_backfill_progress'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_sareecount, reverse_code=unpartition_sareecount),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models, transaction
+from django.db.models import Count
+
+from core.migration_ops import AddIndexConcurrently, AddUniqueConstraintConcurrently, RemoveIndexConcurrently
+
+
+def close_duplicate_active_assignments(apps, schema_editor):
+    # Warps were never finished when a new one was assigned. Keep each employee's newest
+    # active pagdi/warp open and end the older ones on the day the newest started.
+    with transaction.atomic():
+        for name in ("PagdiHistory", "WarpHistory"):
+            Model = apps.get_model('core', name)
+            active = Model.objects.filter(end_date__isnull=True)
+            duplicated = active.values("employee_id").annotate(n=Count("id")).filter(n__gt=1).values_list("employee_id", flat=True)
+            for employee_id in list(duplicated):
+                newest, *older = active.filter(employee_id=employee_id).order_by("-start_date", "-id")
+                Model.objects.filter(id__in=[row.id for row in older]).update(end_date=newest.start_date)
+
+
+class Migration(migrations.Migration):
+    # indexes are built CONCURRENTLY on PostgreSQL, which cannot run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0013_partition_sareecount'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_active_assignments, reverse_code=migrations.RunPython.noop),
+        # duplicates of phone's db_index and of the unique_together indexes
+        RemoveIndexConcurrently(
+            model_name='employee',
+            name='core_employ_phone_f66745_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='salaryhistory',
+            name='core_salary_employe_0cbafe_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='sareecount',
+            name='core_sareec_employe_99f97d_idx',
+        ),
+        # build the covering date index before dropping the plain one it replaces
+        AddIndexConcurrently(
+            model_name='sareecount',
+            index=models.Index(fields=['date'], include=('employee', 'count', 'earnings'), name='sareecount_date_cover'),
+        ),
+        migrations.AlterField(
+            model_name='sareecount',
+            name='date',
+            field=models.DateField(),
+        ),
+        AddUniqueConstraintConcurrently(
+            model_name='pagdihistory',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_date__isnull', True)), fields=('employee',), name='pagdi_one_active_per_employee'),
+        ),
+        AddUniqueConstraintConcurrently(
+            model_name='warphistory',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_date__isnull', True)), fields=('employee',), name='warp_one_active_per_employee'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+import warnings
+
+from django.db import DatabaseError, migrations, models
+
+from core.backfill import backfill
+from core.search import search_keys
+
+
+def fill_search_keys(apps, schema_editor):
+    Employee = apps.get_model('core', 'Employee')
+
+    def update(chunk):
+        rows = list(chunk.only("id", "name", "phone"))
+        for employee in rows:
+            for field, value in search_keys(employee.name, employee.phone).items():
+                setattr(employee, field, value)
+        Employee.objects.bulk_update(rows, ["phone_digits", "phone_digits_reversed", "name_key"])
+        return len(rows)
+
+    backfill(Employee.objects.all(), update, chunk_size=500)
+
+
+def add_name_trigram_index(apps, schema_editor):
+    # PostgreSQL only. Matches the UPPER(name) LIKE UPPER('%q%') that name__icontains
+    # compiles to. Without pg_trgm (no privilege to install it) search still works,
+    # just without the index.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError as exc:
+        warnings.warn(f"pg_trgm unavailable ({exc}); employee name search will not be indexed")
+        return
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS employee_name_trgm ON core_employee USING gin (UPPER(name) gin_trgm_ops)"
+    )
+
+
+def drop_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS employee_name_trgm")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_index_overhaul'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='phone_digits',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='phone_digits_reversed',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=15),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['name_key', 'id'], name='employee_name_key_id'),
+        ),
+        migrations.RunPython(fill_search_keys, reverse_code=migrations.RunPython.noop),
+        migrations.RunPython(add_name_trigram_index, reverse_code=drop_name_trigram_index),
+    ]
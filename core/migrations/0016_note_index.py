@@ -0,0 +1,72 @@
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models
+
+from core.note_search import rebuild_note_index
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE core_noteindex_fts USING fts5(text, content='core_noteindex', content_rowid='id')",
+    "CREATE TRIGGER core_noteindex_fts_ai AFTER INSERT ON core_noteindex BEGIN "
+    "INSERT INTO core_noteindex_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER core_noteindex_fts_ad AFTER DELETE ON core_noteindex BEGIN "
+    "INSERT INTO core_noteindex_fts(core_noteindex_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER core_noteindex_fts_au AFTER UPDATE ON core_noteindex BEGIN "
+    "INSERT INTO core_noteindex_fts(core_noteindex_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO core_noteindex_fts(rowid, text) VALUES (new.id, new.text); END",
+]
+
+
+def add_fulltext_index(apps, schema_editor):
+    # SQLite's table rebuilds (AlterField etc. on core_noteindex) drop these triggers;
+    # a later migration touching the table must recreate them.
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE INDEX core_noteindex_text_fts ON core_noteindex USING gin (to_tsvector('simple', text))")
+    elif vendor == "sqlite":
+        try:
+            schema_editor.execute(SQLITE_FTS[0])
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to icontains
+            return
+        for statement in SQLITE_FTS[1:]:
+            schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS core_noteindex_text_fts")
+    elif vendor == "sqlite":
+        for trigger in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS core_noteindex_fts_{trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS core_noteindex_fts")
+
+
+def index_existing_notes(apps, schema_editor):
+    rebuild_note_index(get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_employee_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('saree', 'Saree entry'), ('warp', 'Warp'), ('pagdi', 'Pagdi'), ('salary', 'Salary week'), ('advance', 'Advance change'), ('pagdi_change', 'Pagdi change')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('text', models.TextField()),
+                ('recorded_at', models.DateTimeField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.employee')),
+            ],
+            options={
+                'ordering': ['-recorded_at'],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, reverse_code=drop_fulltext_index),
+        migrations.RunPython(index_existing_notes, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_note_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyCloseRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('week_end', models.DateField()),
+                ('status', models.CharField(choices=[('succeeded', 'Succeeded'), ('failed', 'Failed')], max_length=10)),
+                ('catch_up', models.BooleanField(default=False, help_text='Closed after a later week was already due')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('salary_rows', models.PositiveIntegerField(default=0)),
+                ('advance_rows', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('instance', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'ordering': ['-week_start', '-started_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'succeeded')), fields=('week_start',), name='weekly_close_once')],
+            },
+        ),
+    ]
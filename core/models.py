@@ -2,7 +2,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
-from django.db.models import Sum
+from django.db.models import Sum, F
 from django.utils import timezone
 from datetime import date
 
@@ -15,7 +15,14 @@ class Employee(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="employee")
     name = models.CharField(max_length=100)
     phone = models.CharField(max_length=15, db_index=True)
+    # Search keys derived from name/phone on save (see core.search).
+    phone_digits = models.CharField(max_length=15, blank=True, db_index=True, editable=False)
+    phone_digits_reversed = models.CharField(max_length=15, blank=True, db_index=True, editable=False)
+    name_key = models.CharField(max_length=100, blank=True, editable=False)
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    # Resized copies of profile_picture keyed by edge length in px (see core.thumbnails);
+    # empty while the thumbnail worker has not processed the current picture.
+    profile_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
 
     joining_date = models.DateField(auto_now_add=True)
 
@@ -36,36 +43,107 @@ class Employee(models.Model):
     performance = models.CharField(max_length=20, default="Average")
     is_approved = models.BooleanField(default=False)
 
+    # Bumped whenever the employee's production, assignments or payroll history change
+    # (see core.signals); used to key cached renderings of that data.
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["name"]
-        indexes = [models.Index(fields=["phone"])]
+        indexes = [models.Index(fields=["name_key", "id"], name="employee_name_key_id")]
+
+    def save(self, *args, **kwargs):
+        from .search import search_keys
+        keys = search_keys(self.name, self.phone)
+        for field, value in keys.items():
+            setattr(self, field, value)
+        if kwargs.get("update_fields") is not None:
+            update_fields = set(kwargs["update_fields"])
+            if update_fields & {"name", "phone"}:
+                kwargs["update_fields"] = update_fields | set(keys)
+        # data_version and profile_thumbnails are only written with queryset updates
+        # (core.signals, core.thumbnails); a full save of a previously loaded instance
+        # must not write an older value back.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ("data_version", "profile_thumbnails")
+            ]
+        super().save(*args, **kwargs)
+
+    def rate_on(self, day):
+        """Per-saree rate in effect on `day` (falls back to the current salary_per_saree)."""
+        entry = self.rate_history.filter(effective_from__lte=day).order_by("-effective_from").first()
+        return entry.rate if entry else (self.salary_per_saree or 0)
 
     def __str__(self):
         return f"{self.name} ({self.phone})"
 
 
+# ============================================================
+# SALARY RATE HISTORY (EFFECTIVE-DATED RATES)
+# ============================================================
+
+class SalaryRateHistory(models.Model):
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="rate_history")
+    admin_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    rate = models.PositiveIntegerField(default=0, validators=[MinValueValidator(0)])
+    effective_from = models.DateField()
+    note = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-effective_from"]
+        unique_together = ("employee", "effective_from")
+
+    def __str__(self):
+        return f"{self.employee.name} ₹{self.rate} from {self.effective_from}"
+
+
 # ============================================================
 # SAREE COUNT MODEL
 # ============================================================
 
 class SareeCount(models.Model):
+    # May be range-partitioned by month on PostgreSQL (core.partitions): filter on plain
+    # `date` ranges so queries are pruned to the partitions they need.
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="saree_counts")
-    date = models.DateField(db_index=True)
+    date = models.DateField()
     count = models.PositiveIntegerField(default=0)
     notes = models.TextField(blank=True, null=True)
 
+    # Rate in effect on `date`, stored so later rate edits don't rewrite history.
+    # Filled from the employee's rate history on first save when not given.
+    rate = models.PositiveIntegerField(null=True, blank=True)
+    earnings = models.GeneratedField(
+        expression=F("count") * F("rate"),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        # the unique (employee, date) index serves per-employee date ranges; the date
+        # index covers the all-employee weekly totals (index-only scans on PostgreSQL)
         unique_together = ("employee", "date")
         ordering = ["-date"]
-        indexes = [models.Index(fields=["employee", "date"])]
+        indexes = [
+            models.Index(fields=["date"], include=["employee", "count", "earnings"], name="sareecount_date_cover"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.rate is None:
+            day = self._meta.get_field("date").to_python(self.date)
+            self.rate = self.employee.rate_on(day)
+        super().save(*args, **kwargs)
 
     def salary_earned(self):
-        rate = self.employee.salary_per_saree or 0
-        return self.count * rate
+        return self.count * (self.rate or 0)
 
     def __str__(self):
         return f"{self.employee.name} - {self.date} - {self.count}"
@@ -88,6 +166,11 @@ class WarpHistory(models.Model):
 
     class Meta:
         ordering = ["-start_date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee"], condition=models.Q(end_date__isnull=True), name="warp_one_active_per_employee",
+            ),
+        ]
 
     def remaining_sarees(self):
         sarees_made = SareeCount.objects.filter(
@@ -121,6 +204,11 @@ class PagdiHistory(models.Model):
 
     class Meta:
         ordering = ["-start_date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee"], condition=models.Q(end_date__isnull=True), name="pagdi_one_active_per_employee",
+            ),
+        ]
 
     def remaining_sarees(self):
         sarees_made = SareeCount.objects.filter(
@@ -148,6 +236,30 @@ class AlertEmail(models.Model):
         return self.email
 
 
+class ExhaustionAlert(models.Model):
+    """
+    A warp/pagdi alert already included in a digest, so each assignment is reported once
+    per level (see core.alerts).
+    """
+    KIND_CHOICES = [("warp", "Warp"), ("pagdi", "Pagdi")]
+    LEVEL_CHOICES = [("low", "Running low"), ("exhausted", "Exhausted")]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    assignment_id = models.PositiveIntegerField()
+    level = models.CharField(max_length=10, choices=LEVEL_CHOICES)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="exhaustion_alerts")
+    remaining = models.IntegerField()
+    forecast_date = models.DateField(null=True, blank=True)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-sent_at"]
+        unique_together = ("kind", "assignment_id", "level")
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.assignment_id} {self.level}"
+
+
 # ============================================================
 # SALARY HISTORY (WEEKLY)
 # ============================================================
@@ -172,7 +284,6 @@ class SalaryHistory(models.Model):
     class Meta:
         ordering = ["-week_start"]
         unique_together = ("employee", "week_start", "week_end")
-        indexes = [models.Index(fields=["employee", "week_start"])]
 
     def __str__(self):
         return f"{self.employee.name} – {self.week_start} to {self.week_end}"
@@ -233,3 +344,140 @@ class PagdiChangeHistory(models.Model):
 
     def __str__(self):
         return f"{self.employee.name} Pagdi {self.action} at {self.created_at}"
+
+
+# ============================================================
+# AUDIT ARCHIVE (COMPACTED ADVANCE / PAGDI CHANGE HISTORY)
+# ============================================================
+
+class AuditArchive(models.Model):
+    """
+    Append-only archive of one employee's audit rows for one month (see core.audit).
+    `payload` holds the original rows as gzipped JSON lines; `summary` keeps the totals
+    needed without unpacking them (opening/closing balance, net change, action counts).
+    """
+    KIND_CHOICES = [
+        ("advance", "Advance history"),
+        ("pagdi_change", "Pagdi change history"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="audit_archives")
+    period_start = models.DateField()
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+    row_count = models.PositiveIntegerField()
+    summary = models.JSONField(default=dict)
+    payload = models.BinaryField()
+
+    # Timestamp
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["employee", "first_at"]
+        unique_together = ("kind", "employee", "period_start")
+        indexes = [models.Index(fields=["kind", "employee", "last_at"])]
+
+    def __str__(self):
+        return f"{self.employee.name} {self.get_kind_display()} {self.period_start:%b %Y} ({self.row_count} rows)"
+
+
+# ============================================================
+# NOTE SEARCH INDEX
+# ============================================================
+
+class NoteIndex(models.Model):
+    """
+    One row per record with a non-empty note/notes field, maintained on write (see
+    core.note_search). Full-text indexed with a tsvector GIN index on PostgreSQL and an
+    FTS5 table on SQLite. Rows of archived audit records are kept so old notes stay
+    searchable.
+    """
+    KIND_CHOICES = [
+        ("saree", "Saree entry"),
+        ("warp", "Warp"),
+        ("pagdi", "Pagdi"),
+        ("salary", "Salary week"),
+        ("advance", "Advance change"),
+        ("pagdi_change", "Pagdi change"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="+")
+    text = models.TextField()
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-recorded_at"]
+        unique_together = ("kind", "object_id")
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}: {self.text[:40]}"
+
+
+# ============================================================
+# WEEKLY CLOSE RUNS (SCHEDULER HISTORY)
+# ============================================================
+
+class WeeklyCloseRun(models.Model):
+    """
+    One attempt of the scheduled weekly close (see core.scheduler): archive the week's
+    salaries and carry advances. A week has at most one succeeded run; failed attempts
+    are kept with their error.
+    """
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    week_start = models.DateField()
+    week_end = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    catch_up = models.BooleanField(default=False, help_text="Closed after a later week was already due")
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    salary_rows = models.PositiveIntegerField(default=0)
+    advance_rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    instance = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ["-week_start", "-started_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["week_start"], condition=models.Q(status="succeeded"), name="weekly_close_once",
+            ),
+        ]
+
+    @property
+    def duration(self):
+        return self.finished_at - self.started_at
+
+    def __str__(self):
+        return f"Week {self.week_start} close {self.status} ({self.salary_rows} salary, {self.advance_rows} advance rows)"
+
+
+# ============================================================
+# BACKFILL PROGRESS (RESUMABLE DATA MIGRATIONS)
+# ============================================================
+
+class BackfillProgress(models.Model):
+    """Checkpoint of a named chunked backfill (see core.backfill), committed with each chunk."""
+    name = models.CharField(max_length=100, unique=True)
+    last_pk = models.BigIntegerField(default=0)
+    rows_done = models.BigIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-updated_at"]
+
+    def __str__(self):
+        state = "done" if self.finished_at else f"at pk {self.last_pk}"
+        return f"{self.name} ({self.rows_done} rows, {state})"
@@ -0,0 +1,176 @@
+# core/note_search.py
+"""
+Full-text search over the free-text notes of saree entries, warps, pagdis, salary weeks
+and the advance / pagdi change audit logs.
+
+Every record with a non-empty note has a NoteIndex row (kind, object_id, employee, text),
+written by the post_save/post_delete receivers in core.signals and by index_records()
+in services that write with bulk_create. Migration 0016 adds the full-text index:
+
+- PostgreSQL: a GIN index on to_tsvector('simple', text); ranked with ts_rank.
+- SQLite:     an external-content FTS5 table (core_noteindex_fts) kept in step with
+              core_noteindex by triggers; ranked with bm25.
+- otherwise:  icontains per word, newest first.
+
+search_notes() returns one page of ranked hits across all kinds in a single query.
+Each query word matches as a prefix and all words must match.
+"""
+import re
+
+from django.db import connections, router
+
+from .models import (
+    AdvanceHistory, NoteIndex, PagdiChangeHistory, PagdiHistory, SalaryHistory, SareeCount, WarpHistory,
+)
+
+# kind -> (model name, note field)
+NOTE_SOURCES = {
+    "saree": ("SareeCount", "notes"),
+    "warp": ("WarpHistory", "notes"),
+    "pagdi": ("PagdiHistory", "notes"),
+    "salary": ("SalaryHistory", "notes"),
+    "advance": ("AdvanceHistory", "note"),
+    "pagdi_change": ("PagdiChangeHistory", "note"),
+}
+# source model -> kind
+NOTE_KINDS = {
+    SareeCount: "saree", WarpHistory: "warp", PagdiHistory: "pagdi",
+    SalaryHistory: "salary", AdvanceHistory: "advance", PagdiChangeHistory: "pagdi_change",
+}
+# audit rows are only deleted when archived (core.audit); their notes stay searchable
+KEEP_ON_DELETE = {"advance", "pagdi_change"}
+FTS_TABLE = "core_noteindex_fts"
+MAX_TERMS = 8
+INDEX_CHUNK_SIZE = 2000
+
+_COLUMNS = "n.id, n.kind, n.object_id, n.employee_id, n.text, n.recorded_at, e.name AS employee_name"
+
+
+def _note_row(model, kind, field, obj):
+    text = (getattr(obj, field) or "").strip()
+    if text:
+        return model(kind=kind, object_id=obj.pk, employee_id=obj.employee_id, text=text, recorded_at=obj.created_at)
+    return None
+
+
+def index_records(objs, created=False):
+    """
+    (Re)index the notes of saved records of one model. With created=True the records
+    are known to be new, so no stale index rows are looked up.
+    """
+    objs = [o for o in objs if o.pk is not None]
+    if not objs:
+        return
+    kind = NOTE_KINDS[type(objs[0])]
+    field = NOTE_SOURCES[kind][1]
+    rows = [row for row in (_note_row(NoteIndex, kind, field, o) for o in objs) if row]
+    if not created:
+        NoteIndex.objects.filter(kind=kind, object_id__in=[o.pk for o in objs]).delete()
+    NoteIndex.objects.bulk_create(rows)
+
+
+def unindex_records(kind, object_ids):
+    if kind not in KEEP_ON_DELETE:
+        NoteIndex.objects.filter(kind=kind, object_id__in=list(object_ids)).delete()
+
+
+def rebuild_note_index(kinds=None, get_model=None, log=None):
+    """
+    Rebuild the index rows of `kinds` (default all) from the source tables, in chunks.
+    Audit kinds (KEEP_ON_DELETE) are also re-indexed from their AuditArchive payloads,
+    so the notes of archived rows stay searchable.
+    `get_model` (e.g. apps.get_model in a migration) resolves "core" models by name.
+    Returns the number of rows indexed.
+    """
+    from .audit import unpack
+    from .backfill import backfill
+
+    if get_model is None:
+        from django.apps import apps
+        get_model = apps.get_model
+    index_model = get_model("core", "NoteIndex")
+    total = 0
+    for kind in kinds or NOTE_SOURCES:
+        model_name, field = NOTE_SOURCES[kind]
+        source = get_model("core", model_name)
+        index_model.objects.filter(kind=kind).delete()
+
+        def add_chunk(chunk, kind=kind, field=field):
+            rows = [_note_row(index_model, kind, field, o) for o in chunk.only("id", "employee_id", "created_at", field)]
+            return len(index_model.objects.bulk_create([r for r in rows if r]))
+
+        total += backfill(source.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True}),
+                          add_chunk, chunk_size=INDEX_CHUNK_SIZE, log=log).rows
+
+        if kind in KEEP_ON_DELETE:
+            for archive in get_model("core", "AuditArchive").objects.filter(kind=kind).iterator():
+                rows = [
+                    index_model(kind=kind, object_id=r["id"], employee_id=r["employee_id"],
+                                text=r[field].strip(), recorded_at=r["created_at"])
+                    for r in unpack(archive) if (r.get(field) or "").strip()
+                ]
+                total += len(index_model.objects.bulk_create(rows))
+    return total
+
+
+def search_terms(query):
+    return re.findall(r"\w+", (query or "").lower())[:MAX_TERMS]
+
+
+_fts5_aliases = set()
+
+
+def _has_fts5(connection):
+    # only a positive answer is cached: the table appears once migration 0016 has run
+    if connection.alias not in _fts5_aliases:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            if cursor.fetchone() is None:
+                return False
+        _fts5_aliases.add(connection.alias)
+    return True
+
+
+def search_notes(query, page=1, per_page=25, kinds=None):
+    """
+    One page of NoteIndex hits for `query`, best match first (ties newest first),
+    optionally limited to some kinds. Each hit has .employee_name and .rank.
+    Returns (hits, has_next).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+    page, per_page = max(1, int(page)), max(1, int(per_page))
+    limit, offset = per_page + 1, (page - 1) * per_page
+    kinds = [k for k in (kinds or []) if k in NOTE_SOURCES]
+    kind_sql = f" AND n.kind IN ({', '.join(['%s'] * len(kinds))})" if kinds else ""
+
+    alias = router.db_for_read(NoteIndex)
+    connection = connections[alias]
+    if connection.vendor == "postgresql":
+        sql = (
+            f"SELECT {_COLUMNS}, ts_rank(to_tsvector('simple', n.text), q) AS rank "
+            "FROM core_noteindex n JOIN core_employee e ON e.id = n.employee_id, to_tsquery('simple', %s) q "
+            f"WHERE to_tsvector('simple', n.text) @@ q{kind_sql} "
+            "ORDER BY rank DESC, n.recorded_at DESC, n.id DESC LIMIT %s OFFSET %s"
+        )
+        hits = list(NoteIndex.objects.using(alias).raw(sql, [" & ".join(f"{t}:*" for t in terms), *kinds, limit, offset]))
+    elif connection.vendor == "sqlite" and _has_fts5(connection):
+        # bm25 ranks are negative: lower is better
+        sql = (
+            f"SELECT {_COLUMNS}, -f.rank AS rank "
+            f"FROM {FTS_TABLE} f JOIN core_noteindex n ON n.id = f.rowid JOIN core_employee e ON e.id = n.employee_id "
+            f"WHERE {FTS_TABLE} MATCH %s{kind_sql} "
+            "ORDER BY f.rank, n.recorded_at DESC, n.id DESC LIMIT %s OFFSET %s"
+        )
+        hits = list(NoteIndex.objects.using(alias).raw(sql, [" ".join(f'"{t}"*' for t in terms), *kinds, limit, offset]))
+    else:
+        qs = NoteIndex.objects.using(alias).select_related("employee").order_by("-recorded_at", "-id")
+        for term in terms:
+            qs = qs.filter(text__icontains=term)
+        if kinds:
+            qs = qs.filter(kind__in=kinds)
+        hits = list(qs[offset:offset + limit])
+        for hit in hits:
+            hit.employee_name, hit.rank = hit.employee.name, None
+    return hits[:per_page], len(hits) > per_page
@@ -0,0 +1,148 @@
+# core/onboarding.py
+"""
+Bulk onboarding: create many approved employees (and their login users) from a CSV of
+name,phone,rate[,password] in one transaction.
+
+Hashing the initial passwords (PBKDF2 by default) dominates the cost, so it runs
+before the transaction, spread over a process pool when workers > 1; the Users and
+Employees are then written with two bulk_create calls. Rows without a password get a
+random one, returned to the caller so it can be handed out once.
+
+The pool is spawned by default: forking a web worker that already runs threads
+(gunicorn/uvicorn, the thumbnail pool, the RSS watchdog) can deadlock the child, so
+only the single-threaded onboard_employees command forks.
+"""
+import csv
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import Employee, SalaryRateHistory
+from .search import search_keys
+
+# the phone is the login; digits with an optional leading +, within Employee.phone
+PHONE_RE = re.compile(r"\+?\d+")
+
+PASSWORD_LENGTH = 10
+# no look-alike characters (0/O, 1/l/I): passwords are read out or written down
+PASSWORD_CHARS = "abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+
+def fork_start_method():
+    """"fork" where the platform has it, else "spawn": for single-threaded processes only."""
+    return "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def parse_onboarding_csv(lines):
+    """
+    Parse onboarding rows from CSV text with header `name,phone,rate[,password]`.
+    Returns a list of {"name", "phone", "rate", "password"} dicts in file order
+    (password "" when not given).
+
+    Raises:
+      ValueError naming the offending line on missing values, a phone that is not
+      digits or too long for Employee.phone, a name too long, a bad rate or a phone
+      repeated within the file.
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or not {"name", "phone", "rate"} <= set(reader.fieldnames):
+        raise ValueError("CSV header must contain name, phone and rate columns")
+
+    rows, seen = [], {}
+    for line_no, rec in enumerate(reader, start=2):
+        name, phone = (rec.get("name") or "").strip(), (rec.get("phone") or "").strip()
+        if not name or not phone:
+            raise ValueError(f"line {line_no}: name and phone are required")
+        if not PHONE_RE.fullmatch(phone):
+            raise ValueError(f"line {line_no}: phone must be digits (optionally starting with +)")
+        if len(phone) > Employee._meta.get_field("phone").max_length:
+            raise ValueError(f"line {line_no}: phone is longer than {Employee._meta.get_field('phone').max_length} characters")
+        if len(name) > Employee._meta.get_field("name").max_length:
+            raise ValueError(f"line {line_no}: name is longer than {Employee._meta.get_field('name').max_length} characters")
+        try:
+            rate = int((rec.get("rate") or "").strip())
+        except ValueError:
+            raise ValueError(f"line {line_no}: rate must be an integer")
+        if rate < 0:
+            raise ValueError(f"line {line_no}: rate must not be negative")
+        if phone in seen:
+            raise ValueError(f"line {line_no}: phone {phone} already on line {seen[phone]}")
+        seen[phone] = line_no
+        rows.append({"name": name, "phone": phone, "rate": rate, "password": (rec.get("password") or "").strip()})
+    return rows
+
+
+def hash_passwords(passwords, workers=1, start_method="spawn"):
+    """
+    make_password() for each password, in order; across `workers` processes when > 1,
+    started with `start_method` (see the module docstring before passing "fork").
+    """
+    passwords = list(passwords)
+    if workers <= 1 or len(passwords) <= 1:
+        return [make_password(p) for p in passwords]
+    # workers only hash and never touch the database, so the parent's connections can stay open
+    context = multiprocessing.get_context(start_method)
+    workers = min(workers, len(passwords))
+    # spawned workers start without Django configured (a no-op in forked ones); the
+    # initializer and the task are referenced from modules that load without the app registry
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def onboard_employees(rows, workers=1, start_method="spawn"):
+    """
+    Create an approved Employee, its User (username = phone) and its starting
+    SalaryRateHistory row for every row of parse_onboarding_csv(), all or nothing.
+    Returns [(employee, initial password)] in row order.
+
+    Raises:
+      ValueError if any phone is already registered; nothing is written then.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    passwords = [row["password"] or get_random_string(PASSWORD_LENGTH, PASSWORD_CHARS) for row in rows]
+    hashes = hash_passwords(passwords, workers, start_method)
+
+    phones = [row["phone"] for row in rows]
+    try:
+        with transaction.atomic():
+            taken = sorted(User.objects.filter(username__in=phones).values_list("username", flat=True))
+            if taken:
+                raise ValueError(f"Phone(s) already registered: {', '.join(taken)}")
+            users = User.objects.bulk_create([User(username=phone, password=h) for phone, h in zip(phones, hashes)])
+            if any(u.pk is None for u in users):
+                # backends that cannot return ids from a bulk insert
+                ids = dict(User.objects.filter(username__in=phones).values_list("username", "id"))
+                for u in users:
+                    u.pk = ids[u.username]
+            employees = Employee.objects.bulk_create([
+                Employee(user=user, name=row["name"], phone=row["phone"], salary_per_saree=row["rate"],
+                         advance_salary=0, is_approved=True, **search_keys(row["name"], row["phone"]))
+                for user, row in zip(users, rows)
+            ])
+            # the starting rate on record, so a later set_salary_rate keeps pricing earlier
+            # production at it (Employee.rate_on falls back to the current rate otherwise)
+            today = timezone.localdate()
+            SalaryRateHistory.objects.bulk_create([
+                SalaryRateHistory(employee=emp, rate=emp.salary_per_saree, effective_from=today, note="Starting rate (onboarding)")
+                for emp in employees
+            ])
+    except IntegrityError as e:
+        # a phone registered concurrently, after the check above
+        raise ValueError(f"Onboarding failed, nothing was created: {e}")
+    return list(zip(employees, passwords))
+
+
+def approve_employees(employee_ids):
+    """Approve the given employees in one UPDATE. Returns how many were pending."""
+    return Employee.objects.filter(id__in=list(employee_ids), is_approved=False).update(
+        is_approved=True, updated_at=timezone.now()
+    )
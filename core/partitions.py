@@ -0,0 +1,246 @@
+# core/partitions.py
+"""
+Optional monthly range partitioning of SareeCount on PostgreSQL.
+
+With SAREECOUNT_PARTITIONING=True, migration 0013 (or `saree_partitions --convert` on
+a database migrated earlier) rebuilds core_sareecount as a table partitioned by RANGE
+(date): one partition per month (core_sareecount_pYYYYMM) plus a DEFAULT partition
+that catches dates no monthly partition covers yet. The ORM is unchanged. Queries
+that filter on plain `date` ranges (every weekly, dashboard and pagdi/warp query)
+are pruned to the partitions they need.
+
+PostgreSQL requires the partition key in every unique constraint, so the primary key
+becomes (id, date); ids still come from the same identity/sequence and stay unique.
+
+ensure_partitions() pre-creates future months, moving any rows that landed in the
+DEFAULT partition; detach_partitions() detaches (and optionally drops) whole old
+months, which stay queryable as plain tables until dropped.
+"""
+import re
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+TABLE = "core_sareecount"
+PARTITION_KEY = "date"
+MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first, last):
+    """Month starts from first's month through last's month, inclusive."""
+    month, last = month_start(first), month_start(last)
+    months = []
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_name(month, table=TABLE):
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(name):
+    """Month start encoded in a monthly partition name, or None (e.g. the DEFAULT partition)."""
+    match = MONTH_SUFFIX.search(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def is_supported(connection):
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned(connection, table=TABLE):
+    if not is_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(connection, table=TABLE):
+    """Names of the table's attached partitions, sorted."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            [table],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def _columns(cursor, table):
+    """Stored (non-generated) columns, in table order."""
+    cursor.execute(
+        "SELECT attname FROM pg_attribute WHERE attrelid = to_regclass(%s) "
+        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum",
+        [table],
+    )
+    return [name for (name,) in cursor.fetchall()]
+
+
+def _create_month(cursor, q, table, month):
+    cursor.execute(
+        f"CREATE TABLE {q(partition_name(month, table))} PARTITION OF {q(table)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [month.isoformat(), add_months(month, 1).isoformat()],
+    )
+
+
+def _rebuild(connection, table, partitioned, months=()):
+    """
+    Recreate `table` as a partitioned (or plain) table holding the same rows, columns,
+    indexes and constraints. Runs in the caller's transaction.
+    """
+    q = connection.ops.quote_name
+    old = f"{table}_rebuild"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f', 'c') ORDER BY contype DESC, conname",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = to_regclass(%s) AND indexrelid NOT IN "
+            "(SELECT conindid FROM pg_constraint WHERE conrelid = to_regclass(%s))",
+            [table, table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT attidentity <> '', pg_get_serial_sequence(%s, 'id') FROM pg_attribute "
+            "WHERE attrelid = to_regclass(%s) AND attname = 'id'",
+            [table, table],
+        )
+        identity, sequence = cursor.fetchone()
+        columns = ", ".join(q(c) for c in _columns(cursor, table))
+
+        cursor.execute(f"ALTER TABLE {q(table)} RENAME TO {q(old)}")
+        like = f"(LIKE {q(old)} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING IDENTITY)"
+        if partitioned:
+            cursor.execute(f"CREATE TABLE {q(table)} {like} PARTITION BY RANGE ({q(PARTITION_KEY)})")
+            for month in months:
+                _create_month(cursor, q, table, month)
+            cursor.execute(f"CREATE TABLE {q(table + '_default')} PARTITION OF {q(table)} DEFAULT")
+        else:
+            cursor.execute(f"CREATE TABLE {q(table)} {like}")
+        cursor.execute(f"INSERT INTO {q(table)} ({columns}) SELECT {columns} FROM {q(old)}")
+
+        if identity:
+            # the copied identity has its own sequence; continue after the existing ids
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {q(table)}",
+                [table],
+            )
+        elif sequence:
+            # serial column: keep the old sequence alive past DROP TABLE
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {q(table)}.id")
+        cursor.execute(f"DROP TABLE {q(old)}")
+
+        for name, kind, definition in constraints:
+            if kind == "p":
+                definition = f"PRIMARY KEY (id, {q(PARTITION_KEY)})" if partitioned else "PRIMARY KEY (id)"
+            cursor.execute(f"ALTER TABLE {q(table)} ADD CONSTRAINT {q(name)} {definition}")
+        for _, definition in indexes:
+            # definitions were read before the rename, so they already name `table`
+            cursor.execute(definition)
+
+
+def convert(connection, months_ahead=3, today=None, table=TABLE):
+    """
+    Rebuild the table as monthly partitions from its oldest row through `months_ahead`
+    months after today. Returns the number of monthly partitions created (0 if the
+    table was already partitioned).
+    Raises:
+        ValueError on a database other than PostgreSQL.
+    """
+    if not is_supported(connection):
+        raise ValueError("SareeCount partitioning needs PostgreSQL")
+    if is_partitioned(connection, table):
+        return 0
+    today = today or timezone.localdate()
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN({connection.ops.quote_name(PARTITION_KEY)}) FROM {connection.ops.quote_name(table)}")
+        oldest = cursor.fetchone()[0] or today
+    months = month_range(min(oldest, today), add_months(month_start(today), months_ahead))
+    with transaction.atomic(using=connection.alias):
+        _rebuild(connection, table, True, months)
+    return len(months)
+
+
+def unconvert(connection, table=TABLE):
+    """Rebuild a partitioned table as a plain one (reverse of convert())."""
+    if is_partitioned(connection, table):
+        with transaction.atomic(using=connection.alias):
+            _rebuild(connection, table, False)
+
+
+def ensure_partitions(connection, months_ahead=3, today=None, dry_run=False, table=TABLE):
+    """
+    Create the monthly partitions missing between the newest existing one and
+    `months_ahead` months after today. Rows for those months that landed in the DEFAULT
+    partition are moved into the new partition. Returns the names created (or that
+    would be created with dry_run).
+    """
+    q = connection.ops.quote_name
+    today = today or timezone.localdate()
+    existing = {partition_month(name) for name in list_partitions(connection, table)} - {None}
+    first = max(existing) if existing else month_start(today)
+    missing = [m for m in month_range(first, add_months(month_start(today), months_ahead)) if m not in existing]
+    if dry_run or not missing:
+        return [partition_name(m, table) for m in missing]
+
+    default = f"{table}_default"
+    columns = None
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for month in missing:
+            bounds = [month.isoformat(), add_months(month, 1).isoformat()]
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {q(default)} WHERE {q(PARTITION_KEY)} >= %s AND {q(PARTITION_KEY)} < %s)",
+                bounds,
+            )
+            if not cursor.fetchone()[0]:
+                _create_month(cursor, q, table, month)
+                continue
+            # a partition cannot be created while DEFAULT holds rows for its range
+            columns = columns or ", ".join(q(c) for c in _columns(cursor, table))
+            where = f"{q(PARTITION_KEY)} >= %s AND {q(PARTITION_KEY)} < %s"
+            cursor.execute(f"ALTER TABLE {q(table)} DETACH PARTITION {q(default)}")
+            _create_month(cursor, q, table, month)
+            cursor.execute(f"INSERT INTO {q(table)} ({columns}) SELECT {columns} FROM {q(default)} WHERE {where}", bounds)
+            cursor.execute(f"DELETE FROM {q(default)} WHERE {where}", bounds)
+            cursor.execute(f"ALTER TABLE {q(table)} ATTACH PARTITION {q(default)} DEFAULT")
+    return [partition_name(m, table) for m in missing]
+
+
+def detach_partitions(connection, before, drop=False, dry_run=False, table=TABLE):
+    """
+    Detach every monthly partition that ends on or before `before` (a month start).
+    Detached partitions remain as standalone tables (for pg_dump / archival) unless
+    `drop` is set. Returns the affected partition names.
+    """
+    q = connection.ops.quote_name
+    old = [
+        name for name in list_partitions(connection, table)
+        if partition_month(name) is not None and add_months(partition_month(name), 1) <= before
+    ]
+    if dry_run or not old:
+        return old
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for name in old:
+            cursor.execute(f"ALTER TABLE {q(table)} DETACH PARTITION {q(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {q(name)}")
+    return old
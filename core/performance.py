@@ -0,0 +1,115 @@
+# core/performance.py
+"""
+Employee performance ratings.
+
+All saree entries in the rating window are read with one query into a list of rows,
+zipped into columns and binned into an (employees x weeks) matrix of totals. An
+employee's weeks count from the earlier of their joining week and their first entry in
+the window, so a recent hire isn't scored on weeks before they started. From the counted
+weeks we derive, per employee:
+
+- output:      mean weekly sarees over the counted weeks among the most recent RECENT_WEEKS
+- consistency: 1 - coefficient of variation of the weekly totals over the counted weeks
+- percentile:  rank of `output` among employees who produced anything in the window
+
+and combine percentile and consistency into the label stored in Employee.performance.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import Employee, SareeCount
+
+RECENT_WEEKS = 4
+PERCENTILE_WEIGHT = 0.7   # the rest of the score is consistency
+
+# (minimum score, label), best first; employees with no entries in the window are INACTIVE
+RATING_BANDS = ((0.8, "Excellent"), (0.6, "Good"), (0.35, "Average"), (0.0, "Poor"))
+INACTIVE = "Inactive"
+
+
+def compute_performance(as_of, weeks=12):
+    """
+    Rate every employee on the `weeks` whole weeks ending on `as_of` (inclusive).
+    Returns {employee_id: {"rating", "output", "consistency", "percentile"}}.
+    Raises:
+        ValueError if weeks < RECENT_WEEKS.
+    """
+    import numpy as np
+
+    if weeks < RECENT_WEEKS:
+        raise ValueError(f"weeks must be at least {RECENT_WEEKS}")
+
+    employees = list(Employee.objects.order_by("id").values_list("id", "joining_date"))
+    emp_ids = np.array([emp_id for emp_id, _ in employees], dtype=np.int64)
+    start = as_of - timedelta(days=7 * weeks - 1)
+
+    # first counted week per employee: joining week, or the first entry if that is earlier
+    joined = np.array([(joining - start).days // 7 for _, joining in employees], dtype=np.int64)
+    first_week = np.clip(joined, 0, weeks)
+
+    rows = list(SareeCount.objects.filter(date__gte=start, date__lte=as_of).order_by().values_list("employee_id", "date", "count"))
+    totals = np.zeros((len(emp_ids), weeks), dtype=np.float64)
+    if rows:
+        e, d, c = zip(*rows)
+        e = np.asarray(e, dtype=np.int64)
+        emp_index = np.minimum(np.searchsorted(emp_ids, e), max(len(emp_ids) - 1, 0))
+        # drop entries of employees created after emp_ids was read
+        known = emp_ids[emp_index] == e if len(emp_ids) else np.zeros(len(e), dtype=bool)
+        days = (np.asarray(d, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+        np.add.at(totals, (emp_index[known], days[known] // 7), np.asarray(c, dtype=np.float64)[known])
+        np.minimum.at(first_week, emp_index[known], days[known] // 7)
+
+    counted = np.arange(weeks)[None, :] >= first_week[:, None]
+    n_weeks = counted.sum(axis=1)
+    n_recent = counted[:, -RECENT_WEEKS:].sum(axis=1)
+    output = np.divide(totals[:, -RECENT_WEEKS:].sum(axis=1), n_recent,
+                       out=np.zeros(len(emp_ids)), where=n_recent > 0)
+    mean = np.divide(totals.sum(axis=1), n_weeks, out=np.zeros(len(emp_ids)), where=n_weeks > 0)
+    active = mean > 0
+
+    consistency = np.zeros(len(emp_ids))
+    deviation = np.where(counted, totals - mean[:, None], 0)
+    std = np.sqrt((deviation ** 2).sum(axis=1)[active] / n_weeks[active])
+    consistency[active] = np.clip(1 - std / mean[active], 0, 1)
+
+    # mid-rank percentile so tied employees share a rank; only active employees are ranked
+    percentile = np.zeros(len(emp_ids))
+    ranked = np.sort(output[active])
+    if ranked.size:
+        below = np.searchsorted(ranked, output[active], side="left")
+        at_or_below = np.searchsorted(ranked, output[active], side="right")
+        percentile[active] = (below + at_or_below) / (2 * ranked.size)
+
+    score = PERCENTILE_WEIGHT * percentile + (1 - PERCENTILE_WEIGHT) * consistency
+    thresholds = np.array([band for band, _ in RATING_BANDS])
+    labels = np.array([label for _, label in RATING_BANDS] + [INACTIVE])
+    band_index = np.argmax(score[:, None] >= thresholds[None, :], axis=1)
+    band_index[~active] = len(RATING_BANDS)
+
+    return {
+        int(emp_id): {
+            "rating": str(labels[b]),
+            "output": round(float(o), 2),
+            "consistency": round(float(cns), 3),
+            "percentile": round(float(p), 3),
+        }
+        for emp_id, b, o, cns, p in zip(emp_ids, band_index, output, consistency, percentile)
+    }
+
+
+@transaction.atomic
+def refresh_performance(as_of, weeks=12):
+    """
+    Recompute ratings and store the ones that changed with a single bulk_update.
+    Returns (results, number of employees updated).
+    """
+    results = compute_performance(as_of, weeks)
+    current = dict(Employee.objects.order_by().values_list("id", "performance"))
+    changed = [
+        Employee(id=emp_id, performance=r["rating"])
+        for emp_id, r in results.items()
+        if current.get(emp_id) != r["rating"]
+    ]
+    Employee.objects.bulk_update(changed, ["performance"], batch_size=2000)
+    return results, len(changed)
@@ -0,0 +1,181 @@
+# core/reconcile.py
+"""
+Payroll reconciliation: recompute what SalaryHistory, Employee.advance_salary and the
+AdvanceHistory trail should contain from the raw SareeCount rows and report where they
+disagree (e.g. after an entry was deleted from admin_employee_detail).
+
+Employees are split into chunks of `chunk_size`; each chunk is checked with a fixed
+number of queries by reconcile_chunk(), in a process pool when workers > 1. The merged
+result is a JSON-serializable report plus a repair plan of kind "reconcile" for
+services.apply_plan. Checks:
+
+- salary_week_mismatch:   a SalaryHistory row's sarees / total_salary_before_advance /
+                          final_salary differ from its week's entries (paid rows are
+                          reported but never repaired)
+- salary_week_missing:    a closed week has production but no SalaryHistory row
+- advance_trail_gap:      an audit row's previous_amount differs from the new_amount of
+                          the row before it (report only)
+- advance_balance_mismatch: the live advance differs from the end of the audit trail;
+                          repaired by recording the untracked change as an ADJUST row
+"""
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate, repeat
+
+from django.db import connections
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .audit import advance_balance_lookup, audit_rows
+from .models import Employee, SalaryHistory, SareeCount
+from .services import get_week_bounds
+
+DEFAULT_CHUNK_SIZE = 200
+SALARY_FIELDS = ("sarees", "total_salary_before_advance", "final_salary")
+
+
+def _init_worker():
+    # spawned workers start without Django configured; forked ones inherit it (no-op then)
+    import django
+    django.setup()
+
+
+def reconcile_chunk(employee_ids, through):
+    """
+    Check one chunk of employees. `through` (ISO date) is the last day of the newest
+    closed week; later weeks are not expected to be archived yet.
+    Returns {"discrepancies": [...], "salary_history_updates": [...],
+             "salary_history_create": [...], "advance_history_create": [...]}.
+    """
+    through = date.fromisoformat(through)
+    result = {"discrepancies": [], "salary_history_updates": [], "salary_history_create": [], "advance_history_create": []}
+    report, today = result["discrepancies"], timezone.localdate()
+
+    current = dict(Employee.objects.filter(id__in=employee_ids).values_list("id", "advance_salary"))
+    days = defaultdict(lambda: ([], [], [], []))   # employee -> (dates, sarees, earned, rate), one entry per day
+    for emp_id, *values in (
+        SareeCount.objects.filter(employee_id__in=employee_ids)
+        .values("employee_id", "date").annotate(sarees=Sum("count"), earned=Sum("earnings"), rate=Max("rate"))
+        .order_by("employee_id", "date").values_list("employee_id", "date", "sarees", "earned", "rate")
+    ):
+        for column, value in zip(days[emp_id], values):
+            column.append(value or 0)
+    prefix = {
+        emp_id: (dates, [0, *accumulate(sarees)], [0, *accumulate(earned)], rates)
+        for emp_id, (dates, sarees, earned, rates) in days.items()
+    }
+
+    def totals(emp_id, start, end):
+        dates, sarees, earned, rates = prefix.get(emp_id, ([], [0], [0], []))
+        i, j = bisect_left(dates, start), bisect_right(dates, end)
+        return sarees[j] - sarees[i], earned[j] - earned[i], max(rates[i:j], default=0)
+
+    # SalaryHistory rows against their weeks' entries
+    archived = set()
+    for row in SalaryHistory.objects.filter(employee_id__in=employee_ids).order_by("employee_id", "week_start").values(
+        "id", "employee_id", "week_start", "week_end", "advance_salary", "paid_status", *SALARY_FIELDS
+    ):
+        archived.add((row["employee_id"], row["week_start"]))
+        sarees, earned, _ = totals(row["employee_id"], row["week_start"], row["week_end"])
+        expected = {"sarees": sarees, "total_salary_before_advance": earned, "final_salary": earned - row["advance_salary"]}
+        for field in SALARY_FIELDS:
+            if row[field] == expected[field]:
+                continue
+            report.append({
+                "check": "salary_week_mismatch", "employee_id": row["employee_id"], "salary_history_id": row["id"],
+                "week_start": row["week_start"].isoformat(), "field": field,
+                "expected": expected[field], "actual": row[field], "paid": row["paid_status"],
+            })
+            if not row["paid_status"]:
+                result["salary_history_updates"].append({
+                    "id": row["id"], "employee_id": row["employee_id"], "field": field,
+                    "before": row[field], "after": expected[field],
+                })
+
+    # advance trail continuity and end balance
+    trail = audit_rows("advance", employee_ids)
+    last = {}
+    for r in trail:
+        prev = last.get(r["employee_id"])
+        if prev is not None and r["previous_amount"] != prev["new_amount"]:
+            report.append({
+                "check": "advance_trail_gap", "employee_id": r["employee_id"], "advance_history_id": r["id"],
+                "at": r["created_at"].isoformat(), "expected": prev["new_amount"], "actual": r["previous_amount"],
+            })
+        last[r["employee_id"]] = r
+    for emp_id in employee_ids:
+        expected = last[emp_id]["new_amount"] if emp_id in last else 0
+        actual = int(current.get(emp_id) or 0)
+        if emp_id in current and actual != expected:
+            report.append({"check": "advance_balance_mismatch", "employee_id": emp_id, "expected": expected, "actual": actual})
+            result["advance_history_create"].append({
+                "employee_id": emp_id, "action_type": "ADJUST", "previous_amount": expected, "new_amount": actual,
+                "note": f"Reconciliation {today}: recorded untracked advance change",
+            })
+
+    # closed weeks with production but no SalaryHistory row
+    balance_at = advance_balance_lookup(trail, current)
+    for emp_id, (dates, _, _, _) in sorted(days.items()):
+        for monday in sorted({d - timedelta(days=d.weekday()) for d in dates}):
+            sunday = monday + timedelta(days=6)
+            if sunday > through or (emp_id, monday) in archived:
+                continue
+            sarees, earned, rate = totals(emp_id, monday, sunday)
+            if not sarees:
+                continue
+            advance = balance_at(emp_id, timezone.make_aware(datetime.combine(sunday + timedelta(days=1), time.min)))
+            report.append({"check": "salary_week_missing", "employee_id": emp_id, "week_start": monday.isoformat(), "expected": sarees})
+            result["salary_history_create"].append({
+                "employee_id": emp_id, "week_start": monday.isoformat(), "week_end": sunday.isoformat(),
+                "sarees": sarees, "salary_rate": rate, "total_salary_before_advance": earned,
+                "advance_salary": advance, "final_salary": earned - advance,
+                "notes": f"Recreated by reconciliation on {today}",
+            })
+    return result
+
+
+def reconcile_payroll(employee_ids=None, through=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """
+    Reconcile all (or the given) employees. Returns (report, repair_plan).
+    Raises:
+        ValueError if chunk_size or workers is not positive.
+    """
+    if chunk_size < 1 or workers < 1:
+        raise ValueError("chunk_size and workers must be positive")
+    if through is None:
+        monday, _ = get_week_bounds(timezone.localdate())
+        through = monday - timedelta(days=1)
+    ids = sorted(employee_ids) if employee_ids is not None else list(Employee.objects.order_by("id").values_list("id", flat=True))
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+    if workers == 1 or len(chunks) <= 1:
+        results = [reconcile_chunk(chunk, through.isoformat()) for chunk in chunks]
+    else:
+        # workers open their own connections; never share the parent's across fork()
+        connections.close_all()
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+            results = list(pool.map(reconcile_chunk, chunks, repeat(through.isoformat())))
+
+    discrepancies = [d for r in results for d in r["discrepancies"]]
+    report = {
+        "generated_at": timezone.now().isoformat(),
+        "through": through.isoformat(),
+        "employees_checked": len(ids),
+        "summary": dict(Counter(d["check"] for d in discrepancies)),
+        "discrepancies": discrepancies,
+    }
+    plan = {
+        "kind": "reconcile",
+        "through": through.isoformat(),
+        "salary_history_updates": [u for r in results for u in r["salary_history_updates"]],
+        "salary_history_create": [c for r in results for c in r["salary_history_create"]],
+        "advance_history_create": [c for r in results for c in r["advance_history_create"]],
+        "employee_updates": [],
+    }
+    return report, plan
+
@@ -0,0 +1,174 @@
+# core/scheduler.py
+"""
+Built-in weekly close: archive each Monday–Sunday week into SalaryHistory and carry
+advances, without an external cron (`manage.py run_scheduler`).
+
+A week becomes due WEEKLY_CLOSE_OFFSET_MINUTES after the midnight that ends it, in
+TIME_ZONE (default 30: Monday 00:30; negative values close on Sunday evening).
+Every tick, run_due() closes all due weeks after the last succeeded one, oldest
+first, and records each attempt as a WeeklyCloseRun (duration, rows written, error).
+
+- Only one instance acts at a time: on PostgreSQL the tick holds a session advisory
+  lock (pg_try_advisory_lock) and instances that cannot take it skip the tick. On
+  every database a week's work and its succeeded run row commit in one transaction
+  under a partial unique constraint, so a week can never be closed twice.
+- The latest due week is closed with archive_and_reset_weekly_salaries (live
+  balances, resets current_week_salary). Older missed weeks are caught up with
+  backfill_salary_history, which reconstructs the advance balance each week ended
+  with from the audit trail.
+- Advances are carried only when the latest due week closes, once, however many
+  weeks were caught up before it: carrying works on today's live balances, so
+  carrying for each missed week would apply the factor N times (factor**N) and
+  also to advances given after those weeks ended.
+- A failed week stops the catch-up (weeks are closed in order); the next tick
+  retries it.
+- With no succeeded run recorded yet, only the latest due week is closed.
+"""
+import logging
+import os
+import socket
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from . import services
+from .models import WeeklyCloseRun
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock key shared by every scheduler instance ("loom")
+LOCK_KEY = 0x6C6F6F6D
+
+
+class WeekAlreadyClosed(Exception):
+    pass
+
+
+def close_due_at(monday):
+    """When the week starting `monday` becomes due (aware, in TIME_ZONE)."""
+    ends = timezone.make_aware(datetime.combine(monday + timedelta(days=7), time.min))
+    return ends + timedelta(minutes=settings.WEEKLY_CLOSE_OFFSET_MINUTES)
+
+
+def latest_due_week(now=None):
+    """Monday of the most recent week whose close is due at `now`."""
+    now = now or timezone.now()
+    monday, _ = services.get_week_bounds(timezone.localtime(now).date())
+    while close_due_at(monday) > now:
+        monday -= timedelta(days=7)
+    return monday
+
+
+def due_weeks(now=None, since=None):
+    """
+    Mondays of the weeks due and not yet closed, oldest first: every week after the
+    last succeeded close (or from the week of `since`) through the latest due week.
+    """
+    latest = latest_due_week(now)
+    if since is not None:
+        first, _ = services.get_week_bounds(since)
+    else:
+        last = WeeklyCloseRun.objects.filter(status=WeeklyCloseRun.STATUS_SUCCEEDED).order_by("-week_start").first()
+        first = last.week_start + timedelta(days=7) if last else latest
+    closed = set(
+        WeeklyCloseRun.objects.filter(status=WeeklyCloseRun.STATUS_SUCCEEDED, week_start__gte=first)
+        .values_list("week_start", flat=True)
+    )
+    weeks = []
+    while first <= latest:
+        if first not in closed:
+            weeks.append(first)
+        first += timedelta(days=7)
+    return weeks
+
+
+def instance_name():
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+
+def close_week(monday, catch_up=False, carry_factor=None):
+    """
+    Close one week in a single transaction and record the succeeded run. Catch-up
+    weeks are archived only; advances are carried when the latest week closes.
+    On failure a failed run is recorded and the error re-raised.
+    Raises:
+        WeekAlreadyClosed if another run closed the week first.
+    """
+    carry_factor = settings.WEEKLY_CLOSE_CARRY_FACTOR if carry_factor is None else carry_factor
+    sunday = monday + timedelta(days=6)
+    run = WeeklyCloseRun(week_start=monday, week_end=sunday, catch_up=catch_up,
+                         started_at=timezone.now(), instance=instance_name())
+    try:
+        with transaction.atomic():
+            if catch_up:
+                # no carry: see the module docstring
+                run.salary_rows = services.backfill_salary_history(monday, sunday, notes=f"Weekly close (caught up) for week {monday}")
+            else:
+                run.salary_rows = services.archive_and_reset_weekly_salaries(for_date=monday)
+                run.advance_rows = services.carry_advances_to_next_week(carry_factor, note=f"Weekly close for week {monday}")
+            run.status, run.finished_at = WeeklyCloseRun.STATUS_SUCCEEDED, timezone.now()
+            run.save()
+    except IntegrityError as exc:
+        if WeeklyCloseRun.objects.filter(week_start=monday, status=WeeklyCloseRun.STATUS_SUCCEEDED).exists():
+            raise WeekAlreadyClosed(f"week {monday} was closed by another run") from exc
+        _record_failure(run, exc)
+        raise
+    except Exception as exc:
+        _record_failure(run, exc)
+        raise
+    return run
+
+
+def _record_failure(run, exc):
+    run.pk = None
+    run.salary_rows = run.advance_rows = 0
+    run.status, run.finished_at, run.error = WeeklyCloseRun.STATUS_FAILED, timezone.now(), repr(exc)
+    run.save()
+
+
+class leader_lock:
+    """
+    Context manager: the PostgreSQL session advisory lock shared by all scheduler
+    instances; `as` gives whether this instance holds it. Always True elsewhere.
+    """
+
+    def __init__(self, conn=None, key=LOCK_KEY):
+        self.conn, self.key, self.held = conn or connection, key, False
+
+    def __enter__(self):
+        if self.conn.vendor != "postgresql":
+            return True
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.key])
+            self.held = bool(cursor.fetchone()[0])
+        return self.held
+
+    def __exit__(self, *exc_info):
+        if self.held:
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [self.key])
+            self.held = False
+        return False
+
+
+def run_due(now=None, since=None):
+    """
+    Close every due week in order, as leader. Returns the WeeklyCloseRun rows written
+    by this call, or None when another instance holds the lock.
+    """
+    with leader_lock() as leader:
+        if not leader:
+            return None
+        weeks = due_weeks(now, since)
+        runs = []
+        for monday in weeks:
+            try:
+                runs.append(close_week(monday, catch_up=monday != weeks[-1]))
+            except WeekAlreadyClosed:
+                continue
+            except Exception:
+                logger.exception("Weekly close for week %s failed; later weeks wait for it", monday)
+                break
+        return runs
@@ -0,0 +1,103 @@
+# core/search.py
+"""
+Employee search for the admin employee list and the employee pickers.
+
+Employee.save() keeps three search keys next to name/phone:
+- phone_digits:          the phone with everything but digits stripped
+- phone_digits_reversed: the same digits reversed, so "ends with 4321" is a prefix search
+- name_key:              the casefolded, whitespace-collapsed name (sort key)
+
+A query made of digits (spaces, "+", "-" allowed) matches phones starting or ending with
+those digits through btree range scans. Any other query matches names: a substring
+match on PostgreSQL, served by the pg_trgm index from migration 0015 when the extension
+could be installed; elsewhere a substring match on name_key (a table scan, fine at
+workshop sizes), so a surname finds "Ravi Kumar" on either backend.
+
+Results are ordered by (name_key, id) and paged with an opaque keyset cursor, so a page
+costs the same at any depth.
+"""
+import base64
+import json
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Employee
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+PHONE_QUERY = re.compile(r"^[\d\s+\-()]+$")
+
+
+def normalize_phone(phone):
+    return re.sub(r"\D", "", phone or "")
+
+
+def normalize_name(name):
+    return " ".join((name or "").split()).casefold()
+
+
+def search_keys(name, phone):
+    """Values for Employee's derived search fields."""
+    digits = normalize_phone(phone)
+    return {"phone_digits": digits, "phone_digits_reversed": digits[::-1], "name_key": normalize_name(name)}
+
+
+def _digits_prefix(field, digits):
+    # a range instead of LIKE so a plain btree index applies on every backend:
+    # "123" -> ["123", "124"), "129" -> ["129", "13"), "99" -> ["99", no bound)
+    condition = Q(**{f"{field}__gte": digits})
+    head = digits.rstrip("9")
+    if head:
+        condition &= Q(**{f"{field}__lt": head[:-1] + str(int(head[-1]) + 1)})
+    return condition
+
+
+def encode_cursor(employee):
+    raw = json.dumps([employee.name_key, employee.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Raises:
+        ValueError for a malformed cursor.
+    """
+    try:
+        key, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(key), int(pk)
+    except (TypeError, ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def search_employees(query="", approved=None, after=None, limit=DEFAULT_LIMIT):
+    """
+    One page of employees matching `query`, in (name_key, id) order.
+    `approved` (True/False) filters on is_approved; `after` is the cursor of the
+    previous page. Returns (employees, next_cursor or None).
+    Raises:
+        ValueError for a malformed cursor.
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    employees = Employee.objects.all()
+    query = (query or "").strip()
+    if query and PHONE_QUERY.match(query) and normalize_phone(query):
+        digits = normalize_phone(query)
+        employees = employees.filter(
+            _digits_prefix("phone_digits", digits) | _digits_prefix("phone_digits_reversed", digits[::-1])
+        )
+    elif query and connection.vendor == "postgresql":
+        employees = employees.filter(name__icontains=query)
+    elif query:
+        employees = employees.filter(name_key__contains=normalize_name(query))
+    if approved is not None:
+        employees = employees.filter(is_approved=approved)
+    if after:
+        key, pk = decode_cursor(after)
+        employees = employees.filter(Q(name_key__gt=key) | Q(name_key=key, id__gt=pk))
+
+    page = list(employees.order_by("name_key", "id")[:limit + 1])
+    if len(page) > limit:
+        return page[:limit], encode_cursor(page[limit - 1])
+    return page, None
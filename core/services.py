@@ -1,13 +1,19 @@
 # core/services.py
 from django.db import transaction
-from django.db.models import Sum, F
+from django.db.models import Sum, Max, Min, F, Q
+from django.db.models.functions import TruncWeek
 from django.utils import timezone
-from datetime import timedelta, date
-from typing import Optional, Tuple
+from datetime import timedelta, date, datetime, time
+from typing import Callable, Iterable, List, Optional, Tuple
+import csv
 from django.contrib.auth.models import User
 
+from .signals import bump_employee_data_version
+from .note_search import index_records
+from .audit import advance_balance_lookup, audit_rows
 from .models import (
     Employee,
+    SalaryRateHistory,
     AdvanceHistory,
     SalaryHistory,
     SareeCount,
@@ -24,8 +30,13 @@ Services module
 Design notes:
 - All mutating functions that affect money/advance fields use select_for_update()
   and transaction.atomic() to prevent race conditions when multiple admins
-  operate concurrently.
+  operate concurrently. Queries inside an atomic block always go to the primary
+  database (core.db_router), so services never read from the read replica.
+  SQLite ignores select_for_update(); in the tuned SQLite mode (settings.SQLITE_TUNED)
+  every atomic block starts with BEGIN IMMEDIATE, which serializes them instead.
 - Archive/reset is idempotent by checking existing SalaryHistory rows for the week.
+- Weekly reset and advance carry are split into a read-only plan_* step (no locks) and
+  apply_plan, so dry runs are cheap and a saved plan can be applied later as-is.
 """
 
 def get_week_bounds(for_date: Optional[date] = None) -> Tuple[date, date]:
@@ -68,6 +79,77 @@ def give_advance(employee_id: int, amount: int, admin_user: Optional[User] = Non
     return ah
 
 
+def parse_bulk_advance_csv(lines: Iterable[str]) -> List[Tuple[int, int, str]]:
+    """
+    Parse bulk advance rows from CSV text with header `employee_id,amount[,note]`.
+    Returns a list of (employee_id, amount, note) tuples in file order.
+
+    Raises:
+      ValueError naming the offending line on missing columns or non-integer values.
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or not {"employee_id", "amount"} <= set(reader.fieldnames):
+        raise ValueError("CSV header must contain employee_id and amount columns")
+
+    rows = []
+    for line_no, rec in enumerate(reader, start=2):
+        try:
+            emp_id = int((rec.get("employee_id") or "").strip())
+            amount = int((rec.get("amount") or "").strip())
+        except ValueError:
+            raise ValueError(f"line {line_no}: employee_id and amount must be integers")
+        rows.append((emp_id, amount, (rec.get("note") or "").strip()))
+    return rows
+
+
+@transaction.atomic
+def give_advances_bulk(rows: Iterable[Tuple[int, int, str]], admin_user: Optional[User] = None, note: str = "") -> List[AdvanceHistory]:
+    """
+    Bulk variant of give_advance for many (employee_id, amount, note) rows.
+
+    - Employees are locked in ascending id order so concurrent bulk runs cannot deadlock.
+    - Balances are written with a single bulk_update and audit rows with a single bulk_create.
+    - Several rows for the same employee are applied in input order, each with its own audit row.
+
+    Raises:
+      ValueError on a non-positive amount, Employee.DoesNotExist if any employee is missing.
+      Nothing is written when either is raised.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    for emp_id, amount, _ in rows:
+        if amount <= 0:
+            raise ValueError(f"amount for employee {emp_id} must be a positive integer")
+
+    ids = sorted({int(emp_id) for emp_id, _, _ in rows})
+    employees = {e.id: e for e in Employee.objects.select_for_update().filter(id__in=ids).order_by("id")}
+    missing = [i for i in ids if i not in employees]
+    if missing:
+        raise Employee.DoesNotExist(f"Employee(s) not found: {missing}")
+
+    now = timezone.now()
+    history = []
+    for emp_id, amount, row_note in rows:
+        emp = employees[int(emp_id)]
+        previous = int(emp.advance_salary or 0)
+        emp.advance_salary = previous + int(amount)
+        emp.updated_at = now
+        history.append(AdvanceHistory(
+            employee=emp,
+            admin_user=admin_user,
+            action_type="ADJUST",
+            previous_amount=previous,
+            new_amount=emp.advance_salary,
+            note=row_note or note or f"Advance given: {amount}",
+        ))
+
+    Employee.objects.bulk_update(list(employees.values()), ["advance_salary", "updated_at"])
+    created = AdvanceHistory.objects.bulk_create(history)
+    index_records(created, created=True)
+    return created
+
+
 @transaction.atomic
 def clear_advance_for_employee(employee_id: int, admin_user: Optional[User] = None, note: str = "") -> AdvanceHistory:
     """
@@ -101,23 +183,155 @@ def clear_advance_for_employee(employee_id: int, admin_user: Optional[User] = No
     return ah
 
 
+@transaction.atomic
+def set_salary_rate(employee_id: int, rate: int, effective_from: Optional[date] = None, admin_user: Optional[User] = None, note: str = "") -> SalaryRateHistory:
+    """
+    Record a per-saree rate effective from a date (default today) and re-rate affected production.
+
+    - SareeCount rows from effective_from up to the next recorded rate change get the new rate
+      with one UPDATE; weeks already marked paid keep the rate they were paid at.
+    - Unpaid SalaryHistory rows in that span are recomputed from the stored earnings.
+    - employee.salary_per_saree follows the rate in effect today.
+    - The first change for an employee also records their previous rate from their first
+      day, so earlier production keeps the rate it was made at.
+
+    Raises:
+      ValueError on a negative rate, Employee.DoesNotExist if employee missing.
+    """
+    if rate < 0:
+        raise ValueError("rate must be a non-negative integer")
+    if effective_from is None:
+        effective_from = timezone.localdate()
+
+    emp = Employee.objects.select_for_update().get(id=employee_id)
+    if not emp.rate_history.exists():
+        # first recorded change: keep the rate used so far on record from the employee's first
+        # day, or rate_on() would price everything before effective_from at the new rate
+        first_entry = SareeCount.objects.filter(employee=emp).aggregate(Min("date"))["date__min"]
+        since = min(d for d in (emp.joining_date, first_entry, effective_from) if d)
+        if since < effective_from:
+            SalaryRateHistory.objects.create(
+                employee=emp, effective_from=since, rate=int(emp.salary_per_saree or 0),
+                admin_user=admin_user, note="Rate before the first recorded change",
+            )
+    entry, _ = SalaryRateHistory.objects.update_or_create(
+        employee=emp, effective_from=effective_from,
+        defaults={"rate": int(rate), "admin_user": admin_user, "note": note or f"Rate set to {rate}"},
+    )
+
+    next_change = (
+        SalaryRateHistory.objects.filter(employee=emp, effective_from__gt=effective_from)
+        .order_by("effective_from").values_list("effective_from", flat=True).first()
+    )
+    span = Q(employee=emp, date__gte=effective_from)
+    if next_change:
+        span &= Q(date__lt=next_change)
+
+    paid_weeks = SalaryHistory.objects.filter(employee=emp, paid_status=True, week_end__gte=effective_from)
+    if next_change:
+        paid_weeks = paid_weeks.filter(week_start__lt=next_change)
+    for week_start, week_end in paid_weeks.values_list("week_start", "week_end"):
+        span &= ~Q(date__gte=week_start, date__lte=week_end)
+    SareeCount.objects.filter(span).update(rate=int(rate), updated_at=timezone.now())
+
+    unpaid = SalaryHistory.objects.filter(employee=emp, paid_status=False, week_end__gte=effective_from)
+    if next_change:
+        unpaid = unpaid.filter(week_start__lt=next_change)
+    unpaid = list(unpaid)
+    now = timezone.now()
+    for sh in unpaid:
+        earned = SareeCount.objects.filter(employee=emp, date__gte=sh.week_start, date__lte=sh.week_end).aggregate(Sum("earnings"))["earnings__sum"] or 0
+        sh.salary_rate = int(rate)
+        sh.total_salary_before_advance = earned
+        sh.final_salary = earned - sh.advance_salary
+        sh.updated_at = now
+    SalaryHistory.objects.bulk_update(unpaid, ["salary_rate", "total_salary_before_advance", "final_salary", "updated_at"])
+    bump_employee_data_version(emp.id)
+
+    current = emp.rate_on(timezone.localdate())
+    if current != emp.salary_per_saree:
+        emp.salary_per_saree = current
+        emp.save(update_fields=["salary_per_saree", "updated_at"])
+    return entry
+
+
+def _salary_numbers(sarees: int, salary_rate: Optional[int], advance: Optional[int], earned: Optional[int] = None) -> dict:
+    # earned: sum of the stored SareeCount.earnings; falls back to sarees * rate when not given
+    sarees = int(sarees or 0)
+    salary_rate = int(salary_rate or 0)
+    total_before_advance = int(earned) if earned is not None else sarees * salary_rate
+    advance_applied = int(advance or 0)
+    return {
+        "sarees": sarees,
+        "salary_rate": salary_rate,
+        "total_before_advance": total_before_advance,
+        "advance_applied": advance_applied,
+        "final_salary": total_before_advance - advance_applied,
+    }
+
+
 def compute_salary_for_employee_for_week(employee: Employee, week_start: date, week_end: date) -> dict:
     """
     Compute weekly salary numbers for an employee deterministically.
     Returns a dict with keys:
       sarees, salary_rate, total_before_advance, advance_applied, final_salary
     """
-    sarees = SareeCount.objects.filter(employee=employee, date__gte=week_start, date__lte=week_end).aggregate(Sum("count"))["count__sum"] or 0
-    salary_rate = int(employee.salary_per_saree or 0)
-    total_before_advance = int(sarees) * salary_rate
-    advance_applied = int(employee.advance_salary or 0)
-    final = total_before_advance - advance_applied
+    totals = SareeCount.objects.filter(employee=employee, date__gte=week_start, date__lte=week_end).aggregate(sarees=Sum("count"), earned=Sum("earnings"))
+    return _salary_numbers(totals["sarees"], employee.salary_per_saree, employee.advance_salary, totals["earned"] or 0)
+
+
+def plan_weekly_reset(for_date: Optional[date] = None, notes: str = "", employees: Optional[Iterable[Employee]] = None) -> dict:
+    """
+    Compute, read-only and without locks, the changes archive_and_reset_weekly_salaries would make.
+    Week totals come from one grouped SareeCount query and existing archives from one SalaryHistory query.
+
+    Returns a JSON-serializable plan (dates as ISO strings) that apply_plan can apply as-is:
+      {"kind": "weekly_reset", "week_start", "week_end",
+       "salary_history_create": [{employee_id, sarees, salary_rate, total_salary_before_advance,
+                                  advance_salary, final_salary, notes}],
+       "employee_updates": [{employee_id, field, before, after}]}
+
+    employees: optional pre-fetched (e.g. locked) Employee rows; defaults to all employees.
+    """
+    monday, sunday = (get_week_bounds(for_date) if for_date else get_week_bounds())
+    if employees is None:
+        employees = Employee.objects.order_by("id")
+
+    week_totals = {
+        row[0]: row[1:] for row in
+        SareeCount.objects.filter(date__gte=monday, date__lte=sunday)
+        .values("employee_id").annotate(sarees=Sum("count"), earned=Sum("earnings"))
+        .values_list("employee_id", "sarees", "earned")
+    }
+    archived = set(
+        SalaryHistory.objects.filter(week_start=monday, week_end=sunday).values_list("employee_id", flat=True)
+    )
+    note = notes or f"Archived by scheduled reset on {timezone.localdate()}"
+
+    creates, updates = [], []
+    for emp in employees:
+        if emp.id not in archived:
+            sarees, earned = week_totals.get(emp.id, (0, 0))
+            numbers = _salary_numbers(sarees, emp.salary_per_saree, emp.advance_salary, earned or 0)
+            creates.append({
+                "employee_id": emp.id,
+                "sarees": numbers["sarees"],
+                "salary_rate": numbers["salary_rate"],
+                "total_salary_before_advance": numbers["total_before_advance"],
+                "advance_salary": numbers["advance_applied"],
+                "final_salary": numbers["final_salary"],
+                "notes": note,
+            })
+        # zero the live running aggregate (also catches leftovers on already-archived weeks)
+        if emp.current_week_salary != 0:
+            updates.append({"employee_id": emp.id, "field": "current_week_salary", "before": emp.current_week_salary, "after": 0})
+
     return {
-        "sarees": int(sarees),
-        "salary_rate": salary_rate,
-        "total_before_advance": total_before_advance,
-        "advance_applied": advance_applied,
-        "final_salary": final,
+        "kind": "weekly_reset",
+        "week_start": monday.isoformat(),
+        "week_end": sunday.isoformat(),
+        "salary_history_create": creates,
+        "employee_updates": updates,
     }
 
 
@@ -128,46 +342,110 @@ def archive_and_reset_weekly_salaries(for_date: Optional[date] = None, admin_use
     Idempotent: skips employees for whom a SalaryHistory record for the same week already exists.
     Returns number of SalaryHistory rows created.
 
+    Implemented as plan_weekly_reset over locked rows followed by apply_plan, so a dry run
+    and a real run can never disagree.
+
     Important behavior:
     - This function **does not** modify employee.advance_salary. Advances are carried by default;
       clearing advances should be an explicit admin action and will be recorded in AdvanceHistory.
     """
-    monday, sunday = (get_week_bounds(for_date) if for_date else get_week_bounds())
-    created = 0
-
     # Lock employees to prevent concurrent changes to advance_salary/current_week_salary during archiving.
-    employees = Employee.objects.select_for_update().all()
+    employees = list(Employee.objects.select_for_update().order_by("id"))
+    plan = plan_weekly_reset(for_date, notes=notes, employees=employees)
+    return apply_plan(plan, admin_user)["created"]
 
-    for emp in employees:
-        # Skip if already archived for this week (idempotent)
-        exists = SalaryHistory.objects.filter(employee=emp, week_start=monday, week_end=sunday).exists()
-        if exists:
-            # ensure live field is zeroed if leftover
-            if emp.current_week_salary != 0:
-                emp.current_week_salary = 0
-                emp.save(update_fields=["current_week_salary", "updated_at"])
+
+def _advance_balances_at(employee_ids: Iterable[int], since: datetime) -> Callable[[int, datetime], int]:
+    """
+    Reconstruct historical advance balances from the AdvanceHistory trail, including
+    rows already moved to the audit archive.
+
+    The balance at instant T is the previous_amount of the first audit row recorded at or
+    after T; with no later row it is the employee's current advance_salary.
+    Returns a lookup function (employee_id, T) -> balance, valid for T >= since.
+    """
+    employee_ids = list(employee_ids)
+    current = dict(Employee.objects.filter(id__in=employee_ids).values_list("id", "advance_salary"))
+    return advance_balance_lookup(audit_rows("advance", employee_ids, since=since), current)
+
+
+def plan_salary_backfill(start: date, end: date, notes: str = "") -> dict:
+    """
+    Compute, read-only, the SalaryHistory rows missing for every week between start and end.
+
+    Production is grouped by (employee, week) in a single TruncWeek query; (employee, week)
+    pairs that already have a SalaryHistory row are skipped, as are weeks without production.
+    Each row uses the earnings stored on that week's entries and the advance balance as of its end,
+    reconstructed from AdvanceHistory. Live employee fields are never touched.
+
+    Returns a JSON-serializable plan for apply_plan:
+      {"kind": "salary_backfill", "week_start", "week_end",
+       "salary_history_create": [{employee_id, week_start, week_end, sarees, salary_rate,
+                                  total_salary_before_advance, advance_salary, final_salary, notes}]}
+
+    Raises:
+      ValueError if end is before start.
+    """
+    if end < start:
+        raise ValueError("end must not be before start")
+    first_monday, _ = get_week_bounds(start)
+    _, last_sunday = get_week_bounds(end)
+
+    weekly = list(
+        SareeCount.objects.filter(date__gte=first_monday, date__lte=last_sunday)
+        .annotate(week=TruncWeek("date"))
+        .values("employee_id", "week")
+        .annotate(total=Sum("count"), earned=Sum("earnings"), rate=Max("rate"))
+        .order_by("employee_id", "week")
+    )
+    existing = set(
+        SalaryHistory.objects.filter(week_start__gte=first_monday, week_start__lte=last_sunday)
+        .values_list("employee_id", "week_start")
+    )
+    emp_ids = {w["employee_id"] for w in weekly}
+    since = timezone.make_aware(datetime.combine(first_monday, time.min))
+    advance_at = _advance_balances_at(emp_ids, since)
+    today = timezone.localdate()
+
+    creates = []
+    for w in weekly:
+        monday = w["week"]
+        if isinstance(monday, datetime):
+            monday = monday.date()
+        if (w["employee_id"], monday) in existing:
             continue
+        sunday = monday + timedelta(days=6)
+        week_closed_at = timezone.make_aware(datetime.combine(sunday + timedelta(days=1), time.min))
+        numbers = _salary_numbers(w["total"], w["rate"], advance_at(w["employee_id"], week_closed_at), w["earned"] or 0)
+        creates.append({
+            "employee_id": w["employee_id"],
+            "week_start": monday.isoformat(),
+            "week_end": sunday.isoformat(),
+            "sarees": numbers["sarees"],
+            "salary_rate": numbers["salary_rate"],
+            "total_salary_before_advance": numbers["total_before_advance"],
+            "advance_salary": numbers["advance_applied"],
+            "final_salary": numbers["final_salary"],
+            "notes": notes or f"Backfilled for week {monday} on {today}",
+        })
 
-        numbers = compute_salary_for_employee_for_week(emp, monday, sunday)
-        SalaryHistory.objects.create(
-            employee=emp,
-            week_start=monday,
-            week_end=sunday,
-            sarees=numbers["sarees"],
-            salary_rate=numbers["salary_rate"],
-            total_salary_before_advance=numbers["total_before_advance"],
-            advance_salary=numbers["advance_applied"],
-            final_salary=numbers["final_salary"],
-            paid_status=False,
-            paid_date=None,
-            notes=notes or f"Archived by scheduled reset on {timezone.localdate()}",
-        )
-        # zero the live running aggregate
-        emp.current_week_salary = 0
-        emp.save(update_fields=["current_week_salary", "updated_at"])
-        created += 1
+    return {
+        "kind": "salary_backfill",
+        "week_start": first_monday.isoformat(),
+        "week_end": last_sunday.isoformat(),
+        "salary_history_create": creates,
+        "employee_updates": [],
+    }
 
-    return created
+
+@transaction.atomic
+def backfill_salary_history(start: date, end: date, admin_user: Optional[User] = None, notes: str = "") -> int:
+    """
+    Create all missing SalaryHistory rows between start and end in one pass (see plan_salary_backfill).
+    Idempotent: weeks that already exist are skipped. Returns number of rows created.
+    """
+    plan = plan_salary_backfill(start, end, notes=notes)
+    return apply_plan(plan, admin_user)["created"]
 
 
 @transaction.atomic
@@ -179,7 +457,7 @@ def finish_pagdi(pagdi_id: int, admin_user: Optional[User] = None, note: str = "
     p = PagdiHistory.objects.select_for_update().get(id=pagdi_id)
     prev_end = p.end_date
     p.end_date = timezone.localdate()
-    p.save(update_fields=["end_date"])
+    p.save(update_fields=["end_date", "updated_at"])
     PagdiChangeHistory.objects.create(
         pagdi=p,
         employee=p.employee,
@@ -194,6 +472,90 @@ def finish_pagdi(pagdi_id: int, admin_user: Optional[User] = None, note: str = "
     return p
 
 
+@transaction.atomic
+def assign_pagdi(employee_id: int, start_date: date, capacity: int, admin_user: Optional[User] = None, notes: str = "") -> PagdiHistory:
+    """
+    Start a new pagdi for an employee, finishing the active one first.
+    The employee row is locked so concurrent assignments queue up instead of tripping
+    the one-active-pagdi constraint.
+    Raises:
+        Employee.DoesNotExist for an unknown employee.
+    """
+    emp = Employee.objects.select_for_update().get(id=employee_id)
+    active = PagdiHistory.objects.filter(employee=emp, end_date__isnull=True).first()
+    if active:
+        finish_pagdi(active.id, admin_user, "Auto-finish due to new assignment")
+    pagdi = PagdiHistory.objects.create(employee=emp, start_date=start_date, capacity_sarees=capacity, notes=notes)
+    PagdiChangeHistory.objects.create(pagdi=pagdi, employee=emp, admin_user=admin_user, action="CREATE", new_capacity=capacity, note=notes)
+    return pagdi
+
+
+@transaction.atomic
+def assign_warp(employee_id: int, capacity: int, start_date: Optional[date] = None) -> WarpHistory:
+    """
+    Start a new warp for an employee, ending the active one today.
+    Raises:
+        Employee.DoesNotExist for an unknown employee.
+    """
+    emp = Employee.objects.select_for_update().get(id=employee_id)
+    today = timezone.localdate()
+    WarpHistory.objects.filter(employee=emp, end_date__isnull=True).update(end_date=today, updated_at=timezone.now())
+    return WarpHistory.objects.create(employee=emp, capacity_sarees=capacity, start_date=start_date or today)
+
+
+def plan_carry_advances(carry_factor: float = 1.0, note: str = "", employees: Optional[Iterable[Employee]] = None) -> dict:
+    """
+    Compute, read-only and without locks, the changes carry_advances_to_next_week would make.
+
+    Returns a JSON-serializable plan that apply_plan can apply as-is:
+      {"kind": "carry_advance", "carry_factor",
+       "employee_updates": [{employee_id, field, before, after}],
+       "advance_history_create": [{employee_id, action_type, previous_amount, new_amount, note}]}
+
+    Raises:
+      ValueError if carry_factor is negative.
+    """
+    if carry_factor < 0:
+        raise ValueError("carry_factor must be non-negative")
+    if employees is None:
+        employees = Employee.objects.order_by("id")
+
+    updates, audits = [], []
+    for emp in employees:
+        prev = int(emp.advance_salary or 0)
+        # We still record a history entry when prev == 0 (no-op) so audits show an attempted carry.
+        if prev == 0:
+            audits.append({
+                "employee_id": emp.id,
+                "action_type": "CARRY",
+                "previous_amount": 0,
+                "new_amount": 0,
+                "note": f"No-op carry: {note}" if note else "No outstanding advance to carry",
+            })
+            continue
+
+        # compute new carried amount (rounding -> int), enforcing non-negative (sanity)
+        new_amount = max(0, int(prev * float(carry_factor)))
+
+        # Avoid unnecessary writes if identical; the audit entry is still created
+        if new_amount != prev:
+            updates.append({"employee_id": emp.id, "field": "advance_salary", "before": prev, "after": new_amount})
+        audits.append({
+            "employee_id": emp.id,
+            "action_type": "CARRY",
+            "previous_amount": prev,
+            "new_amount": new_amount,
+            "note": note or f"Carried with factor {carry_factor}",
+        })
+
+    return {
+        "kind": "carry_advance",
+        "carry_factor": carry_factor,
+        "employee_updates": updates,
+        "advance_history_create": audits,
+    }
+
+
 @transaction.atomic
 def carry_advances_to_next_week(carry_factor: float = 1.0, admin_user: Optional[User] = None, note: str = "") -> int:
     """
@@ -204,9 +566,9 @@ def carry_advances_to_next_week(carry_factor: float = 1.0, admin_user: Optional[
                   Values >1 will increase the advance (rare but allowed).
 
     Behavior:
-    - For each employee with advance_salary != 0, lock the row, compute new_amount = int(prev * carry_factor).
-    - Save new_amount back to employee.advance_salary.
-    - Create an AdvanceHistory record with action_type="CARRY".
+    - Lock every employee row, compute new_amount = int(prev * carry_factor) for each via plan_carry_advances.
+    - Save changed amounts back to employee.advance_salary with a single bulk update.
+    - Create an AdvanceHistory record with action_type="CARRY" for every employee.
     - Returns the number of processed employees (rows changed or recorded as no-op when factor == 1.0).
 
     Idempotency note:
@@ -219,47 +581,138 @@ def carry_advances_to_next_week(carry_factor: float = 1.0, admin_user: Optional[
     if carry_factor < 0:
         raise ValueError("carry_factor must be non-negative")
 
-    processed = 0
-
     # Lock employees to avoid races with give/clear operations.
-    qs = Employee.objects.select_for_update().all()
-    for emp in qs:
-        prev = int(emp.advance_salary or 0)
-        # We will still record a history entry even if prev == 0 (no-op) so audits show an attempted carry.
-        if prev == 0:
-            AdvanceHistory.objects.create(
-                employee=emp,
-                admin_user=admin_user,
-                action_type="CARRY",
-                previous_amount=0,
-                new_amount=0,
-                note=f"No-op carry: {note}" if note else "No outstanding advance to carry"
-            )
-            processed += 1
-            continue
+    employees = list(Employee.objects.select_for_update().order_by("id"))
+    plan = plan_carry_advances(carry_factor, note=note, employees=employees)
+    return apply_plan(plan, admin_user)["created"]
+
+
+def _check_weekly_reset_numbers(plan: dict, creates: List[dict], employees: dict) -> None:
+    # a weekly reset archives numbers computed when the plan was made: the week's saree totals,
+    # the rate and the advance must still be what the locked rows and the week's entries say now
+    if not creates:
+        return
+    monday, sunday = date.fromisoformat(plan["week_start"]), date.fromisoformat(plan["week_end"])
+    week_totals = {
+        row[0]: row[1:] for row in
+        SareeCount.objects.filter(employee_id__in=[c["employee_id"] for c in creates], date__gte=monday, date__lte=sunday)
+        .values("employee_id").annotate(sarees=Sum("count"), earned=Sum("earnings"))
+        .values_list("employee_id", "sarees", "earned")
+    }
+    checked = (("sarees", "sarees"), ("salary_rate", "salary_rate"),
+               ("total_salary_before_advance", "total_before_advance"), ("advance_salary", "advance_applied"))
+    for c in creates:
+        emp = employees[c["employee_id"]]
+        sarees, earned = week_totals.get(emp.id, (0, 0))
+        live = _salary_numbers(sarees, emp.salary_per_saree, emp.advance_salary, earned or 0)
+        for field, key in checked:
+            if live[key] != c[field]:
+                raise ValueError(f"stale plan: employee {emp.id} {field} is {live[key]}, plan expected {c[field]}")
 
-        # compute new carried amount (rounding -> int)
-        new_amount = int(prev * float(carry_factor))
-        # Enforce non-negative (sanity)
-        if new_amount < 0:
-            new_amount = 0
 
-        # Avoid unnecessary writes if identical
-        if new_amount != prev:
-            emp.advance_salary = new_amount
-            emp.save(update_fields=["advance_salary", "updated_at"])
-        else:
-            # if unchanged, still proceed to create audit entry
-            pass
+@transaction.atomic
+def apply_plan(plan: dict, admin_user: Optional[User] = None) -> dict:
+    """
+    Apply a plan produced by plan_weekly_reset, plan_salary_backfill, plan_carry_advances or
+    core.reconcile exactly as recorded.
 
-        AdvanceHistory.objects.create(
-            employee=emp,
-            admin_user=admin_user,
-            action_type="CARRY",
-            previous_amount=prev,
-            new_amount=new_amount,
-            note=note or f"Carried with factor {carry_factor}"
-        )
-        processed += 1
+    Affected employees are locked in id order and every recorded "before" value (and, for
+    carries, every previous_amount) is checked against the live row first, so a plan computed
+    earlier cannot overwrite changes made since. Weekly reset rows are also recomputed from the
+    locked employees and the week's saree entries and must match what the plan would archive
+    (sarees, rate, total and advance). Returns {"updated": n, "created": m}.
 
-    return processed
+    Reconcile plans may also correct unpaid SalaryHistory rows ("salary_history_updates",
+    checked against their recorded "before" values) and add ADJUST audit rows for advance
+    changes that were never recorded (the live balance must still equal new_amount).
+
+    Raises:
+      ValueError if the plan kind is unknown or the plan is stale; nothing is written then.
+    """
+    kind = plan.get("kind")
+    if kind not in ("weekly_reset", "salary_backfill", "carry_advance", "reconcile"):
+        raise ValueError(f"unknown plan kind: {kind!r}")
+
+    updates = plan.get("employee_updates", [])
+    salary_creates = [] if kind == "carry_advance" else plan.get("salary_history_create", [])
+    advance_creates = plan.get("advance_history_create", []) if kind in ("carry_advance", "reconcile") else []
+    salary_updates = plan.get("salary_history_updates", []) if kind == "reconcile" else []
+
+    ids = sorted({r["employee_id"] for r in (*updates, *salary_creates, *advance_creates, *salary_updates)})
+    employees = {e.id: e for e in Employee.objects.select_for_update().filter(id__in=ids).order_by("id")}
+    missing = [i for i in ids if i not in employees]
+    if missing:
+        raise ValueError(f"stale plan: employee(s) no longer exist: {missing}")
+
+    for u in updates:
+        current = getattr(employees[u["employee_id"]], u["field"])
+        if current != u["before"]:
+            raise ValueError(f"stale plan: employee {u['employee_id']} {u['field']} is {current}, plan expected {u['before']}")
+
+    if kind == "weekly_reset":
+        _check_weekly_reset_numbers(plan, salary_creates, employees)
+
+    # validate everything against the locked rows before writing anything
+    history = SalaryHistory.objects.select_for_update().in_bulk([u["id"] for u in salary_updates]) if salary_updates else {}
+    for u in salary_updates:
+        row = history.get(u["id"])
+        if row is None or row.paid_status:
+            raise ValueError(f"stale plan: salary history {u['id']} is gone or already paid")
+        if getattr(row, u["field"]) != u["before"]:
+            raise ValueError(f"stale plan: salary history {u['id']} {u['field']} is {getattr(row, u['field'])}, plan expected {u['before']}")
+
+    salary_rows = []
+    for c in salary_creates:
+        fields = {k: v for k, v in c.items() if k not in ("employee_id", "week_start", "week_end")}
+        salary_rows.append(SalaryHistory(
+            employee=employees[c["employee_id"]],
+            week_start=date.fromisoformat(c.get("week_start", plan.get("week_start"))),
+            week_end=date.fromisoformat(c.get("week_end", plan.get("week_end"))),
+            paid_status=False, paid_date=None, **fields,
+        ))
+    if salary_rows:
+        wanted = {(r.employee_id, r.week_start) for r in salary_rows}
+        already = sorted(
+            pair for pair in SalaryHistory.objects.filter(
+                employee_id__in={r.employee_id for r in salary_rows}, week_start__in={r.week_start for r in salary_rows}
+            ).values_list("employee_id", "week_start")
+            if pair in wanted
+        )
+        if already:
+            raise ValueError(f"stale plan: week already archived for (employee, week) {already}")
+
+    # carries record a change about to be made (live balance == previous_amount); reconcile
+    # plans record one already made outside the audit trail (live balance == new_amount)
+    balance_key = "new_amount" if kind == "reconcile" else "previous_amount"
+    for c in advance_creates:
+        current = int(employees[c["employee_id"]].advance_salary or 0)
+        if current != c[balance_key]:
+            raise ValueError(f"stale plan: employee {c['employee_id']} advance is {current}, plan expected {c[balance_key]}")
+    advance_rows = [
+        AdvanceHistory(employee=employees[c["employee_id"]], admin_user=admin_user, **{k: v for k, v in c.items() if k != "employee_id"})
+        for c in advance_creates
+    ]
+
+    now = timezone.now()
+    if salary_updates:
+        for u in salary_updates:
+            row = history[u["id"]]
+            setattr(row, u["field"], u["after"])
+            row.updated_at = now
+        SalaryHistory.objects.bulk_update(list(history.values()), sorted({u["field"] for u in salary_updates}) + ["updated_at"])
+    if salary_rows:
+        index_records(SalaryHistory.objects.bulk_create(salary_rows), created=True)
+    if advance_rows:
+        index_records(AdvanceHistory.objects.bulk_create(advance_rows), created=True)
+    bump_employee_data_version(*{r.employee_id for r in (*history.values(), *salary_rows)})
+
+    changed = {}
+    for u in updates:
+        emp = employees[u["employee_id"]]
+        setattr(emp, u["field"], u["after"])
+        emp.updated_at = now
+        changed.setdefault(u["field"], []).append(emp)
+    for field, emps in changed.items():
+        Employee.objects.bulk_update(emps, [field, "updated_at"])
+
+    return {"updated": len(updates) + len(salary_updates), "created": len(salary_rows) + len(advance_rows)}
@@ -0,0 +1,75 @@
+# core/signals.py
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    Employee, SareeCount, PagdiHistory, WarpHistory, SalaryHistory, AdvanceHistory, PagdiChangeHistory,
+)
+from .note_search import index_records, unindex_records, NOTE_KINDS, NOTE_SOURCES
+from .thumbnails import schedule_thumbnails
+
+
+def bump_employee_data_version(*employee_ids):
+    """
+    Increment Employee.data_version for the given employees in one UPDATE.
+    Called by the signal receivers below and by services that write with
+    bulk_create/bulk_update/update(), which do not send signals.
+    """
+    ids = {i for i in employee_ids if i is not None}
+    if ids:
+        Employee.objects.filter(id__in=ids).update(data_version=F("data_version") + 1)
+
+
+@receiver(post_save, sender=SareeCount)
+@receiver(post_delete, sender=SareeCount)
+@receiver(post_save, sender=PagdiHistory)
+@receiver(post_delete, sender=PagdiHistory)
+@receiver(post_save, sender=WarpHistory)
+@receiver(post_delete, sender=WarpHistory)
+@receiver(post_save, sender=SalaryHistory)
+@receiver(post_delete, sender=SalaryHistory)
+def employee_data_changed(sender, instance, **kwargs):
+    bump_employee_data_version(instance.employee_id)
+
+
+@receiver(post_save, sender=SareeCount)
+@receiver(post_save, sender=PagdiHistory)
+@receiver(post_save, sender=WarpHistory)
+@receiver(post_save, sender=SalaryHistory)
+@receiver(post_save, sender=AdvanceHistory)
+@receiver(post_save, sender=PagdiChangeHistory)
+def note_saved(sender, instance, created, **kwargs):
+    field = NOTE_SOURCES[NOTE_KINDS[sender]][1]
+    # nothing to add or replace for a new record without a note
+    if not created or (getattr(instance, field) or "").strip():
+        index_records([instance], created=created)
+
+
+@receiver(post_delete, sender=SareeCount)
+@receiver(post_delete, sender=PagdiHistory)
+@receiver(post_delete, sender=WarpHistory)
+@receiver(post_delete, sender=SalaryHistory)
+def note_deleted(sender, instance, **kwargs):
+    unindex_records(NOTE_KINDS[sender], [instance.pk])
+
+
+def _picture_name(instance):
+    # read the raw attribute so a deferred profile_picture is not fetched just to compare
+    value = instance.__dict__.get("profile_picture")
+    return getattr(value, "name", value) or ""
+
+
+@receiver(post_init, sender=Employee)
+def remember_profile_picture(sender, instance, **kwargs):
+    instance._loaded_profile_picture = _picture_name(instance)
+
+
+@receiver(post_save, sender=Employee)
+def profile_picture_changed(sender, instance, **kwargs):
+    if "profile_picture" not in instance.__dict__:
+        return
+    name = _picture_name(instance)
+    if name != instance._loaded_profile_picture:
+        instance._loaded_profile_picture = name
+        schedule_thumbnails(instance.id)
@@ -0,0 +1,12 @@
+# core/templatetags/avatars.py
+from django import template
+
+from core.thumbnails import thumbnail_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(employee, size):
+    """Smallest stored profile picture variant covering `size` px ("" if none)."""
+    return thumbnail_url(employee, int(size))
@@ -0,0 +1,75 @@
+# core/tests/test_audit_archive.py
+import io
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core import services
+from core.audit import archive_audit_rows, audit_rows
+from core.models import AdvanceHistory, AuditArchive, Employee, PagdiChangeHistory, PagdiHistory
+
+
+def at(y, m, d):
+    return timezone.make_aware(datetime(y, m, d, 12))
+
+
+class AuditArchiveTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username="5550001", password="pw")
+        self.emp = Employee.objects.create(user=user, name="W1", phone="5550001")
+        # balance 0 -> 100 (Jan 5) -> 150 (Jan 20) -> 0 (Feb 3) -> 70 (Jun 1, stays live)
+        for when, prev, new, action in [
+            (at(2025, 1, 5), 0, 100, "ADJUST"), (at(2025, 1, 20), 100, 150, "ADJUST"),
+            (at(2025, 2, 3), 150, 0, "CLEAR"), (at(2025, 6, 1), 0, 70, "ADJUST"),
+        ]:
+            h = AdvanceHistory.objects.create(employee=self.emp, action_type=action, previous_amount=prev, new_amount=new)
+            AdvanceHistory.objects.filter(id=h.id).update(created_at=when)
+        Employee.objects.filter(id=self.emp.id).update(advance_salary=70)
+        pagdi = PagdiHistory.objects.create(employee=self.emp, start_date=at(2025, 1, 5).date(), capacity_sarees=10)
+        p = PagdiChangeHistory.objects.create(pagdi=pagdi, employee=self.emp, action="CREATE", new_capacity=10)
+        PagdiChangeHistory.objects.filter(id=p.id).update(created_at=at(2025, 1, 5))
+        self.before = at(2025, 3, 1)
+
+    def test_archive_moves_old_rows_into_monthly_summaries(self):
+        original = audit_rows("advance")
+        self.assertEqual(archive_audit_rows("advance", self.before), (3, 2))
+
+        self.assertEqual(AdvanceHistory.objects.count(), 1)
+        jan = AuditArchive.objects.get(kind="advance", period_start__month=1)
+        self.assertEqual(jan.row_count, 2)
+        self.assertEqual(
+            {k: jan.summary[k] for k in ("opening_balance", "closing_balance", "net_change")},
+            {"opening_balance": 0, "closing_balance": 150, "net_change": 150},
+        )
+
+        merged = audit_rows("advance")
+        self.assertEqual([r["archived"] for r in merged], [True, True, True, False])
+        strip = lambda rows: [{k: v for k, v in r.items() if k != "archived"} for r in rows]
+        self.assertEqual(strip(merged), strip(original))
+        self.assertEqual(len(audit_rows("advance", since=at(2025, 1, 10), until=at(2025, 6, 1))), 2)
+
+    def test_balance_reconstruction_reads_archived_rows(self):
+        archive_audit_rows("advance", self.before)
+        balance_at = services._advance_balances_at([self.emp.id], since=at(2025, 1, 1))
+        self.assertEqual(balance_at(self.emp.id, at(2025, 1, 1)), 0)
+        self.assertEqual(balance_at(self.emp.id, at(2025, 1, 25)), 150)
+        self.assertEqual(balance_at(self.emp.id, at(2025, 3, 1)), 0)
+        self.assertEqual(balance_at(self.emp.id, at(2025, 7, 1)), 70)
+
+    def test_commands_archive_and_print_merged_trail(self):
+        out = io.StringIO()
+        call_command("archive_audit_log", "--retention-days", "31", stdout=out)  # all fixture rows are older
+        self.assertIn("Archived 4 advance rows", out.getvalue())
+        self.assertIn("Archived 1 pagdi_change rows", out.getvalue())
+        self.assertFalse(PagdiChangeHistory.objects.exists())
+
+        out = io.StringIO()
+        call_command("audit_trail", str(self.emp.id), "--from", "2025-01-20", stdout=out)
+        lines = out.getvalue().strip().splitlines()
+        self.assertTrue(lines[0].startswith("id,"))
+        self.assertEqual(len(lines), 4)
+        self.assertEqual({line.rsplit(",", 1)[1] for line in lines[1:]}, {"True"})
@@ -0,0 +1,38 @@
+# core/tests/test_backfill.py
+from django.test import TestCase
+from django.contrib.auth.models import User
+from datetime import date, timedelta
+
+from core.models import Employee, SareeCount, SalaryHistory, AdvanceHistory
+from core import services
+
+class SalaryBackfillTests(TestCase):
+
+    def setUp(self):
+        self.emp = Employee.objects.create(user=User.objects.create_user(username="f1", password="pw"), name="F1", phone="5555", salary_per_saree=10, advance_salary=0, is_approved=True)
+        self.week1 = date(2024, 1, 1)  # a Monday
+        self.week2 = self.week1 + timedelta(days=7)
+        self.week3 = self.week1 + timedelta(days=14)
+        SareeCount.objects.create(employee=self.emp, date=self.week1, count=2)
+        SareeCount.objects.create(employee=self.emp, date=self.week1 + timedelta(days=3), count=3)
+        SareeCount.objects.create(employee=self.emp, date=self.week3 + timedelta(days=6), count=4)
+
+    def test_backfill_creates_one_row_per_week_with_production(self):
+        created = services.backfill_salary_history(self.week1, self.week3)
+        self.assertEqual(created, 2)
+        rows = list(SalaryHistory.objects.order_by("week_start").values_list("week_start", "week_end", "sarees", "total_salary_before_advance"))
+        self.assertEqual(rows, [
+            (self.week1, self.week1 + timedelta(days=6), 5, 50),
+            (self.week3, self.week3 + timedelta(days=6), 4, 40),
+        ])
+        # idempotent: existing weeks are skipped
+        self.assertEqual(services.backfill_salary_history(self.week1, self.week3), 0)
+
+    def test_backfill_skips_existing_week_and_uses_historical_advance(self):
+        SalaryHistory.objects.create(employee=self.emp, week_start=self.week1, week_end=self.week1 + timedelta(days=6), sarees=5)
+        # advance given after the backfilled weeks closed must not be applied to them
+        services.give_advance(self.emp.id, 30)
+        plan = services.plan_salary_backfill(self.week1, self.week3)
+        self.assertEqual([c["week_start"] for c in plan["salary_history_create"]], [self.week3.isoformat()])
+        self.assertEqual(plan["salary_history_create"][0]["advance_salary"], 0)
+        self.assertTrue(AdvanceHistory.objects.exists())
@@ -0,0 +1,69 @@
+# core/tests/test_backfill_toolkit.py
+import importlib
+import io
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.backfill import backfill
+from core.models import BackfillProgress, Employee, SalaryHistory
+
+
+class BackfillToolkitTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username="5550001", password="pw")
+        emp = Employee.objects.create(user=user, name="W1", phone="5550001")
+        monday = date(2025, 1, 6)
+        SalaryHistory.objects.bulk_create([
+            SalaryHistory(employee=emp, week_start=monday + timedelta(weeks=i), week_end=monday + timedelta(weeks=i, days=6),
+                          sarees=i, salary_rate=10, notes="" if i % 5 else "kept")
+            for i in range(25)
+        ])
+
+    def test_updates_in_pk_chunks_with_one_update_per_chunk(self):
+        log = []
+        with CaptureQueriesContext(connection) as ctx:
+            result = backfill(SalaryHistory.objects.all(), {"total_salary_before_advance": F("sarees") * F("salary_rate")},
+                              chunk_size=10, log=log.append)
+        self.assertEqual((result.rows, result.chunks), (25, 3))
+        self.assertEqual(sum(q["sql"].startswith("UPDATE") for q in ctx.captured_queries), 3)
+        self.assertEqual(SalaryHistory.objects.get(sarees=7).total_salary_before_advance, 70)
+        self.assertIn("done", log[-1])
+
+    def test_interrupted_backfill_resumes_from_checkpoint(self):
+        calls = []
+
+        def flaky(chunk):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("deploy killed")
+            return chunk.update(notes="filled")
+
+        qs = SalaryHistory.objects.filter(notes="")
+        with self.assertRaises(RuntimeError):
+            backfill(qs, flaky, name="notes", chunk_size=8)
+        progress = BackfillProgress.objects.get(name="notes")
+        self.assertEqual((progress.rows_done, progress.finished_at), (8, None))
+
+        result = backfill(qs, {"notes": "filled"}, name="notes", chunk_size=8)
+        self.assertEqual(result.rows, 12)
+        self.assertEqual(SalaryHistory.objects.filter(notes="filled").count(), 20)
+        self.assertTrue(backfill(qs, {"notes": "x"}, name="notes").skipped)
+
+        out = io.StringIO()
+        call_command("backfill_status", stdout=out)
+        self.assertIn("notes: 20 rows, finished", out.getvalue())
+
+    def test_salary_notes_migration_is_a_single_update(self):
+        migration = importlib.import_module("core.migrations.0004_backfill_salary_notes")
+        with self.assertNumQueries(1):
+            migration.backfill_notes(apps, None)
+        self.assertEqual(SalaryHistory.objects.filter(notes="Backfilled by migration").count(), 20)
+        self.assertEqual(SalaryHistory.objects.filter(notes="kept").count(), 5)
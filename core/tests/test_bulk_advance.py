@@ -0,0 +1,38 @@
+# core/tests/test_bulk_advance.py
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from core.models import Employee, AdvanceHistory
+from core import services
+
+class BulkAdvanceTests(TestCase):
+
+    def setUp(self):
+        self.emp1 = Employee.objects.create(user=User.objects.create_user(username="b1", password="pw"), name="B1", phone="1111", advance_salary=10, is_approved=True)
+        self.emp2 = Employee.objects.create(user=User.objects.create_user(username="b2", password="pw"), name="B2", phone="2222", advance_salary=0, is_approved=True)
+
+    def test_bulk_advance_updates_balances_and_audits_each_row(self):
+        history = services.give_advances_bulk([(self.emp2.id, 100, "festival"), (self.emp1.id, 40, ""), (self.emp1.id, 5, "")], note="bulk")
+        self.assertEqual(len(history), 3)
+        self.emp1.refresh_from_db()
+        self.emp2.refresh_from_db()
+        self.assertEqual(self.emp1.advance_salary, 55)
+        self.assertEqual(self.emp2.advance_salary, 100)
+        trail = list(AdvanceHistory.objects.filter(employee=self.emp1).order_by("id").values_list("previous_amount", "new_amount", "note"))
+        self.assertEqual(trail, [(10, 50, "bulk"), (50, 55, "bulk")])
+        self.assertEqual(AdvanceHistory.objects.get(employee=self.emp2).note, "festival")
+
+    def test_bulk_advance_is_all_or_nothing(self):
+        with self.assertRaises(Employee.DoesNotExist):
+            services.give_advances_bulk([(self.emp1.id, 10, ""), (999999, 10, "")])
+        with self.assertRaises(ValueError):
+            services.give_advances_bulk([(self.emp1.id, 10, ""), (self.emp2.id, 0, "")])
+        self.emp1.refresh_from_db()
+        self.assertEqual(self.emp1.advance_salary, 10)
+        self.assertFalse(AdvanceHistory.objects.exists())
+
+    def test_parse_bulk_advance_csv(self):
+        rows = services.parse_bulk_advance_csv(["employee_id,amount,note", f"{self.emp1.id},25, diwali", f"{self.emp2.id},30,"])
+        self.assertEqual(rows, [(self.emp1.id, 25, "diwali"), (self.emp2.id, 30, "")])
+        with self.assertRaises(ValueError):
+            services.parse_bulk_advance_csv(["employee_id,amount", "x,10"])
@@ -0,0 +1,83 @@
+# core/tests/test_conditional_get.py
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Employee, SareeCount, SalaryHistory
+from core import services
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="5550101", password="pw")
+        self.emp = Employee.objects.create(user=self.user, name="C1", phone="5550101", salary_per_saree=10, is_approved=True)
+        self.monday, self.sunday = services.get_week_bounds(timezone.localdate())
+        self.entry = SareeCount.objects.create(employee=self.emp, date=self.monday, count=3)
+        self.admin = User.objects.create_user(username="admin", password="pw", is_staff=True)
+
+    def _login_employee(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["employee_id"] = self.emp.id
+        session.save()
+
+    def _revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_employee_page_is_not_modified_until_its_data_changes(self):
+        self._login_employee()
+        url = "/accounts/employee/saree-count/"
+        r = self.client.get(url)
+        self.assertEqual(r.status_code, 200)
+        etag = r["ETag"]
+        self.assertIn("no-cache", r["Cache-Control"])
+        self.assertTrue(r.has_header("Last-Modified"))
+
+        self.assertEqual(self._revalidate(url, etag).status_code, 304)
+
+        self.entry.delete()
+        r = self._revalidate(url, etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r["ETag"], etag)
+
+    async def test_async_view_answers_304(self):
+        await self.async_client.aforce_login(self.user)
+        session = await self.async_client.asession()
+        await session.aset("employee_id", self.emp.id)
+        await session.asave()
+        r = await self.async_client.get("/accounts/employee/dashboard/")
+        self.assertEqual(r.status_code, 200)
+        r = await self.async_client.get("/accounts/employee/dashboard/", headers={"if-none-match": r["ETag"]})
+        self.assertEqual(r.status_code, 304)
+
+    def test_etag_is_per_user(self):
+        self._login_employee()
+        etag = self.client.get("/accounts/employee/saree-count/")["ETag"]
+        other = User.objects.create_user(username="5550102", password="pw")
+        Employee.objects.create(user=other, name="C2", phone="5550102", is_approved=True)
+        self.client.force_login(other)
+        self.assertEqual(self._revalidate("/accounts/employee/saree-count/", etag).status_code, 200)
+
+    def test_pending_messages_get_a_full_response(self):
+        self.client.force_login(self.admin)
+        url = "/accounts/panel/weekly-salary/"
+        etag = self.client.get(url)["ETag"]
+        self.client.post(f"/accounts/panel/mark-unpaid/{self.emp.id}/")
+        r = self._revalidate(url, etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertContains(r, "Marked unpaid.")
+
+    def test_weekly_salary_export_revalidates(self):
+        self.client.force_login(self.admin)
+        url = "/accounts/panel/download-global-weekly-salary/"
+        SalaryHistory.objects.create(employee=self.emp, week_start=self.monday, week_end=self.sunday, sarees=3)
+        r = self.client.get(url)
+        self.assertEqual(r.status_code, 200)
+        etag = r["ETag"]
+        self.assertEqual(self._revalidate(url, etag).status_code, 304)
+
+        sh = SalaryHistory.objects.get()
+        sh.paid_status = True
+        sh.save(update_fields=["paid_status", "updated_at"])
+        self.assertEqual(self._revalidate(url, etag).status_code, 200)
@@ -0,0 +1,55 @@
+# core/tests/test_db_router.py
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import services
+from core.db_router import PIN_COOKIE, read_from_replica
+from core.models import Employee
+
+
+@override_settings(REPLICA_READS=True)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pw", is_staff=True)
+        user = User.objects.create_user(username="5550001", password="pw")
+        self.emp = Employee.objects.create(user=user, name="W1", phone="5550001", salary_per_saree=10)
+        self.client.force_login(self.admin)
+
+    def capture(self):
+        return CaptureQueriesContext(connections["default"]), CaptureQueriesContext(connections["replica"])
+
+    def test_report_views_read_from_replica_until_a_write_pins_primary(self):
+        primary, replica = self.capture()
+        with primary, replica:
+            self.assertEqual(self.client.get("/accounts/panel/weekly-salary/").status_code, 200)
+        self.assertTrue(any("core_employee" in q["sql"] for q in replica.captured_queries))
+        self.assertFalse(any("core_employee" in q["sql"] for q in primary.captured_queries))
+
+        r = self.client.post(f"/accounts/panel/give-advance/{self.emp.id}/", {"amount": "40"})
+        self.assertIn(PIN_COOKIE, r.cookies)
+
+        primary, replica = self.capture()
+        with primary, replica:
+            r = self.client.get("/accounts/panel/weekly-salary/")
+        self.assertEqual(r.context["rows"][0]["advance"], 40)
+        self.assertEqual(len(replica.captured_queries), 0)
+
+    def test_services_and_transactions_stay_on_primary(self):
+        primary, replica = self.capture()
+        with read_from_replica(), primary, replica:
+            services.give_advance(self.emp.id, 25)
+        self.assertEqual(len(replica.captured_queries), 0)
+        self.assertEqual(Employee.objects.get(id=self.emp.id).advance_salary, 25)
+
+    @override_settings(REPLICA_READS=False)
+    def test_without_replica_everything_uses_primary(self):
+        r = self.client.post(f"/accounts/panel/give-advance/{self.emp.id}/", {"amount": "5"})
+        self.assertNotIn(PIN_COOKIE, r.cookies)
+        _, replica = self.capture()
+        with replica:
+            self.client.get("/accounts/panel/salary-history/")
+        self.assertEqual(len(replica.captured_queries), 0)
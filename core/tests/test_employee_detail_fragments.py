@@ -0,0 +1,58 @@
+# core/tests/test_employee_detail_fragments.py
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import Employee, SareeCount, SalaryHistory
+from core import services
+
+
+class EmployeeDetailFragmentTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username="boss", password="pw", is_staff=True)
+        self.client.force_login(self.admin)
+        worker = User.objects.create_user(username="5550001", password="pw")
+        self.emp = Employee.objects.create(user=worker, name="W1", phone="5550001", salary_per_saree=10)
+        self.today = timezone.localdate()
+        self.url = f"/accounts/panel/employees/{self.emp.id}/"
+
+    def _add_history(self, weeks):
+        monday, _ = services.get_week_bounds(self.today)
+        for i in range(1, weeks + 1):
+            start = monday - timedelta(weeks=i)
+            SareeCount.objects.create(employee=self.emp, date=start, count=i)
+            SalaryHistory.objects.create(employee=self.emp, week_start=start, week_end=start + timedelta(days=6), sarees=i)
+
+    def test_detail_page_query_count_does_not_grow_with_history(self):
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self._add_history(20)
+        with CaptureQueriesContext(connection) as large:
+            r = self.client.get(self.url)
+        self.assertEqual(len(small), len(large))
+        self.assertNotContains(r, "No saree history.")
+
+    def test_fragment_is_cached_until_employee_data_changes(self):
+        self._add_history(2)
+        url = self.url + "fragments/saree/"
+        with CaptureQueriesContext(connection) as miss:
+            first = self.client.get(url)
+        self.assertContains(first, "border-t", count=2)
+
+        with CaptureQueriesContext(connection) as hit:
+            self.assertEqual(self.client.get(url).content, first.content)
+        self.assertEqual(len(hit), len(miss) - 1)  # no history query, body from cache
+
+        SareeCount.objects.create(employee=self.emp, date=self.today, count=5, notes="fresh")
+        self.assertContains(self.client.get(url), "fresh")
+
+    def test_unknown_section_or_employee_is_404(self):
+        self.assertEqual(self.client.get(self.url + "fragments/bogus/").status_code, 404)
+        self.assertEqual(self.client.get("/accounts/panel/employees/9999/fragments/saree/").status_code, 404)
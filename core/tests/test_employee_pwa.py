@@ -0,0 +1,80 @@
+# core/tests/test_employee_pwa.py
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Employee, SareeCount, SalaryHistory
+from core import services
+
+
+class EmployeePwaTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="5550202", password="pw")
+        self.emp = Employee.objects.create(user=self.user, name="P1", phone="5550202", salary_per_saree=10,
+                                           advance_salary=5, is_approved=True)
+        self.monday, self.sunday = services.get_week_bounds(timezone.localdate())
+        SareeCount.objects.create(employee=self.emp, date=self.monday, count=3, notes="first")
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["employee_id"] = self.emp.id
+        session.save()
+
+    def test_data_endpoints_match_the_pages_and_revalidate(self):
+        r = self.client.get("/accounts/employee/data/dashboard/")
+        data = r.json()
+        self.assertEqual((data["weekly_sarees"], data["final_salary"], data["week_start"]),
+                         (3, 25, self.monday.isoformat()))
+        self.assertEqual(self.client.get("/accounts/employee/data/dashboard/", HTTP_IF_NONE_MATCH=r["ETag"]).status_code, 304)
+
+        history = self.client.get("/accounts/employee/data/saree-count/").json()["history"]
+        self.assertEqual([(h["date"], h["count"], h["notes"]) for h in history], [(self.monday.isoformat(), 3, "first")])
+
+        SalaryHistory.objects.create(employee=self.emp, week_start=self.monday, week_end=self.sunday, sarees=3,
+                                     salary_rate=10, advance_salary=5, final_salary=25)
+        weeks = self.client.get("/accounts/employee/data/salary-history/").json()["history"]
+        self.assertEqual([(w["week_start"], w["final_salary"], w["paid_status"]) for w in weeks],
+                         [(self.monday.isoformat(), 25, False)])
+
+    def test_data_endpoints_require_login(self):
+        self.client.logout()
+        r = self.client.get("/accounts/employee/data/dashboard/")
+        self.assertEqual(r.status_code, 302)
+
+    def test_manifest_and_service_worker(self):
+        self.client.logout()
+        manifest = json.loads(self.client.get("/accounts/employee/manifest.webmanifest").content)
+        self.assertEqual(manifest["scope"], "/accounts/employee/")
+        self.assertEqual(manifest["start_url"], "/accounts/employee/dashboard/")
+
+        r = self.client.get("/accounts/employee/sw.js")
+        self.assertEqual(r["Content-Type"], "application/javascript")
+        self.assertEqual(r["Cache-Control"], "no-cache")
+        body = r.content.decode()
+        self.assertIn('"/accounts/employee/saree-count/"', body)
+        self.assertIn('"/accounts/employee/data/salary-history/"', body)
+        self.assertIn('"cache": "loom-employee-', body)
+        self.assertNotIn("staleWhileRevalidate", body)   # portal pages from cache only when offline or stalled
+        self.assertIn("NETWORK_TIMEOUT_MS = 3000", body)
+
+    def test_pages_carry_the_render_hooks(self):
+        r = self.client.get("/accounts/employee/dashboard/")
+        self.assertContains(r, 'data-pwa-src="/accounts/employee/data/dashboard/"')
+        self.assertContains(r, 'rel="manifest"')
+        self.assertContains(self.client.get("/accounts/employee/salary-history/"), 'data-list="history"')
+
+    def test_login_after_session_expiry_clears_the_previous_employees_cache(self):
+        other = Employee.objects.create(user=User.objects.create_user(username="5550303", password="pw2"),
+                                        name="P2", phone="5550303", salary_per_saree=12, is_approved=True)
+        self.client.session.flush()   # expired without a logout
+        self.assertEqual(self.client.get("/accounts/employee/data/dashboard/").status_code, 302)
+
+        r = self.client.post("/accounts/login/", {"phone": "5550303", "password": "pw2"})
+        self.assertRedirects(r, "/accounts/employee/dashboard/", fetch_redirect_response=False)
+        self.assertEqual(r["Clear-Site-Data"], '"cache", "storage"')
+        self.assertEqual(self.client.get("/accounts/employee/data/dashboard/").json()["phone"], other.phone)
+
+        r = self.client.get("/accounts/logout/")
+        self.assertEqual(r["Clear-Site-Data"], '"cache", "storage"')
@@ -0,0 +1,68 @@
+# core/tests/test_employee_search.py
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from core.models import Employee
+from core.search import search_employees
+
+
+class EmployeeSearchTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pw", is_staff=True)
+        for i, (name, phone) in enumerate([
+            ("Ravi Kumar", "+91 98450-12345"), ("ravi  shankar", "9845099999"), ("Anita", "7700011234"),
+            ("Bhanu", "9900012345"), ("Zoya", "88800 43210"),
+        ]):
+            user = User.objects.create_user(username=f"u{i}", password="pw")
+            Employee.objects.create(user=user, name=name, phone=phone, is_approved=name != "Zoya")
+
+    def names(self, employees):
+        return [e.name for e in employees]
+
+    def test_search_keys_follow_saves(self):
+        emp = Employee.objects.get(name="Anita")
+        self.assertEqual((emp.phone_digits, emp.phone_digits_reversed, emp.name_key), ("7700011234", "4321100077", "anita"))
+        emp.phone = "77-000-55555"
+        emp.save(update_fields=["phone"])
+        self.assertEqual(Employee.objects.get(id=emp.id).phone_digits, "7700055555")
+
+    def test_phone_prefix_suffix_and_name_matches(self):
+        self.assertEqual(self.names(search_employees("98450")[0]), ["ravi  shankar"])  # other one has +91
+        self.assertEqual(self.names(search_employees("919845")[0]), ["Ravi Kumar"])
+        self.assertEqual(self.names(search_employees("12345")[0]), ["Bhanu", "Ravi Kumar"])
+        self.assertEqual(self.names(search_employees("999")[0]), ["ravi  shankar"])
+        self.assertEqual(self.names(search_employees("RAVI")[0]), ["Ravi Kumar", "ravi  shankar"])
+        self.assertEqual(self.names(search_employees("kumar")[0]), ["Ravi Kumar"])   # mid-name
+        self.assertEqual(self.names(search_employees("Ravi   Sha")[0]), ["ravi  shankar"])
+        self.assertEqual(self.names(search_employees("", approved=False)[0]), ["Zoya"])
+
+    def test_keyset_pages_cover_everything_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = search_employees(limit=2, after=cursor)
+            seen += self.names(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["Anita", "Bhanu", "Ravi Kumar", "ravi  shankar", "Zoya"])
+        with self.assertRaises(ValueError):
+            search_employees(after="not-a-cursor")
+
+    def test_typeahead_endpoint_and_pickers(self):
+        self.client.force_login(self.admin)
+        r = self.client.get("/accounts/panel/employees/search/", {"q": "ravi", "approved": "1", "limit": "1"})
+        data = r.json()
+        self.assertEqual([e["name"] for e in data["results"]], ["Ravi Kumar"])
+        r = self.client.get("/accounts/panel/employees/search/", {"q": "ravi", "approved": "1", "after": data["next"]})
+        self.assertEqual([e["name"] for e in r.json()["results"]], ["ravi  shankar"])
+        self.assertIsNone(r.json()["next"])
+        self.assertEqual(self.client.get("/accounts/panel/employees/search/", {"after": "%%"}).status_code, 400)
+
+        for url in ("/accounts/panel/saree-entry/", "/accounts/panel/pagdi/create/", "/accounts/panel/warp/create/"):
+            html = self.client.get(url).content.decode()
+            self.assertIn("data-employee-picker", html)
+            self.assertNotIn("<option", html)
+
+    def test_name_search_uses_an_index(self):
+        plan = Employee.objects.filter(is_approved=True).order_by("name_key", "id").explain()
+        self.assertNotRegex(plan, r"SCAN core_employee(?! USING)|Seq Scan on core_employee\b|USE TEMP B-TREE FOR ORDER BY")
@@ -0,0 +1,50 @@
+# core/tests/test_employee_views.py
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.models import Employee, SareeCount, PagdiHistory, WarpHistory, SalaryHistory
+from core import services
+
+class EmployeeAsyncViewTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="5550001", password="pw")
+        self.emp = Employee.objects.create(user=self.user, name="W1", phone="5550001", salary_per_saree=10, advance_salary=5, is_approved=True)
+        self.monday, self.sunday = services.get_week_bounds(timezone.localdate())
+        SareeCount.objects.create(employee=self.emp, date=self.monday, count=3)
+        PagdiHistory.objects.create(employee=self.emp, start_date=self.monday, capacity_sarees=10)
+        WarpHistory.objects.create(employee=self.emp, start_date=self.monday, capacity_sarees=8)
+        SalaryHistory.objects.create(employee=self.emp, week_start=self.monday, week_end=self.sunday, sarees=3, final_salary=25)
+
+    async def _login(self):
+        await self.async_client.aforce_login(self.user)
+        session = await self.async_client.asession()
+        await session.aset("employee_id", self.emp.id)
+        await session.asave()
+
+    async def test_read_pages_render_under_async_client(self):
+        await self._login()
+        r = await self.async_client.get("/accounts/employee/dashboard/")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context["final_salary"], 25)
+        r = await self.async_client.get("/accounts/employee/pagdi/")
+        self.assertEqual(r.context["remaining"], 7)
+        r = await self.async_client.get("/accounts/employee/warp/")
+        self.assertEqual(r.context["remaining"], 5)
+        r = await self.async_client.get("/accounts/employee/salary-history/")
+        self.assertEqual(len(r.context["history"]), 1)
+
+    def test_pages_still_work_from_sync_client(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["employee_id"] = self.emp.id
+        session.save()
+        self.assertEqual(self.client.get("/accounts/employee/dashboard/").status_code, 200)
+        r = self.client.post("/accounts/employee/pagdi/")
+        self.assertRedirects(r, "/accounts/employee/pagdi/")
+        self.assertFalse(PagdiHistory.objects.filter(end_date__isnull=True).exists())
+
+    def test_anonymous_is_redirected_to_login(self):
+        r = self.client.get("/accounts/employee/dashboard/")
+        self.assertEqual(r.status_code, 302)
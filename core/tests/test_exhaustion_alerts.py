@@ -0,0 +1,70 @@
+# core/tests/test_exhaustion_alerts.py
+import io
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.alerts import forecast_exhaustion
+from core.models import AlertEmail, Employee, ExhaustionAlert, PagdiHistory, SareeCount, WarpHistory
+
+AS_OF = date(2025, 3, 20)
+
+
+class ExhaustionAlertTests(TestCase):
+
+    def setUp(self):
+        self.emp = {}
+        for name in ("fast", "slow", "done"):
+            user = User.objects.create_user(username=name, password="pw")
+            self.emp[name] = Employee.objects.create(user=user, name=name, phone=name)
+        start = AS_OF - timedelta(days=9)
+        for day in range(10):
+            SareeCount.objects.create(employee=self.emp["fast"], date=start + timedelta(days=day), count=5)
+            SareeCount.objects.create(employee=self.emp["slow"], date=start + timedelta(days=day), count=1)
+        SareeCount.objects.create(employee=self.emp["done"], date=start, count=40)
+        # 50 made at 5/day, 60 left -> 12 days; pagdi 58 capacity -> 2 days left
+        self.warp = WarpHistory.objects.create(employee=self.emp["fast"], start_date=start, capacity_sarees=110)
+        self.pagdi = PagdiHistory.objects.create(employee=self.emp["fast"], start_date=start, capacity_sarees=58)
+        WarpHistory.objects.create(employee=self.emp["slow"], start_date=start, capacity_sarees=100)
+        self.done = WarpHistory.objects.create(employee=self.emp["done"], start_date=start, capacity_sarees=30)
+        WarpHistory.objects.create(employee=self.emp["slow"], start_date=start, end_date=AS_OF, capacity_sarees=1)
+
+    def test_forecast_uses_recent_rate_in_two_queries(self):
+        with self.assertNumQueries(2):
+            forecasts = {(f.kind, f.assignment_id): f for f in forecast_exhaustion(AS_OF, lookback_days=7)}
+        self.assertEqual(len(forecasts), 4)  # closed warp excluded
+        warp = forecasts[("warp", self.warp.id)]
+        self.assertEqual((warp.remaining, warp.daily_rate, warp.exhausts_on), (60, 5, AS_OF + timedelta(days=12)))
+        self.assertEqual(forecasts[("pagdi", self.pagdi.id)].exhausts_on, AS_OF + timedelta(days=2))
+        done = forecasts[("warp", self.done.id)]
+        self.assertEqual((done.level, done.exhausts_on), ("exhausted", AS_OF))
+
+    def test_digest_sent_once_per_recipient_over_one_connection(self):
+        AlertEmail.objects.create(email="a@example.com")
+        AlertEmail.objects.create(email="b@example.com")
+        with mock.patch("core.alerts.get_connection", wraps=get_connection) as opened:
+            call_command("send_exhaustion_alerts", "--as-of", AS_OF.isoformat(), stdout=io.StringIO())
+
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual([m.to for m in mail.outbox], [["a@example.com"], ["b@example.com"]])
+        body = mail.outbox[0].body
+        self.assertIn(f"Pagdi #{self.pagdi.id}", body)
+        self.assertIn(f"Warp #{self.done.id}", body)
+        self.assertNotIn(f"Warp #{self.warp.id}", body)
+        self.assertEqual(ExhaustionAlert.objects.count(), 2)
+
+        # already reported: nothing new the next day
+        mail.outbox.clear()
+        call_command("send_exhaustion_alerts", "--as-of", (AS_OF + timedelta(days=1)).isoformat(), stdout=io.StringIO())
+        self.assertEqual(mail.outbox, [])
+
+    def test_alerts_are_kept_until_someone_subscribes(self):
+        out = io.StringIO()
+        call_command("send_exhaustion_alerts", "--as-of", AS_OF.isoformat(), stdout=out)
+        self.assertIn("no AlertEmail recipients", out.getvalue())
+        self.assertFalse(ExhaustionAlert.objects.exists())
@@ -0,0 +1,67 @@
+# core/tests/test_note_search.py
+from datetime import date, datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from core import services
+from core.audit import archive_audit_rows
+from core.models import AdvanceHistory, Employee, NoteIndex, PagdiHistory, SareeCount
+from core.note_search import rebuild_note_index, search_notes
+
+
+class NoteSearchTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pw", is_staff=True)
+        user = User.objects.create_user(username="5550001", password="pw")
+        self.emp = Employee.objects.create(user=user, name="W1", phone="5550001", salary_per_saree=10)
+        self.entry = SareeCount.objects.create(employee=self.emp, date=date(2025, 3, 3), count=2, notes="Broken thread on loom 4")
+        SareeCount.objects.create(employee=self.emp, date=date(2025, 3, 4), count=3)
+        PagdiHistory.objects.create(employee=self.emp, start_date=date(2025, 3, 1), notes="Thread supplier changed")
+        services.give_advances_bulk([(self.emp.id, 50, "Medical advance, thread shop bill")])
+
+    def kinds(self, hits):
+        return sorted(h.kind for h in hits)
+
+    def test_index_follows_writes(self):
+        self.assertEqual(NoteIndex.objects.count(), 3)  # the entry without notes is not indexed
+        self.assertEqual(self.kinds(search_notes("thread")[0]), ["advance", "pagdi", "saree"])
+        self.assertEqual(self.kinds(search_notes("THREAD loom")[0]), ["saree"])
+        self.assertEqual(self.kinds(search_notes("thre sup")[0]), ["pagdi"])  # prefixes
+
+        self.entry.notes = "Power cut"
+        self.entry.save()
+        self.assertEqual(self.kinds(search_notes("loom")[0]), [])
+        self.assertEqual(self.kinds(search_notes("power")[0]), ["saree"])
+        self.entry.delete()
+        self.assertEqual(search_notes("power")[0], [])
+
+    def test_archived_audit_notes_stay_searchable(self):
+        AdvanceHistory.objects.update(created_at=timezone.make_aware(datetime(2020, 1, 1)))
+        archive_audit_rows("advance", timezone.make_aware(datetime(2021, 1, 1)))
+        self.assertFalse(AdvanceHistory.objects.exists())
+        self.assertEqual(self.kinds(search_notes("medical")[0]), ["advance"])
+
+        # a rebuild re-indexes archived notes from the archive payloads
+        self.assertEqual(rebuild_note_index(), 3)
+        self.assertEqual(self.kinds(search_notes("medical")[0]), ["advance"])
+
+    def test_rebuild_and_paging(self):
+        NoteIndex.objects.all().delete()
+        self.assertEqual(rebuild_note_index(), 3)
+        first, has_next = search_notes("thread", per_page=2, kinds=["saree", "pagdi", "advance"])
+        second, more = search_notes("thread", page=2, per_page=2)
+        self.assertTrue(has_next)
+        self.assertFalse(more)
+        self.assertEqual(len({h.id for h in first + second}), 3)
+        self.assertEqual(self.kinds(search_notes("thread", kinds=["pagdi"])[0]), ["pagdi"])
+
+    def test_staff_view_runs_one_search_query(self):
+        self.client.force_login(self.admin)
+        self.client.get("/accounts/panel/notes/search/", {"q": "thread"})  # warm session/user queries
+        with self.assertNumQueries(3):  # session, user, search
+            r = self.client.get("/accounts/panel/notes/search/", {"q": "thread"})
+        self.assertEqual(len(r.context["hits"]), 3)
+        self.assertContains(r, "Broken thread on loom 4")
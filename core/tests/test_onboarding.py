@@ -0,0 +1,61 @@
+# core/tests/test_onboarding.py
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Employee
+from core.onboarding import approve_employees, fork_start_method, hash_passwords, onboard_employees, parse_onboarding_csv
+
+CSV = ["name,phone,rate,password", "Ravi Kumar,9845000001,12,secret-1", " Anil ,9845000002, 15,"]
+
+
+class BulkOnboardingTests(TestCase):
+
+    def test_onboard_creates_approved_employees_that_can_log_in(self):
+        created = onboard_employees(parse_onboarding_csv(CSV))
+        self.assertEqual([(e.name, e.phone, e.salary_per_saree, e.is_approved) for e, _ in created],
+                         [("Ravi Kumar", "9845000001", 12, True), ("Anil", "9845000002", 15, True)])
+        self.assertEqual(created[0][1], "secret-1")
+        generated = created[1][1]
+        self.assertEqual(len(generated), 10)
+        self.assertEqual(authenticate(username="9845000002", password=generated), created[1][0].user)
+        self.assertEqual(Employee.objects.get(phone="9845000001").name_key, "ravi kumar")
+        self.assertEqual(list(created[1][0].rate_history.values_list("rate", "effective_from")), [(15, timezone.localdate())])
+
+    def test_onboard_is_all_or_nothing(self):
+        User.objects.create_user(username="9845000002", password="pw")
+        with self.assertRaisesMessage(ValueError, "9845000002"):
+            onboard_employees(parse_onboarding_csv(CSV))
+        self.assertFalse(Employee.objects.exists())
+        with self.assertRaisesMessage(ValueError, "line 3"):
+            parse_onboarding_csv(["name,phone,rate", "A,1,5", "B,1,5"])
+        with self.assertRaisesMessage(ValueError, "line 3: phone is longer than 15"):
+            parse_onboarding_csv(["name,phone,rate", "A,1,5", "B,1234567890123456,5"])
+        with self.assertRaisesMessage(ValueError, "line 2: phone must be digits"):
+            parse_onboarding_csv(["name,phone,rate", "A,98450-0001,5"])
+
+    def test_process_pool_hashes_match_in_process(self):
+        user = User(username="x")
+        for start_method in ("spawn", fork_start_method()):
+            hashes = hash_passwords(["a", "b", "c"], workers=2, start_method=start_method)
+            self.assertEqual(len(hashes), 3)
+            for password, encoded in zip("abc", hashes):
+                user.password = encoded
+                self.assertTrue(user.check_password(password))
+
+    def test_bulk_approve_action(self):
+        admin = User.objects.create_user(username="admin", password="pw", is_staff=True)
+        pending = [Employee.objects.create(user=User.objects.create_user(username=f"p{i}"), name=f"P{i}", phone=f"p{i}") for i in range(3)]
+        self.assertEqual(approve_employees([pending[0].id]), 1)
+        self.client.force_login(admin)
+        r = self.client.post("/accounts/panel/employees/approve/", {"emp_ids": [e.id for e in pending]})
+        self.assertRedirects(r, "/accounts/panel/employees/")
+        self.assertEqual(Employee.objects.filter(is_approved=True).count(), 3)
+
+    def test_onboard_view_shows_initial_passwords_once(self):
+        self.client.force_login(User.objects.create_user(username="admin", password="pw", is_staff=True))
+        r = self.client.post("/accounts/panel/employees/onboard/", {"csv_text": "\n".join(CSV)})
+        self.assertContains(r, "secret-1")
+        self.assertEqual(r["Cache-Control"], "no-store")
+        self.assertEqual(Employee.objects.filter(is_approved=True).count(), 2)
@@ -0,0 +1,61 @@
+# core/tests/test_partitions.py
+import io
+from datetime import date
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from core import partitions
+from core.models import Employee, SareeCount
+
+
+class PartitionPlanningTests(SimpleTestCase):
+
+    def test_month_helpers(self):
+        self.assertEqual(partitions.add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(partitions.add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        self.assertEqual(
+            partitions.month_range(date(2025, 11, 20), date(2026, 1, 3)),
+            [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1)],
+        )
+        name = partitions.partition_name(date(2026, 2, 1))
+        self.assertEqual(name, "core_sareecount_p202602")
+        self.assertEqual(partitions.partition_month(name), date(2026, 2, 1))
+        self.assertIsNone(partitions.partition_month("core_sareecount_default"))
+
+
+class PartitionCommandTests(TestCase):
+
+    @skipUnless(connection.vendor != "postgresql", "checks the non-PostgreSQL path")
+    def test_command_refuses_other_databases(self):
+        self.assertFalse(partitions.is_partitioned(connection))
+        with self.assertRaises(CommandError):
+            call_command("saree_partitions", stdout=io.StringIO())
+
+    @skipUnless(connection.vendor == "postgresql", "needs PostgreSQL")
+    def test_convert_prunes_and_manages_partitions(self):
+        user = User.objects.create_user(username="5550001", password="pw")
+        emp = Employee.objects.create(user=user, name="W1", phone="5550001", salary_per_saree=10)
+        SareeCount.objects.create(employee=emp, date=date(2025, 1, 15), count=2)
+        SareeCount.objects.create(employee=emp, date=date(2025, 3, 2), count=3)
+
+        months = partitions.convert(connection, months_ahead=1, today=date(2025, 3, 10))
+        self.assertEqual(months, 4)  # Jan..Apr 2025
+        self.assertTrue(partitions.is_partitioned(connection))
+        self.assertEqual(SareeCount.objects.count(), 2)
+        new = SareeCount.objects.create(employee=emp, date=date(2025, 6, 1), count=1)  # lands in DEFAULT
+        self.assertGreater(new.id, 0)
+
+        plan = SareeCount.objects.filter(employee=emp, date__gte=date(2025, 3, 3), date__lte=date(2025, 3, 9)).explain()
+        self.assertIn("core_sareecount_p202503", plan)
+        self.assertNotIn("core_sareecount_p202501", plan)
+
+        created = partitions.ensure_partitions(connection, months_ahead=0, today=date(2025, 6, 5))
+        self.assertEqual(created, ["core_sareecount_p202505", "core_sareecount_p202506"])
+        self.assertIn("core_sareecount_p202506", SareeCount.objects.filter(date=date(2025, 6, 1)).explain())
+
+        self.assertEqual(partitions.detach_partitions(connection, date(2025, 2, 1)), ["core_sareecount_p202501"])
+        self.assertEqual(SareeCount.objects.count(), 2)
@@ -0,0 +1,72 @@
+# core/tests/test_performance.py
+import io
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Employee, SareeCount
+from core.performance import compute_performance
+
+AS_OF = date(2025, 3, 30)  # a Sunday
+
+
+class PerformanceRatingTests(TestCase):
+
+    def setUp(self):
+        self.emps = {}
+        for name in ("steady", "spiky", "slow", "idle"):
+            user = User.objects.create_user(username=name, password="pw")
+            self.emps[name] = Employee.objects.create(user=user, name=name, phone=name)
+        for week in range(12):
+            monday = AS_OF - timedelta(days=6 + 7 * week)
+            SareeCount.objects.create(employee=self.emps["steady"], date=monday, count=30)
+            SareeCount.objects.create(employee=self.emps["steady"], date=monday + timedelta(days=1), count=30)
+            SareeCount.objects.create(employee=self.emps["spiky"], date=monday, count=120 if week % 4 == 0 else 5)
+            SareeCount.objects.create(employee=self.emps["slow"], date=monday, count=10)
+        # outside the window: must not count
+        SareeCount.objects.create(employee=self.emps["idle"], date=AS_OF - timedelta(days=7 * 12), count=500)
+
+    def test_metrics(self):
+        results = compute_performance(AS_OF, weeks=12)
+        steady, spiky, slow, idle = (results[self.emps[n].id] for n in ("steady", "spiky", "slow", "idle"))
+        self.assertEqual(steady["output"], 60)
+        self.assertEqual(steady["consistency"], 1.0)
+        self.assertLess(spiky["consistency"], 0.5)
+        self.assertGreater(steady["percentile"], spiky["percentile"])
+        self.assertGreater(spiky["percentile"], slow["percentile"])
+        self.assertEqual(idle["rating"], "Inactive")
+        self.assertEqual(steady["rating"], "Excellent")
+
+    def test_weeks_before_joining_are_not_counted(self):
+        user = User.objects.create_user(username="newcomer", password="pw")
+        newcomer = Employee.objects.create(user=user, name="newcomer", phone="newcomer")
+        first_monday = AS_OF - timedelta(days=6 + 7)
+        Employee.objects.filter(id=newcomer.id).update(joining_date=first_monday)
+        for monday in (first_monday, first_monday + timedelta(days=7)):
+            SareeCount.objects.create(employee=newcomer, date=monday, count=60)
+
+        result = compute_performance(AS_OF, weeks=12)[newcomer.id]
+        self.assertEqual((result["output"], result["consistency"]), (60, 1.0))
+        self.assertEqual(result["rating"], "Excellent")
+
+    def test_command_writes_ratings_in_one_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("rate_performance", "--as-of", AS_OF.isoformat(), stdout=io.StringIO())
+        statements = [q["sql"].split()[0] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+        # employees + saree entries + current ratings, then one UPDATE
+        self.assertEqual(statements, ["SELECT", "SELECT", "SELECT", "UPDATE"])
+        ratings = dict(Employee.objects.values_list("name", "performance"))
+        self.assertEqual(ratings["steady"], "Excellent")
+        self.assertEqual(ratings["idle"], "Inactive")
+
+        out = io.StringIO()
+        call_command("rate_performance", "--as-of", AS_OF.isoformat(), stdout=out)
+        self.assertIn("0 changed", out.getvalue())
+
+    def test_dry_run_does_not_save(self):
+        call_command("rate_performance", "--as-of", AS_OF.isoformat(), "--dry-run", stdout=io.StringIO())
+        self.assertEqual(set(Employee.objects.values_list("performance", flat=True)), {"Average"})
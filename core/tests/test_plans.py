@@ -0,0 +1,67 @@
+# core/tests/test_plans.py
+import json
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.models import Employee, SareeCount, SalaryHistory, AdvanceHistory
+from core import services
+
+class PlanModeTests(TestCase):
+
+    def setUp(self):
+        self.emp = Employee.objects.create(user=User.objects.create_user(username="p1", password="pw"), name="P1", phone="1234", salary_per_saree=10, advance_salary=50, current_week_salary=70, is_approved=True)
+        self.today = timezone.localdate()
+        self.monday, _ = services.get_week_bounds(self.today)
+        SareeCount.objects.create(employee=self.emp, date=self.monday, count=7)
+
+    def test_weekly_reset_plan_is_read_only_and_applies_as_is(self):
+        plan = services.plan_weekly_reset(for_date=self.today, notes="plan")
+        self.assertFalse(SalaryHistory.objects.exists())
+        self.assertEqual(plan["salary_history_create"][0]["final_salary"], 20)
+        self.assertEqual(plan["employee_updates"], [{"employee_id": self.emp.id, "field": "current_week_salary", "before": 70, "after": 0}])
+
+        result = services.apply_plan(json.loads(json.dumps(plan)))
+        self.assertEqual(result, {"updated": 1, "created": 1})
+        sh = SalaryHistory.objects.get(employee=self.emp)
+        self.assertEqual((sh.sarees, sh.advance_salary, sh.final_salary, sh.notes), (7, 50, 20, "plan"))
+        self.emp.refresh_from_db()
+        self.assertEqual(self.emp.current_week_salary, 0)
+
+        # the same plan cannot be applied twice
+        with self.assertRaises(ValueError):
+            services.apply_plan(plan)
+
+    def test_weekly_reset_plan_rejects_stale_week_numbers(self):
+        plan = json.loads(json.dumps(services.plan_weekly_reset(for_date=self.today, notes="plan")))
+
+        services.give_advance(self.emp.id, 10)
+        with self.assertRaisesMessage(ValueError, "advance_salary is 60, plan expected 50"):
+            services.apply_plan(plan)
+
+        plan = services.plan_weekly_reset(for_date=self.today, notes="plan")
+        SareeCount.objects.create(employee=self.emp, date=services.get_week_bounds(self.today)[1], count=2)
+        with self.assertRaisesMessage(ValueError, "sarees is 9, plan expected 7"):
+            services.apply_plan(plan)
+        self.assertFalse(SalaryHistory.objects.exists())
+
+    def test_carry_plan_rejects_stale_balances(self):
+        plan = services.plan_carry_advances(carry_factor=0.5, note="half")
+        self.assertFalse(AdvanceHistory.objects.exists())
+        self.assertEqual(plan["employee_updates"][0]["after"], 25)
+
+        services.give_advance(self.emp.id, 10)
+        with self.assertRaises(ValueError):
+            services.apply_plan(plan)
+        self.emp.refresh_from_db()
+        self.assertEqual(self.emp.advance_salary, 60)
+
+    def test_real_run_matches_plan(self):
+        plan = services.plan_carry_advances(carry_factor=0.5, note="half")
+        processed = services.carry_advances_to_next_week(carry_factor=0.5, note="half")
+        self.assertEqual(processed, len(plan["advance_history_create"]))
+        self.emp.refresh_from_db()
+        self.assertEqual(self.emp.advance_salary, 25)
+        ah = AdvanceHistory.objects.get(employee=self.emp)
+        self.assertEqual((ah.previous_amount, ah.new_amount, ah.note), (50, 25, "half"))
@@ -0,0 +1,103 @@
+# core/tests/test_query_plans.py
+import re
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.test import TestCase
+
+from core import services
+from core.models import (
+    AdvanceHistory, Employee, PagdiChangeHistory, PagdiHistory, SalaryHistory, SareeCount, WarpHistory,
+)
+
+MONDAY = date(2025, 3, 3)
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN the hot queries and fail if any of them falls back to a full table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(30):
+            user = User.objects.create_user(username=f"555{i:04d}", password="pw")
+            emp = Employee.objects.create(user=user, name=f"W{i}", phone=f"555{i:04d}", salary_per_saree=10)
+            SareeCount.objects.bulk_create([
+                SareeCount(employee=emp, date=MONDAY + timedelta(days=d), count=2, rate=10) for d in range(14)
+            ])
+            PagdiHistory.objects.create(employee=emp, start_date=MONDAY, end_date=MONDAY + timedelta(days=6), capacity_sarees=10)
+            PagdiHistory.objects.create(employee=emp, start_date=MONDAY + timedelta(days=7), capacity_sarees=10)
+            WarpHistory.objects.create(employee=emp, start_date=MONDAY, capacity_sarees=8)
+            SalaryHistory.objects.create(employee=emp, week_start=MONDAY, week_end=MONDAY + timedelta(days=6))
+        cls.emp = emp
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # tiny test tables are cheapest to seq-scan; make the planner show whether an index applies
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            for model in (Employee, SareeCount, PagdiHistory, WarpHistory, SalaryHistory, AdvanceHistory):
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        table = queryset.model._meta.db_table
+        if connection.vendor == "postgresql":
+            self.assertNotRegex(plan, rf"Seq Scan on {table}\b", plan)
+        else:
+            full_scans = [line for line in plan.splitlines() if re.search(rf"\bSCAN {table}\b(?! USING)", line)]
+            self.assertEqual(full_scans, [], plan)
+
+    def test_active_assignment_lookups(self):
+        self.assertUsesIndex(PagdiHistory.objects.filter(employee=self.emp, end_date__isnull=True))
+        self.assertUsesIndex(WarpHistory.objects.filter(employee=self.emp, end_date__isnull=True))
+        self.assertUsesIndex(PagdiHistory.objects.filter(end_date__isnull=True).order_by().values("id"))
+
+    def test_weekly_totals(self):
+        week = dict(date__gte=MONDAY, date__lte=MONDAY + timedelta(days=6))
+        self.assertUsesIndex(SareeCount.objects.filter(employee=self.emp, **week).values("employee").annotate(n=Sum("count")))
+        self.assertUsesIndex(SareeCount.objects.filter(**week).values("employee_id").annotate(n=Sum("count")).order_by())
+        self.assertUsesIndex(SalaryHistory.objects.filter(employee=self.emp, week_start=MONDAY, week_end=MONDAY + timedelta(days=6)))
+
+    def test_employee_and_audit_lookups(self):
+        self.assertUsesIndex(Employee.objects.filter(phone="5550003").order_by())
+        self.assertUsesIndex(AdvanceHistory.objects.filter(employee=self.emp).order_by("created_at"))
+
+    def test_no_duplicate_indexes(self):
+        for model in (Employee, SareeCount, SalaryHistory, PagdiHistory, WarpHistory):
+            table = model._meta.db_table
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, table)
+            # partial indexes (one active assignment) may repeat a full index's columns
+            keys = [tuple(c["columns"]) for name, c in constraints.items()
+                    if c["index"] and not c["primary_key"] and "one_active" not in name]
+            self.assertEqual(len(keys), len(set(keys)), f"{table}: {keys}")
+
+
+class OneActiveAssignmentTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username="5550001", password="pw")
+        self.emp = Employee.objects.create(user=user, name="W1", phone="5550001")
+
+    def test_constraint_rejects_second_active_warp(self):
+        WarpHistory.objects.create(employee=self.emp, start_date=MONDAY, capacity_sarees=5)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            WarpHistory.objects.create(employee=self.emp, start_date=MONDAY, capacity_sarees=6)
+        WarpHistory.objects.create(employee=self.emp, start_date=MONDAY, end_date=MONDAY, capacity_sarees=6)
+
+    def test_assign_services_finish_the_active_assignment(self):
+        first = services.assign_warp(self.emp.id, 5)
+        second = services.assign_warp(self.emp.id, 7)
+        self.assertIsNotNone(WarpHistory.objects.get(id=first.id).end_date)
+        self.assertEqual(WarpHistory.objects.get(employee=self.emp, end_date__isnull=True), second)
+
+        services.assign_pagdi(self.emp.id, MONDAY, 10)
+        services.assign_pagdi(self.emp.id, MONDAY + timedelta(days=7), 12)
+        self.assertEqual(PagdiHistory.objects.filter(employee=self.emp, end_date__isnull=True).get().capacity_sarees, 12)
+        self.assertEqual(
+            list(PagdiChangeHistory.objects.filter(employee=self.emp).order_by("id").values_list("action", flat=True)),
+            ["CREATE", "FINISH", "CREATE"],
+        )
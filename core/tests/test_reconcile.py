@@ -0,0 +1,93 @@
+# core/tests/test_reconcile.py
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import services
+from core.models import AdvanceHistory, Employee, SalaryHistory, SareeCount
+from core.reconcile import reconcile_payroll
+
+MONDAY = date(2025, 3, 3)
+THROUGH = date(2025, 3, 23)
+
+
+class PayrollReconcileTests(TestCase):
+
+    def setUp(self):
+        self.a = self._employee("a")
+        self.b = self._employee("b")
+        for week in range(3):
+            for emp in (self.a, self.b):
+                SareeCount.objects.create(employee=emp, date=MONDAY + timedelta(weeks=week), count=4, rate=10)
+        # a: weeks 0 (paid) and 1 archived correctly, then entries deleted from both
+        for week, paid in ((0, True), (1, False)):
+            start = MONDAY + timedelta(weeks=week)
+            SalaryHistory.objects.create(employee=self.a, week_start=start, week_end=start + timedelta(days=6), sarees=4,
+                                         salary_rate=10, total_salary_before_advance=40, final_salary=40, paid_status=paid)
+        SareeCount.objects.filter(employee=self.a, date__lt=MONDAY + timedelta(weeks=2)).delete()
+        SareeCount.objects.create(employee=self.a, date=MONDAY + timedelta(weeks=1), count=1, rate=10)
+        # a: week 2 never archived; b: nothing archived
+        # b: advance changed outside the audit trail
+        services.give_advance(self.b.id, 30)
+        Employee.objects.filter(id=self.b.id).update(advance_salary=50)
+
+    def _employee(self, name):
+        user = User.objects.create_user(username=name, password="pw")
+        return Employee.objects.create(user=user, name=name, phone=name, salary_per_saree=10)
+
+    def checks(self, report):
+        return sorted((d["check"], d["employee_id"], d.get("week_start"), d.get("field")) for d in report["discrepancies"])
+
+    def test_report_and_repair_plan(self):
+        report, plan = reconcile_payroll(through=THROUGH, chunk_size=1)
+        a, b = self.a.id, self.b.id
+        w0, w1, w2 = (str(MONDAY + timedelta(weeks=i)) for i in range(3))
+        self.assertEqual(self.checks(report), sorted([
+            ("salary_week_mismatch", a, w0, "sarees"),
+            ("salary_week_mismatch", a, w0, "total_salary_before_advance"),
+            ("salary_week_mismatch", a, w0, "final_salary"),
+            ("salary_week_mismatch", a, w1, "sarees"),
+            ("salary_week_mismatch", a, w1, "total_salary_before_advance"),
+            ("salary_week_mismatch", a, w1, "final_salary"),
+            ("salary_week_missing", a, w2, None),
+            ("salary_week_missing", b, w0, None),
+            ("salary_week_missing", b, w1, None),
+            ("salary_week_missing", b, w2, None),
+            ("advance_balance_mismatch", b, None, None),
+        ]))
+        # paid week is reported only
+        self.assertEqual({u["before"] for u in plan["salary_history_updates"] if u["field"] == "sarees"}, {4})
+        self.assertEqual(len(plan["salary_history_updates"]), 3)
+        self.assertEqual(plan["advance_history_create"][0]["previous_amount"], 30)
+
+        services.apply_plan(json.loads(json.dumps(plan)))
+        report, plan = reconcile_payroll(through=THROUGH)
+        self.assertEqual({d["check"] for d in report["discrepancies"]}, {"salary_week_mismatch"})
+        self.assertTrue(all(d["paid"] for d in report["discrepancies"]))
+        self.assertEqual(SalaryHistory.objects.get(employee=self.a, week_start=MONDAY + timedelta(weeks=1)).final_salary, 10)
+        self.assertEqual(AdvanceHistory.objects.filter(employee=self.b).latest("created_at").new_amount, 50)
+
+    def test_stale_repair_plan_is_rejected(self):
+        _, plan = reconcile_payroll(through=THROUGH)
+        Employee.objects.filter(id=self.b.id).update(advance_salary=60)
+        with self.assertRaises(ValueError):
+            services.apply_plan(plan)
+        self.assertFalse(SalaryHistory.objects.filter(employee=self.b).exists())
+
+    def test_command_with_process_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path, plan_path = os.path.join(tmp, "report.json"), os.path.join(tmp, "plan.json")
+            call_command("reconcile_payroll", "--workers", "2", "--chunk-size", "1", "--through", THROUGH.isoformat(),
+                         "--report", report_path, "--plan-out", plan_path, stdout=io.StringIO(), stderr=io.StringIO())
+            with open(report_path) as fh:
+                report = json.load(fh)
+            self.assertEqual(report["summary"]["salary_week_missing"], 4)
+
+            call_command("reconcile_payroll", "--apply-plan", plan_path, stdout=io.StringIO())
+        self.assertEqual(SalaryHistory.objects.filter(employee=self.b).count(), 3)
@@ -0,0 +1,60 @@
+# core/tests/test_salary_rates.py
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from datetime import date, timedelta
+
+from core.models import Employee, SareeCount, SalaryHistory, SalaryRateHistory
+from core import services
+
+class SalaryRateTests(TestCase):
+
+    def setUp(self):
+        self.emp = Employee.objects.create(user=User.objects.create_user(username="r1", password="pw"), name="R1", phone="7777", salary_per_saree=10, is_approved=True)
+        self.week1 = date(2024, 1, 1)  # a Monday
+        self.week2 = self.week1 + timedelta(days=7)
+
+    def test_entries_store_rate_in_effect_and_generated_earnings(self):
+        SalaryRateHistory.objects.create(employee=self.emp, rate=8, effective_from=self.week1)
+        SalaryRateHistory.objects.create(employee=self.emp, rate=12, effective_from=self.week2)
+        SareeCount.objects.create(employee=self.emp, date=self.week1, count=2)
+        SareeCount.objects.create(employee=self.emp, date=str(self.week2), count=3)
+        self.assertEqual(list(SareeCount.objects.order_by("date").values_list("rate", "earnings")), [(8, 16), (12, 36)])
+        self.assertEqual(SareeCount.objects.aggregate(Sum("earnings"))["earnings__sum"], 52)
+
+    def test_rate_change_skips_paid_weeks_and_recomputes_unpaid(self):
+        SareeCount.objects.create(employee=self.emp, date=self.week1, count=2)
+        SareeCount.objects.create(employee=self.emp, date=self.week2, count=3)
+        SalaryHistory.objects.create(employee=self.emp, week_start=self.week1, week_end=self.week1 + timedelta(days=6), sarees=2, salary_rate=10, total_salary_before_advance=20, final_salary=20, paid_status=True)
+        SalaryHistory.objects.create(employee=self.emp, week_start=self.week2, week_end=self.week2 + timedelta(days=6), sarees=3, salary_rate=10, total_salary_before_advance=30, advance_salary=5, final_salary=25)
+
+        services.set_salary_rate(self.emp.id, 20, effective_from=self.week1)
+
+        self.assertEqual(SareeCount.objects.get(date=self.week1).earnings, 20)
+        self.assertEqual(SareeCount.objects.get(date=self.week2).earnings, 60)
+        unpaid = SalaryHistory.objects.get(week_start=self.week2)
+        self.assertEqual((unpaid.total_salary_before_advance, unpaid.final_salary), (60, 55))
+        self.emp.refresh_from_db()
+        self.assertEqual(self.emp.salary_per_saree, 20)
+
+    def test_future_rate_does_not_change_current_rate(self):
+        services.set_salary_rate(self.emp.id, 99, effective_from=date.today() + timedelta(days=30))
+        self.emp.refresh_from_db()
+        self.assertEqual(self.emp.salary_per_saree, 10)
+
+    def test_first_change_keeps_the_previous_rate_for_earlier_production(self):
+        SareeCount.objects.create(employee=self.emp, date=self.week1, count=2)
+        services.set_salary_rate(self.emp.id, 20, effective_from=self.week2)
+
+        self.assertEqual(list(self.emp.rate_history.order_by("effective_from").values_list("effective_from", "rate")),
+                         [(self.week1, 10), (self.week2, 20)])
+        late_entry = SareeCount.objects.create(employee=self.emp, date=self.week1 + timedelta(days=2), count=1)
+        self.assertEqual((late_entry.rate, late_entry.earnings), (10, 10))
+        self.assertEqual(SareeCount.objects.get(date=self.week1).earnings, 20)
+
+    def test_django_admin_cannot_edit_the_rate_directly(self):
+        admin_user = User.objects.create_superuser(username="root", password="pw")
+        self.client.force_login(admin_user)
+        r = self.client.get(f"/admin/core/employee/{self.emp.id}/change/")
+        self.assertNotContains(r, 'name="salary_per_saree"')
+        self.assertContains(self.client.get("/admin/core/employee/add/"), 'name="salary_per_saree"')
@@ -0,0 +1,69 @@
+# core/tests/test_scheduler.py
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Employee, SareeCount, SalaryHistory, AdvanceHistory, WeeklyCloseRun
+from core import scheduler
+
+# a Wednesday; the latest due week starts Monday 2026-10-12
+NOW = timezone.make_aware(datetime(2026, 10, 21, 12, 0))
+LAST_WEEK = date(2026, 10, 12)
+
+
+class WeeklyCloseSchedulerTests(TestCase):
+
+    def setUp(self):
+        self.emp = Employee.objects.create(user=User.objects.create_user(username="s1", password="pw"), name="S1", phone="111", salary_per_saree=10, advance_salary=0, is_approved=True)
+        for monday in (date(2026, 9, 28), date(2026, 10, 5), LAST_WEEK):
+            SareeCount.objects.create(employee=self.emp, date=monday + timedelta(days=1), count=4)
+
+    def test_due_boundary_follows_the_offset(self):
+        self.assertEqual(scheduler.latest_due_week(NOW), LAST_WEEK)
+        monday_morning = timezone.make_aware(datetime(2026, 10, 19, 0, 10))
+        self.assertEqual(scheduler.latest_due_week(monday_morning), date(2026, 10, 5))
+        with override_settings(WEEKLY_CLOSE_OFFSET_MINUTES=-60):
+            sunday_night = timezone.make_aware(datetime(2026, 10, 25, 23, 30))
+            self.assertEqual(scheduler.latest_due_week(sunday_night), date(2026, 10, 19))
+
+    def test_first_run_closes_the_latest_week_once(self):
+        runs = scheduler.run_due(NOW)
+        self.assertEqual([(r.week_start, r.catch_up, r.salary_rows, r.advance_rows) for r in runs], [(LAST_WEEK, False, 1, 1)])
+        self.assertEqual(SalaryHistory.objects.get().week_start, LAST_WEEK)
+        self.assertEqual(scheduler.run_due(NOW), [])
+        with self.assertRaises(scheduler.WeekAlreadyClosed):
+            scheduler.close_week(LAST_WEEK)
+
+    def test_missed_weeks_are_caught_up_in_order(self):
+        WeeklyCloseRun.objects.create(week_start=date(2026, 9, 21), week_end=date(2026, 9, 27), status="succeeded", started_at=NOW, finished_at=NOW)
+        runs = scheduler.run_due(NOW)
+        self.assertEqual([(r.week_start, r.catch_up) for r in runs], [(date(2026, 9, 28), True), (date(2026, 10, 5), True), (LAST_WEEK, False)])
+        self.assertEqual(list(SalaryHistory.objects.order_by("week_start").values_list("week_start", "sarees")),
+                         [(date(2026, 9, 28), 4), (date(2026, 10, 5), 4), (LAST_WEEK, 4)])
+        self.assertEqual(AdvanceHistory.objects.filter(action_type="CARRY").count(), 1)
+        self.assertEqual([r.advance_rows for r in runs], [0, 0, 1])
+
+    def test_catch_up_carries_the_advance_once(self):
+        WeeklyCloseRun.objects.create(week_start=date(2026, 9, 21), week_end=date(2026, 9, 27), status="succeeded", started_at=NOW, finished_at=NOW)
+        self.emp.advance_salary = 100
+        self.emp.save()
+        with override_settings(WEEKLY_CLOSE_CARRY_FACTOR=0.5):
+            runs = scheduler.run_due(NOW)
+        self.assertEqual([r.catch_up for r in runs], [True, True, False])
+        self.emp.refresh_from_db()
+        self.assertEqual(self.emp.advance_salary, 50)   # not 100 * 0.5**3
+
+    def test_failed_week_is_recorded_and_blocks_later_weeks(self):
+        WeeklyCloseRun.objects.create(week_start=date(2026, 9, 28), week_end=date(2026, 10, 4), status="succeeded", started_at=NOW, finished_at=NOW)
+        with self.assertLogs("core.scheduler", "ERROR"), mock.patch("core.services.backfill_salary_history", side_effect=RuntimeError("boom")):
+            self.assertEqual(scheduler.run_due(NOW), [])
+        failed = WeeklyCloseRun.objects.get(status="failed")
+        self.assertEqual(failed.week_start, date(2026, 10, 5))
+        self.assertIn("boom", failed.error)
+        self.assertFalse(SalaryHistory.objects.exists())
+
+        runs = scheduler.run_due(NOW)
+        self.assertEqual([r.week_start for r in runs], [date(2026, 10, 5), LAST_WEEK])
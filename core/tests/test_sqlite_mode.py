@@ -0,0 +1,56 @@
+# core/tests/test_sqlite_mode.py
+import tempfile
+import unittest
+from pathlib import Path
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+from django.test import SimpleTestCase
+
+
+@unittest.skipUnless(connection.vendor == "sqlite" and settings.SQLITE_TUNED, "tuned SQLite mode only")
+class TunedSqliteTests(SimpleTestCase):
+    """The test database lives in memory, so these open their own connections to a file."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.aliases = []
+
+    def tearDown(self):
+        for alias in self.aliases:
+            connections[alias].close()
+            del connections[alias]
+        self.tmp.cleanup()
+
+    def _connect(self, alias, **options):
+        conf = dict(connections.settings["default"], NAME=str(Path(self.tmp.name) / "loom.sqlite3"))
+        conf["OPTIONS"] = {**conf["OPTIONS"], **options}
+        connections[alias] = connections["default"].__class__(conf, alias)
+        self.aliases.append(alias)
+        return connections[alias]
+
+    def test_pragmas_are_applied_on_connect(self):
+        with self._connect("tuned").cursor() as c:
+            pragmas = {p: c.execute(f"PRAGMA {p}").fetchone()[0] for p in ("journal_mode", "busy_timeout", "mmap_size")}
+        self.assertEqual(pragmas, {
+            "journal_mode": "wal",
+            "busy_timeout": int(settings.SQLITE_BUSY_TIMEOUT * 1000),
+            "mmap_size": settings.SQLITE_MMAP_MB * 1024 * 1024,
+        })
+
+    def test_transactions_take_the_write_lock_up_front_and_readers_continue(self):
+        writer, other = self._connect("writer"), self._connect("other", timeout=0.05)
+        with writer.cursor() as c:
+            c.execute("CREATE TABLE t (x INTEGER)")
+            c.execute("INSERT INTO t VALUES (1)")
+
+        with transaction.atomic(using="writer"):
+            with writer.cursor() as c:
+                c.execute("SELECT x FROM t")   # read only, yet the write lock is already held
+            with other.cursor() as c:
+                self.assertEqual(c.execute("SELECT count(*) FROM t").fetchone()[0], 1)
+            with self.assertRaisesMessage(OperationalError, "locked"):
+                with transaction.atomic(using="other"):
+                    pass
+        with transaction.atomic(using="other"):
+            pass
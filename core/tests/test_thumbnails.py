@@ -0,0 +1,80 @@
+# core/tests/test_thumbnails.py
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core.models import Employee
+from core.thumbnails import thumbnail_url
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload(name="me.png", size=(1200, 800), mode="RGBA"):
+    buf = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(buf, "PNG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/png")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        user = User.objects.create_user(username="5550001", password="pw")
+        self.emp = Employee.objects.create(user=user, name="W1", phone="5550001")
+
+    def _upload(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.emp.profile_picture = image_upload(**kwargs)
+            self.emp.save()
+        self.emp.refresh_from_db()
+
+    def test_upload_builds_square_jpeg_variants(self):
+        self._upload()
+        self.assertEqual(sorted(self.emp.profile_thumbnails), ["256", "48", "96"])
+        for size, name in self.emp.profile_thumbnails.items():
+            with default_storage.open(name) as fp, Image.open(fp) as img:
+                self.assertEqual((img.format, img.mode, img.size), ("JPEG", "RGB", (int(size), int(size))))
+
+    def test_smallest_covering_variant_is_served(self):
+        self.assertEqual(thumbnail_url(self.emp, 48), "")
+        self._upload()
+        thumbs = self.emp.profile_thumbnails
+        self.assertEqual(thumbnail_url(self.emp, 48), default_storage.url(thumbs["48"]))
+        self.assertEqual(thumbnail_url(self.emp, 60), default_storage.url(thumbs["96"]))
+        self.assertEqual(thumbnail_url(self.emp, 1000), default_storage.url(thumbs["256"]))
+
+    def test_replacing_picture_removes_old_thumbnails(self):
+        self._upload()
+        old = list(self.emp.profile_thumbnails.values())
+        self._upload(name="new.png", mode="RGB")
+        self.assertTrue(all(not default_storage.exists(n) for n in old))
+        self.assertTrue(all(default_storage.exists(n) for n in self.emp.profile_thumbnails.values()))
+
+    def test_saving_other_fields_keeps_thumbnails(self):
+        self._upload()
+        stale = Employee.objects.get(id=self.emp.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            stale.name = "Renamed"
+            stale.save()
+        self.assertEqual(callbacks, [])
+        self.emp.refresh_from_db()
+        self.assertEqual(len(self.emp.profile_thumbnails), 3)
+
+    def test_command_builds_missing_thumbnails(self):
+        self._upload()
+        Employee.objects.filter(id=self.emp.id).update(profile_thumbnails={})
+        call_command("build_thumbnails", stdout=io.StringIO())
+        self.emp.refresh_from_db()
+        self.assertEqual(len(self.emp.profile_thumbnails), 3)
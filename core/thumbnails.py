@@ -0,0 +1,141 @@
+# core/thumbnails.py
+"""
+Profile picture thumbnails.
+
+Uploads are stored as-is; after the transaction that saved a new picture commits, the
+picture is handed to a small background worker which normalizes it (EXIF orientation,
+RGB, metadata stripped) and writes square JPEG copies for each size in THUMBNAIL_SIZES
+through the default storage (Cloudinary in production, the local filesystem otherwise).
+Pages then ask for the smallest variant that covers the size they display.
+"""
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+# Edge lengths in px. 48/96 cover list avatars at 1x/2x, 256 the detail and dashboard headers.
+THUMBNAIL_SIZES = (48, 96, 256)
+JPEG_QUALITY = 82
+
+_executor = None
+
+
+def render_thumbnails(fp, sizes=THUMBNAIL_SIZES):
+    """
+    Decode an uploaded image and return {size: jpeg bytes} for each requested size.
+    Raises:
+        PIL.UnidentifiedImageError / OSError if the file is not a readable image.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(fp) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        out = {}
+        # largest first so each step downsamples an already reduced image
+        for size in sorted(sizes, reverse=True):
+            img = ImageOps.fit(img, (size, size), Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            out[size] = buf.getvalue()
+        return out
+
+
+def build_thumbnails(employee_id):
+    """
+    Generate and store the thumbnails for an employee's current profile picture.
+    Returns the new {size: storage name} mapping ({} when there is no picture).
+    Old thumbnail files are deleted once the new mapping is saved.
+    """
+    emp = Employee.objects.filter(id=employee_id).only("id", "profile_picture", "profile_thumbnails").first()
+    if emp is None:
+        return {}
+    if not emp.profile_picture:
+        Employee.objects.filter(id=emp.id).update(profile_thumbnails={}, updated_at=timezone.now())
+        _delete_files(emp.profile_thumbnails.values())
+        return {}
+
+    source = emp.profile_picture.name
+    with emp.profile_picture.open("rb") as fp:
+        rendered = render_thumbnails(fp)
+    names = {
+        str(size): default_storage.save(f"profile_pics/thumbs/{emp.id}/{size}.jpg", ContentFile(data))
+        for size, data in rendered.items()
+    }
+    # the picture may have been replaced while we were resizing; that change scheduled
+    # its own run, so only record these files if our source is still the current one
+    if Employee.objects.filter(id=emp.id, profile_picture=source).update(profile_thumbnails=names, updated_at=timezone.now()):
+        _delete_files(emp.profile_thumbnails.values())
+        return names
+    _delete_files(names.values())
+    return {}
+
+
+def _delete_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception:
+            logger.warning("could not delete thumbnail %s", name, exc_info=True)
+
+
+def _run(employee_id):
+    try:
+        build_thumbnails(employee_id)
+    except Exception:
+        logger.exception("thumbnail generation failed for employee %s", employee_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_thumbnails(employee_id):
+    """
+    Queue thumbnail generation to run after the current transaction commits.
+    With THUMBNAIL_WORKERS = 0 the work runs inline in the on_commit hook instead of
+    on the background thread (used by tests and one-off scripts).
+    """
+    def submit():
+        global _executor
+        workers = getattr(settings, "THUMBNAIL_WORKERS", 1)
+        if workers <= 0:
+            build_thumbnails(employee_id)
+            return
+        if _executor is None:
+            # created lazily so each (pre-forked) server worker gets its own thread
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        _executor.submit(_run, employee_id)
+
+    transaction.on_commit(submit)
+
+
+def thumbnail_url(employee, size):
+    """
+    URL of the smallest stored variant that is at least `size` px, falling back to the
+    largest variant and then to the original upload while thumbnails are pending.
+    Returns "" when the employee has no profile picture.
+    """
+    if not employee.profile_picture:
+        return ""
+    variants = sorted((int(s), name) for s, name in (employee.profile_thumbnails or {}).items())
+    if not variants:
+        return employee.profile_picture.url
+    for s, name in variants:
+        if s >= size:
+            return default_storage.url(name)
+    return default_storage.url(variants[-1][1])
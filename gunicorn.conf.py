@@ -0,0 +1,63 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for loomserver (picked up automatically from the working directory).
+
+- preload_app: Django is imported once in the master and workers are forked from it,
+  so code and import-time data are shared copy-on-write instead of loaded per worker.
+- Worker recycling: workers restart after max_requests (with jitter), and a worker
+  whose resident memory grows past WORKER_MAX_RSS_MB finishes its current request
+  and is replaced by the master.
+
+All values can be overridden with the environment variables named below.
+"""
+import os
+import signal
+import threading
+
+bind = "0.0.0.0:" + os.environ.get("PORT", "8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+accesslog = "-"
+errorlog = "-"
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+WORKER_MAX_RSS_MB = int(os.environ.get("WORKER_MAX_RSS_MB", "300"))
+RSS_CHECK_SECONDS = int(os.environ.get("WORKER_RSS_CHECK_SECONDS", "15"))
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def post_worker_init(worker):
+    """Watch this worker's RSS; over the limit, ask it to shut down gracefully (SIGTERM)."""
+    if WORKER_MAX_RSS_MB <= 0:
+        return
+
+    def watch():
+        stop = threading.Event()
+        while not stop.wait(RSS_CHECK_SECONDS):
+            rss = _rss_mb()
+            if rss > WORKER_MAX_RSS_MB:
+                worker.log.warning("Worker %s RSS %.0f MiB > %s MiB, recycling", worker.pid, rss, WORKER_MAX_RSS_MB)
+                os.kill(worker.pid, signal.SIGTERM)
+                return
+
+    threading.Thread(target=watch, name="rss-watchdog", daemon=True).start()
+
+
+def post_fork(server, worker):
+    # Connections opened in the master while preloading must not be shared with forked workers.
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+    for conn in connections.all(initialized_only=True):
+        conn.close()
@@ -14,8 +14,12 @@ ALLOWED_HOSTS = ["*",]
 # -----------------------------
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+STATICFILES_DIRS = [BASE_DIR / "static"]
 
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# collectstatic writes content-hashed names plus .gz/.br variants (brotli needs the
+# Brotli package); WhiteNoise serves hashed files with far-future immutable headers.
+# (The test suite runs on loomserver.settings_test, which swaps in plain storage.)
+STATICFILES_BACKEND = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
@@ -24,6 +28,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.db_router.PrimaryPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -41,16 +46,90 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
         }
     }
 
+# Single-box SQLite mode (no DATABASE_URL). WAL lets readers run alongside the writer;
+# transactions start with BEGIN IMMEDIATE, which takes the write lock up front. SQLite
+# ignores select_for_update(), so this is what serializes the atomic blocks in
+# core.services. It also means a lock conflict waits out SQLITE_BUSY_TIMEOUT (seconds)
+# instead of failing with "database is locked" when a reader tries to upgrade.
+# Pragmas run on every new connection. SQLITE_TUNED=False restores SQLite's defaults.
+SQLITE_TUNED = os.environ.get("SQLITE_TUNED", "True") == "True"
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", "20"))
+SQLITE_MMAP_MB = int(os.environ.get("SQLITE_MMAP_MB", "256"))
+SQLITE_CACHE_MB = int(os.environ.get("SQLITE_CACHE_MB", "64"))
+if not DATABASE_URL and SQLITE_TUNED:
+    DATABASES["default"]["OPTIONS"] = {
+        "transaction_mode": "IMMEDIATE",
+        "timeout": SQLITE_BUSY_TIMEOUT,   # sqlite3 busy_timeout
+        "init_command": ";".join([
+            "PRAGMA journal_mode = WAL",
+            "PRAGMA synchronous = NORMAL",   # durable in WAL mode except on power loss
+            f"PRAGMA mmap_size = {SQLITE_MMAP_MB * 1024 * 1024}",
+            f"PRAGMA cache_size = -{SQLITE_CACHE_MB * 1024}",   # negative: KiB
+            "PRAGMA temp_store = MEMORY",
+        ]),
+    }
+
+# Optional read replica for reports, history pages, dashboards and exports
+# (core.db_router). Clients read from the primary for REPLICA_PIN_SECONDS after a write.
+REPLICA_DATABASE_URL = os.environ.get("REPLICA_DATABASE_URL")
+REPLICA_READS = bool(REPLICA_DATABASE_URL)
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "15"))
+if REPLICA_DATABASE_URL:
+    DATABASES["replica"] = dj_database_url.parse(REPLICA_DATABASE_URL)
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+
+# PostgreSQL only: store SareeCount as monthly range partitions (core.partitions).
+# Read by migration 0013; `manage.py saree_partitions` keeps future months created.
+SAREECOUNT_PARTITIONING = os.environ.get("SAREECOUNT_PARTITIONING", "False") == "True"
+SAREECOUNT_PARTITIONS_AHEAD = int(os.environ.get("SAREECOUNT_PARTITIONS_AHEAD", "3"))
+
+# Weekly close (core.scheduler, `manage.py run_scheduler`): a Monday-Sunday week is
+# archived and advances carried this many minutes after the midnight ending it (TIME_ZONE).
+WEEKLY_CLOSE_OFFSET_MINUTES = int(os.environ.get("WEEKLY_CLOSE_OFFSET_MINUTES", "30"))
+WEEKLY_CLOSE_CARRY_FACTOR = float(os.environ.get("WEEKLY_CLOSE_CARRY_FACTOR", "1.0"))
+
+# Processes used to hash initial passwords in the bulk onboarding view (core.onboarding).
+# 1 hashes in the request thread (fine for the dozens of rows a page handles); more
+# spawns a fresh pool per request, never a fork of the threaded web worker.
+ONBOARDING_HASH_WORKERS = int(os.environ.get("ONBOARDING_HASH_WORKERS", "1"))
+
 # -----------------------------
 # MEDIA USING CLOUDINARY
 # -----------------------------
+# The cloudinary apps (and their imports) are only loaded when CLOUDINARY_URL is set;
+# without it media is stored on the local filesystem.
 CLOUDINARY_URL = os.environ.get("CLOUDINARY_URL")
-DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
+if CLOUDINARY_URL:
+    DEFAULT_STORAGE_BACKEND = "cloudinary_storage.storage.MediaCloudinaryStorage"
+else:
+    DEFAULT_STORAGE_BACKEND = "django.core.files.storage.FileSystemStorage"
 MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+STORAGES = {
+    "default": {"BACKEND": DEFAULT_STORAGE_BACKEND},
+    "staticfiles": {"BACKEND": STATICFILES_BACKEND},
+}
+
+# -----------------------------
+# EMAIL (warp/pagdi alert digests)
+# -----------------------------
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "587"))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "True") == "True"
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "alerts@serverloom.local")
+
+# Background threads per process that resize uploaded profile pictures (core.thumbnails);
+# 0 resizes inline right after the upload commits.
+THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", "1"))
 
 # -----------------------------
 # DJANGO APPS
@@ -63,13 +142,13 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
 
-    "cloudinary",
-    "cloudinary_storage",
-
     "core",
     "accounts",
 ]
 
+if CLOUDINARY_URL:
+    INSTALLED_APPS += ["cloudinary", "cloudinary_storage"]
+
 ROOT_URLCONF = "loomserver.urls"
 WSGI_APPLICATION = "loomserver.wsgi.application"
 
@@ -101,3 +180,6 @@ USE_I18N = True
 USE_TZ = True
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Covering (INCLUDE) indexes are PostgreSQL-only; SQLite builds them on the key columns.
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
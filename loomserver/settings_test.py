@@ -0,0 +1,14 @@
+# loomserver/settings_test.py
+"""
+Settings for the test suite. `manage.py test` picks them by default; with any other
+runner set DJANGO_SETTINGS_MODULE=loomserver.settings_test.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, STORAGES
+
+# templates render without running collectstatic, so there is no manifest
+STORAGES = {**STORAGES, "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}}
+
+# same database under a second alias, so the routing is testable (tests enable REPLICA_READS)
+if "replica" not in DATABASES:
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
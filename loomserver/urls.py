@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from django.http import HttpResponse
@@ -7,3 +9,8 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('admin/', admin.site.urls),
 ]
+
+# Uploaded media is served by Cloudinary in production; without CLOUDINARY_URL it lives
+# under MEDIA_ROOT and is served from here while DEBUG is on.
+if not settings.CLOUDINARY_URL:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'loomserver.settings')
+    # the test suite runs on loomserver/settings_test.py unless told otherwise
+    settings_module = 'loomserver.settings_test' if sys.argv[1:2] == ['test'] else 'loomserver.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -0,0 +1,63 @@
+// static/js/employee_picker.js
+// Employee typeahead for the admin forms (templates/accounts/admin/fragments/employee_picker.html).
+// Queries admin_employee_search as the user types and pages on with its keyset cursor.
+(function () {
+  function init(picker) {
+    if (picker.dataset.ready) return;
+    picker.dataset.ready = "1";
+    var hidden = picker.querySelector('input[type="hidden"]');
+    var input = picker.querySelector("[data-picker-input]");
+    var list = picker.querySelector("[data-picker-results]");
+    var timer = null, request = 0;
+
+    function item(text, onPick, extra) {
+      var li = document.createElement("li");
+      li.textContent = text;
+      li.className = "px-3 py-2 cursor-pointer hover:bg-slate-100" + (extra || "");
+      li.addEventListener("mousedown", function (e) { e.preventDefault(); onPick(); });
+      return li;
+    }
+
+    function load(after) {
+      var url = picker.dataset.searchUrl + "&q=" + encodeURIComponent(input.value.trim());
+      if (after) url += "&after=" + encodeURIComponent(after);
+      var mine = ++request;
+      fetch(url, { credentials: "same-origin" })
+        .then(function (r) { if (!r.ok) throw new Error(r.status); return r.json(); })
+        .then(function (data) {
+          if (mine !== request) return;
+          if (!after) list.innerHTML = "";
+          var more = list.querySelector("[data-more]");
+          if (more) more.remove();
+          data.results.forEach(function (e) {
+            list.appendChild(item(e.name + " — " + e.phone, function () {
+              hidden.value = e.id;
+              input.value = e.name + " — " + e.phone;
+              list.classList.add("hidden");
+            }));
+          });
+          if (!list.children.length) list.appendChild(item("No matching employees", function () {}, " text-gray-600"));
+          if (data.next) {
+            var li = item("More…", function () { load(data.next); }, " text-indigo-600");
+            li.dataset.more = "1";
+            list.appendChild(li);
+          }
+          list.classList.remove("hidden");
+        })
+        .catch(function () { list.classList.add("hidden"); });
+    }
+
+    input.addEventListener("input", function () {
+      hidden.value = "";
+      clearTimeout(timer);
+      timer = setTimeout(function () { load(null); }, 200);
+    });
+    input.addEventListener("focus", function () { if (!hidden.value) load(null); });
+    input.addEventListener("blur", function () { list.classList.add("hidden"); });
+    picker.closest("form").addEventListener("submit", function (e) {
+      if (!hidden.value) { e.preventDefault(); input.focus(); }
+    });
+  }
+
+  document.querySelectorAll("[data-employee-picker]").forEach(init);
+})();
@@ -0,0 +1,94 @@
+// static/js/employee_portal.js
+// Employee portal as an offline-capable web app.
+//
+// Registers the portal's service worker (data-service-worker on this script tag) and,
+// on pages with a [data-pwa-src] region, re-renders the region from that JSON endpoint:
+// - [data-field="key"] gets the value as text (data-format: money, date or text)
+// - [data-show-if="key"] / [data-show-unless="key"] are hidden by the value's truthiness
+// - [data-list="key"] is rebuilt from the array, one <template data-row> per item
+//   (<template data-empty> when the array is empty)
+// Online the JSON comes from the server (and the worker keeps it); offline the worker
+// answers with the last copy, so a page served from its cache shows the newest data saved.
+(function () {
+  const script = document.currentScript;
+  const root = document.querySelector("[data-pwa-src]");
+  const dateFormat = new Intl.DateTimeFormat("en-US", { month: "short", day: "2-digit", year: "numeric" });
+  const formats = {
+    money: (v) => "₹" + (v || 0),
+    date: (v) => (v ? dateFormat.format(new Date(v + "T00:00:00")) : "—"),
+    text: (v) => (v === null || v === undefined || v === "" ? "—" : String(v)),
+  };
+
+  function fill(scope, data, inList) {
+    scope.querySelectorAll("[data-field]").forEach((el) => {
+      if (inList || !el.closest("[data-list]")) {
+        el.textContent = (formats[el.dataset.format] || formats.text)(data[el.dataset.field]);
+      }
+    });
+    scope.querySelectorAll("[data-show-if]").forEach((el) => { el.hidden = !data[el.dataset.showIf]; });
+    scope.querySelectorAll("[data-show-unless]").forEach((el) => { el.hidden = !!data[el.dataset.showUnless]; });
+  }
+
+  function renderList(list, items) {
+    const row = list.querySelector(":scope > template[data-row]");
+    const empty = list.querySelector(":scope > template[data-empty]");
+    list.querySelectorAll(":scope > :not(template)").forEach((el) => el.remove());
+    if (!items.length && empty) list.appendChild(empty.content.cloneNode(true));
+    items.forEach((item) => {
+      const node = row.content.cloneNode(true);
+      fill(node, item, true);
+      list.appendChild(node);
+    });
+  }
+
+  async function render() {
+    let data;
+    try {
+      const response = await fetch(root.dataset.pwaSrc, { headers: { Accept: "application/json" } });
+      if (!response.ok || !(response.headers.get("Content-Type") || "").includes("json")) return;
+      data = await response.json();
+    } catch (e) {
+      return; // offline and never cached: keep the server-rendered page
+    }
+    fill(root, data, false);
+    root.querySelectorAll("[data-list]").forEach((list) => renderList(list, data[list.dataset.list] || []));
+  }
+
+  function showOffline() {
+    document.querySelectorAll("[data-pwa-offline]").forEach((el) => { el.hidden = navigator.onLine; });
+  }
+
+  window.addEventListener("online", showOffline);
+  window.addEventListener("offline", showOffline);
+  showOffline();
+
+  // cached pages and data belong to this login: drop them before signing out
+  document.querySelectorAll("[data-pwa-logout]").forEach((link) => {
+    link.addEventListener("click", async (event) => {
+      const worker = navigator.serviceWorker && navigator.serviceWorker.controller;
+      if (!worker) return;
+      event.preventDefault();
+      const channel = new MessageChannel();
+      const forgotten = new Promise((resolve) => {
+        channel.port1.onmessage = resolve;
+        setTimeout(resolve, 1000);
+      });
+      worker.postMessage({ type: "pwa:forget" }, [channel.port2]);
+      await forgotten;
+      window.location.href = link.href;
+    });
+  });
+
+  if (!("serviceWorker" in navigator) || !script.dataset.serviceWorker) {
+    if (root) render();
+    return;
+  }
+  navigator.serviceWorker.register(script.dataset.serviceWorker);
+  navigator.serviceWorker.addEventListener("message", (event) => {
+    const message = event.data || {};
+    if (message.type === "pwa:signed-out") {
+      window.location.href = message.url;
+    }
+  });
+  if (root) render();
+})();
@@ -0,0 +1,13 @@
+/** Only classes that appear in our templates end up in static/css/app.css. */
+module.exports = {
+  content: [
+    "./templates/**/*.html",
+    "./static/js/**/*.js",
+    "./accounts/**/*.py",
+    "./core/**/*.py",
+  ],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+};
@@ -0,0 +1,124 @@
+// Service worker of the employee portal, rendered by accounts.views.employee_service_worker.
+//
+// - static files (content-hashed names): cache first
+// - portal pages and their JSON data: network first. The cached copy is answered when the
+//   network is unreachable or slower than NETWORK_TIMEOUT_MS (a hanging mobile connection);
+//   the response still lands in the cache when it arrives. Login and logout empty the cache,
+//   so the copy always belongs to the current login.
+//
+// A response redirected to the login page means the session is gone: every cached
+// page and data response is dropped and open pages are sent to the login page. Login
+// and logout also answer with Clear-Site-Data, which empties the cache in any case.
+const CONFIG = {{ config|safe }};
+const NETWORK_TIMEOUT_MS = 3000;
+
+function cacheable(response) {
+  return response.ok && !response.redirected && response.type === "basic"
+    && !(response.headers.get("Cache-Control") || "").includes("no-store");
+}
+
+function signedOut(response) {
+  return response.type === "opaqueredirect"
+    || (response.redirected && new URL(response.url).pathname === CONFIG.login_url);
+}
+
+async function notify(message) {
+  for (const client of await self.clients.matchAll({ type: "window" })) {
+    client.postMessage(message);
+  }
+}
+
+async function forget() {
+  const cache = await caches.open(CONFIG.cache);
+  for (const request of await cache.keys()) {
+    if (!new URL(request.url).pathname.startsWith(CONFIG.static_url)) {
+      await cache.delete(request);
+    }
+  }
+}
+
+async function precache() {
+  const cache = await caches.open(CONFIG.cache);
+  await Promise.all([...CONFIG.shell, ...CONFIG.pages, ...CONFIG.data].map(async (url) => {
+    try {
+      const response = await fetch(url, { credentials: "same-origin" });
+      if (cacheable(response)) await cache.put(url, response);
+    } catch (e) {
+      // offline during install: the page is cached on its first online visit instead
+    }
+  }));
+}
+
+async function cacheFirst(request) {
+  const cache = await caches.open(CONFIG.cache);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+  const response = await fetch(request);
+  if (cacheable(response)) await cache.put(request, response.clone());
+  return response;
+}
+
+async function fromNetwork(request, cache) {
+  const response = await fetch(request);
+  if (signedOut(response)) {
+    await forget();
+    await notify({ type: "pwa:signed-out", url: CONFIG.login_url });
+  } else if (cacheable(response)) {
+    await cache.put(request, response.clone());
+  }
+  return response;
+}
+
+async function fromCache(request, cache) {
+  const fallback = request.mode === "navigate" ? CONFIG.pages[0] : null;
+  return (await cache.match(request)) || (fallback && (await cache.match(fallback))) || null;
+}
+
+async function networkFirst(event) {
+  const request = event.request;
+  const cache = await caches.open(CONFIG.cache);
+  const network = fromNetwork(request, cache);
+  event.waitUntil(network.catch(() => null));   // keep caching a late response
+
+  let timer;
+  const timedOut = new Promise((resolve) => { timer = setTimeout(resolve, NETWORK_TIMEOUT_MS); });
+  const first = await Promise.race([network.then(() => "network", () => "failed"), timedOut.then(() => "slow")]);
+  clearTimeout(timer);
+  if (first === "network") return network;
+
+  const cached = await fromCache(request, cache);
+  if (cached) return cached;
+  // nothing saved: keep waiting for the network (or fail with it)
+  return network.catch(() => Response.error());
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    for (const name of await caches.keys()) {
+      if (name.startsWith("loom-employee-") && name !== CONFIG.cache) await caches.delete(name);
+    }
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener("message", (event) => {
+  if (event.data && event.data.type === "pwa:forget") {
+    event.waitUntil(forget().then(() => event.ports[0] && event.ports[0].postMessage("done")));
+  }
+});
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin) return;
+
+  if (url.pathname.startsWith(CONFIG.static_url)) {
+    event.respondWith(cacheFirst(request));
+  } else if (request.mode === "navigate" || CONFIG.data.includes(url.pathname)) {
+    event.respondWith(networkFirst(event));
+  }
+});